@@ -0,0 +1,194 @@
+from app.base.repositories import BaseRepository
+from app.base.models import BaseModel, AggregateQuery, FilterQuery, FindQuery, Page
+from app.utils import Positive
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Hashable, Sequence
+from typing import Any, override
+import itertools
+import time
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class TTLCache[K: Hashable, V]:
+    """In-process LRU: holds up to `max_entries` values, each for at most `ttl` seconds."""
+
+    def __init__(self, max_entries: Positive[int], ttl: Positive[float],
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.stats.evictions += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = self.clock() + self.ttl, value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class CachedRepository[Model: BaseModel, Query: FindQuery](BaseRepository[Model, Query]):
+    """
+    Read-through cache in front of `find_by_id`/`find_by_ids` of any repository.
+    Writes go to `repository` and evict the ids they touch; other processes only see
+    them once their own entries expire, so keep `ttl` short for data that changes.
+    Entries are detached snapshots of the column values (relationships are not kept),
+    and every caller gets its own copy.
+    """
+
+    def __init__(self, repository: BaseRepository[Model, Query],
+                 max_entries: Positive[int] = 1024, ttl: Positive[float] = 60.0) -> None:
+        self.repo = repository
+        self.cache: TTLCache[int, Model] = TTLCache(max_entries, ttl)
+        # Version of the latest read in flight per id; an eviction drops it, so a read that
+        # started before a write cannot put the row it saw back into the cache.
+        self._reads: dict[int, int] = {}
+        self._versions = itertools.count()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.repo, name)
+
+    def _evict(self, id: Positive[int] | None) -> None:
+        if id is not None:
+            self.cache.pop(id)
+            self._reads.pop(id, None)
+
+    @staticmethod
+    def _snapshot(model: Model) -> Model:
+        return type(model).model_validate(model.model_dump())
+
+    def _get(self, id: Positive[int]) -> Model | None:
+        model = self.cache.get(id)
+        return self._snapshot(model) if model is not None else None
+
+    def _start_read(self, id: Positive[int]) -> int:
+        version = self._reads[id] = next(self._versions)
+        return version
+
+    def _fill(self, id: Positive[int], version: int, model: Model | None) -> None:
+        """Caches what a read returned, unless the id was written (or read again) meanwhile."""
+        if self._reads.get(id) != version:
+            return
+        del self._reads[id]
+        if model is not None:
+            self.cache.set(id, self._snapshot(model))
+
+    @override
+    async def add(self, model: Model) -> Model:
+        return await self.repo.add(model)
+
+    @override
+    async def add_many(self, models: Sequence[Model]) -> list[Model]:
+        return await self.repo.add_many(models)
+
+    @override
+    async def find(self, query: Query) -> Page[Model, Query] | None:
+        return await self.repo.find(query)
+
+    @override
+    async def count(self, query: FilterQuery, estimate: bool = False) -> int:
+        return await self.repo.count(query, estimate)
+
+    @override
+    async def aggregate(self, query: AggregateQuery) -> list[dict[str, Any]]:
+        return await self.repo.aggregate(query)
+
+    @override
+    async def find_by_id(self, id: Positive[int]) -> Model | None:
+        model = self._get(id)
+        if model is None:
+            version = self._start_read(id)
+            try:
+                model = await self.repo.find_by_id(id)
+            finally:
+                self._fill(id, version, model)
+        return model
+
+    @override
+    async def find_by_ids(self, ids: Sequence[Positive[int]]) -> list[Model | None]:
+        cached = {id: model for id in dict.fromkeys(ids) if (model := self._get(id)) is not None}
+        missing = [id for id in dict.fromkeys(ids) if id not in cached]
+        if missing:
+            versions = [self._start_read(id) for id in missing]
+            found: list[Model | None] = [None] * len(missing)
+            try:
+                found = await self.repo.find_by_ids(missing)
+            finally:
+                for id, version, model in zip(missing, versions, found):
+                    self._fill(id, version, model)
+            cached.update((id, model) for id, model in zip(missing, found) if model is not None)
+        return [cached.get(id) for id in ids]
+
+    @override
+    async def project(self, query: Query, attrs: Sequence[str]) -> Page[dict[str, Any], Query] | None:
+        return await self.repo.project(query, attrs)
+
+    @override
+    async def project_by_id(self, id: Positive[int], attrs: Sequence[str]) -> dict[str, Any] | None:
+        if (model := self.cache.get(id)) is not None:
+            return model.model_dump(include={'id', *attrs})
+        return await self.repo.project_by_id(id, attrs)
+
+    @override
+    def stream(self, attrs: Sequence[str] | None = None) -> AsyncIterator[dict[str, Any]]:
+        return self.repo.stream(attrs)
+
+    @override
+    async def update(self, id: Positive[int], model: Model) -> Model:
+        updated = await self.repo.update(id, model)
+        self._evict(id)
+        return updated
+
+    @override
+    async def patch(self, id: Positive[int], **fields: Any) -> Model:
+        patched = await self.repo.patch(id, **fields)
+        self._evict(id)
+        return patched
+
+    @override
+    async def delete(self, id: Positive[int]) -> Model:
+        deleted = await self.repo.delete(id)
+        self._evict(id)
+        return deleted
+
+    @override
+    async def upsert(self, model: Model) -> Model:
+        upserted = await self.repo.upsert(model)
+        self._evict(upserted.id)
+        return upserted
+
+    @override
+    async def upsert_many(self, models: Sequence[Model]) -> list[Model]:
+        upserted = await self.repo.upsert_many(models)
+        for model in upserted:
+            self._evict(model.id)
+        return upserted
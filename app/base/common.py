@@ -1,11 +1,21 @@
-from app.base.models import BaseModel, FindQuery, Page
+from app.base.models import BaseModel, AggregateQuery, FilterQuery, FindQuery, Page
 from app.utils import Positive
-from typing import Protocol
+from typing import Any, Protocol
+from collections.abc import AsyncIterator, Sequence
 
 class SupportsModelPersistance[Model: BaseModel, Query: FindQuery](Protocol):
     async def add(self, model: Model) -> Model: ...
+    async def add_many(self, models: Sequence[Model]) -> list[Model]: ...
     async def find(self, query: Query) -> Page[Model, Query] | None: ...
+    async def count(self, query: FilterQuery, estimate: bool = False) -> int: ...
+    async def aggregate(self, query: AggregateQuery) -> list[dict[str, Any]]: ...
     async def find_by_id(self, id: Positive[int]) -> Model | None: ...
+    async def find_by_ids(self, ids: Sequence[Positive[int]]) -> list[Model | None]: ...
+    async def project(self, query: Query, attrs: Sequence[str]) -> Page[dict[str, Any], Query] | None: ...
+    async def project_by_id(self, id: Positive[int], attrs: Sequence[str]) -> dict[str, Any] | None: ...
+    def stream(self, attrs: Sequence[str] | None = None) -> AsyncIterator[dict[str, Any]]: ...
     async def update(self, id: Positive[int], model: Model) -> Model: ...
+    async def patch(self, id: Positive[int], **fields: Any) -> Model: ...
     async def delete(self, id: Positive[int]) -> Model: ...
     async def upsert(self, model: Model) -> Model: ...
+    async def upsert_many(self, models: Sequence[Model]) -> list[Model]: ...
@@ -0,0 +1,48 @@
+from app.base.repositories import unit_of_work
+from app.config import settings
+from sqlalchemy import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool
+from sqlmodel import create_engine
+from collections.abc import AsyncGenerator
+from functools import cache
+from typing import Any
+
+def _connect_args(url: str) -> dict[str, Any]:
+    if make_url(url).get_driver_name() == 'psycopg':
+        return {'prepare_threshold': settings.db_prepare_threshold}
+    return {}
+
+
+@cache
+def get_engine(url: str) -> Engine:
+    """Process-wide engine for `url`, so every repository on the same database shares one pool."""
+    return create_engine(
+        url=url,
+        poolclass=QueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(url),
+    )
+
+
+@cache
+def get_async_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url=url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(url),
+    )
+
+
+async def session_scope() -> AsyncGenerator[None]:
+    """FastAPI dependency running each request in its own unit of work."""
+    async with unit_of_work():
+        yield
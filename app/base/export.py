@@ -0,0 +1,51 @@
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from collections.abc import AsyncGenerator, AsyncIterable
+from typing import Any, Literal
+import csv
+import io
+
+type ExportFormat = Literal['ndjson', 'csv']
+
+MEDIA_TYPES: dict[str, str] = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+async def ndjson_chunks(rows: AsyncIterable[dict[str, Any]], chunk_rows: int = 1000) -> AsyncGenerator[bytes]:
+    lines: list[bytes] = []
+    async for row in rows:
+        lines.append(to_json(row))
+        if len(lines) == chunk_rows:
+            yield b'\n'.join(lines) + b'\n'
+            lines.clear()
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+async def csv_chunks(rows: AsyncIterable[dict[str, Any]], chunk_rows: int = 1000) -> AsyncGenerator[str]:
+    buffer = io.StringIO()
+    writer: csv.DictWriter | None = None
+    written = 0
+    async for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow(row)
+        written += 1
+        if written % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(rows: AsyncIterable[dict[str, Any]], format: ExportFormat, filename: str) -> StreamingResponse:
+    """Streams `rows` as they are fetched, one line each, without buffering the whole table."""
+    chunks = ndjson_chunks(rows) if format == 'ndjson' else csv_chunks(rows)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{format}"'},
+    )
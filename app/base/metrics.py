@@ -0,0 +1,178 @@
+from collections.abc import Awaitable, Callable, Iterable
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter
+from typing import Any
+import inspect
+import re
+
+# Seconds; the last bucket (+Inf) is implicit.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Counts per preallocated bucket; `observe` only bisects and increments."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def reset(self) -> None:
+        self.counts[:] = [0] * len(self.counts)
+        self.sum = 0.0
+        self.count = 0
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+class HistogramFamily:
+    """A histogram per combination of label values, created on its first observation."""
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...],
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self.children: dict[tuple[str, ...], Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = Histogram(self.buckets)
+        return child
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for values, child in self.children.items():
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), child.counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {child.sum}"
+            yield f"{self.name}_count{{{labels}}} {child.count}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.families: dict[str, HistogramFamily] = {}
+
+    def histogram(self, name: str, help: str, label_names: tuple[str, ...],
+                  buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> HistogramFamily:
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = HistogramFamily(name, help, label_names, buckets)
+        return family
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        return ''.join(f"{line}\n" for family in self.families.values() for line in family.render())
+
+    def reset(self) -> None:
+        """Zeroes every histogram in place; callers hold on to them."""
+        for family in self.families.values():
+            for child in family.children.values():
+                child.reset()
+
+
+registry = MetricsRegistry()
+
+ROUTE_SECONDS = registry.histogram(
+    'http_request_duration_seconds', "Time spent handling a request, by route name.", ('route',)
+)
+REPOSITORY_SECONDS = registry.histogram(
+    'repository_call_duration_seconds', "Time spent in a repository method.", ('repository', 'method')
+)
+STATEMENT_SECONDS = registry.histogram(
+    'db_statement_duration_seconds', "Time spent executing a SQL statement, by statement shape.", ('statement',)
+)
+
+
+def _timed_method[**P, R](function: Callable[P, Awaitable[R]], name: str) -> Callable[P, Awaitable[R]]:
+    histograms: dict[type, Histogram] = {}
+
+    @wraps(function)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        start = perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            cls = type(args[0])
+            # `super()` calls reach the overridden wrappers too; only the outermost one records.
+            if getattr(cls, name) is wrapper:
+                histogram = histograms.get(cls)
+                if histogram is None:
+                    histogram = histograms[cls] = REPOSITORY_SECONDS.labels(cls.__name__, name)
+                histogram.observe(perf_counter() - start)
+    return wrapper
+
+
+def time_methods(cls: type) -> None:
+    """
+    Times every public, concrete coroutine method `cls` defines into `REPOSITORY_SECONDS`,
+    labelled with the class of the repository it is called on.
+    """
+    for name, attr in list(vars(cls).items()):
+        if (not name.startswith('_') and inspect.iscoroutinefunction(attr)
+                and not getattr(attr, '__isabstractmethod__', False)):
+            setattr(cls, name, _timed_method(attr, name))
+
+
+STATEMENTS_MAX = 1024
+_IN_LISTS = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)')
+_shapes: dict[str, Histogram] = {}
+# Raw statement text to its shape's histogram, so repeated statements skip the normalization.
+_statements: dict[str, Histogram] = {}
+
+def statement_histogram(statement: str) -> Histogram:
+    """
+    The histogram of a statement's shape: whitespace collapsed and expanded IN lists folded,
+    so `IN (?, ?)` and `IN (?, ?, ?)` share one. Shapes past `STATEMENTS_MAX` go to "other";
+    both caches stop growing at that size.
+    """
+    histogram = _statements.get(statement)
+    if histogram is not None:
+        return histogram
+    shape = _IN_LISTS.sub('(...)', ' '.join(statement.split()))
+    histogram = _shapes.get(shape)
+    if histogram is None:
+        if len(_shapes) < STATEMENTS_MAX:
+            histogram = _shapes[shape] = STATEMENT_SECONDS.labels(shape)
+        else:
+            histogram = STATEMENT_SECONDS.labels('other')
+    if len(_statements) < STATEMENTS_MAX:
+        _statements[statement] = histogram
+    return histogram
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request into `ROUTE_SECONDS` under its route's `name`."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        self.routes: dict[str, Histogram] = {}
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Set by the router on the shared scope once a route matched.
+            route = scope.get('route')
+            if route is not None:
+                histogram = self.routes.get(route.name)
+                if histogram is None:
+                    histogram = self.routes[route.name] = ROUTE_SECONDS.labels(route.name)
+                histogram.observe(perf_counter() - start)
@@ -1,8 +1,10 @@
 from app.exceptions import *
-from app.utils import OrderBy, Positive
+from app.utils import DateTrunc, OrderBy, Positive
 from sqlmodel import SQLModel as _SQLModel, Field as MappedColumn
-from pydantic import BaseModel as _BaseModel, ConfigDict, Field
-from typing import Any, Annotated, TypedDict, ClassVar
+from pydantic import BaseModel as _BaseModel, ConfigDict, Field, model_validator
+from sqlalchemy import Index, Integer, Numeric
+from collections.abc import Collection
+from typing import Any, Annotated, Literal, Self, TypedDict, ClassVar, get_args
 
 class BaseModel(_BaseModel):
     model_config: ClassVar[ConfigDict] = ConfigDict(from_attributes=True)
@@ -14,16 +16,60 @@ class SQLModel(_SQLModel, BaseModel):
     id: Annotated[int | None, MappedColumn(None, gt=0, primary_key=True)]
 
 
+def keyset_indexes(table: str, attrs: Any, exclude: Collection[str] = ()) -> tuple[Index, ...]:
+    """
+    An `(attr, id)` index per attribute of the `attrs` literal, matching the `(order_by, id)`
+    order and cursor comparison of `find`, so every page is an index range scan.
+    """
+    return tuple(
+        Index(f'ix_{table}_{attr}_id', attr, 'id') for attr in get_args(attrs) if attr != 'id' and attr not in exclude
+    )
+
+
 class FilterBy(TypedDict, total=False):
     ...
 
 
-class FindQuery[F: FilterBy, A: Any](BaseModel):
+class FilterQuery[F: FilterBy](BaseModel):
     filter_by: Annotated[F, Field(default_factory=dict)]
+
+
+class FindQuery[F: FilterBy, A: Any](FilterQuery[F]):
     order_by: Annotated[OrderBy[A], Field()]
     last: Annotated[tuple[Positive[int]] | tuple[Positive[int], Any] | None, Field(None)]
+    limit: Annotated[Positive[int] | None, Field(None)]
+
+
+type AggregateFunction = Literal['count', 'sum', 'avg', 'min', 'max']
+
+# Aggregate functions that only make sense over numeric columns.
+NUMERIC_AGGREGATES = frozenset({'sum', 'avg'})
+
+class AggregateQuery[F: FilterBy, A: Any](FilterQuery[F]):
+    # Table model of the entity, whose column types `sum` and `avg` are checked against.
+    model: ClassVar[type[SQLModel] | None] = None
+
+    group_by: Annotated[list[A], Field(default_factory=list)]
+    # Applied to the datetime columns of `group_by`.
+    date_trunc: Annotated[DateTrunc | None, Field(None)]
+    aggregates: Annotated[list[tuple[AggregateFunction, A]], Field(default_factory=lambda: [('count', 'id')])]
+
+    @model_validator(mode='after')
+    def _numeric_aggregates(self) -> Self:
+        if self.model is None:
+            return self
+        columns = self.model.__table__.columns
+        for function, attr in self.aggregates:
+            if function in NUMERIC_AGGREGATES and not (attr in columns and isinstance(columns[attr].type, (Integer, Numeric))):
+                raise ValueError(f"'{function}' needs a numeric attribute, got '{attr}'.")
+        return self
 
 
 class Page[T: Any, Q: FindQuery](BaseModel):
     next: Q
     data: list[T]
+
+
+class Batch[T: Any](BaseModel):
+    data: list[T]
+    missing: list[int]
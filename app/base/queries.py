@@ -0,0 +1,94 @@
+from app.base.metrics import statement_histogram
+from sqlalchemy import Engine, event
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+class QueryCount:
+    __slots__ = ('count', 'statements', 'parent')
+
+    def __init__(self, parent: 'QueryCount | None' = None) -> None:
+        self.count = 0
+        self.statements: list[str] = []
+        # The enclosing `count_queries()`, which counts the statements of this one too.
+        self.parent = parent
+
+
+# Counter of the innermost `count_queries()`; mutable, so threads and tasks copying the context add to it.
+_query_count: ContextVar[QueryCount | None] = ContextVar('_query_count', default=None)
+_slow_query_seconds: float | None = None
+
+def set_slow_query_threshold(seconds: float | None) -> None:
+    """Statements taking at least `seconds` are logged as warnings; None disables the log."""
+    global _slow_query_seconds
+    _slow_query_seconds = seconds
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCount]:
+    """Counts the statements executed inside the block, on any engine a repository listens to."""
+    counter = QueryCount(_query_count.get())
+    token = _query_count.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_count.reset(token)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """The types of bound parameters, never their values."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    context._query_start = perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    # The one timing of a statement, shared by the latency histogram, the counters and the slow-query log.
+    elapsed = perf_counter() - context._query_start
+    statement_histogram(statement).observe(elapsed)
+    counter = _query_count.get()
+    while counter is not None:
+        counter.count += 1
+        counter.statements.append(statement)
+        counter = counter.parent
+    if _slow_query_seconds is not None and elapsed >= _slow_query_seconds:
+        logger.warning("Slow query (%.1f ms): %s; parameters: %s",
+                       elapsed * 1000, statement, parameter_shape(parameters, executemany))
+
+
+def listen_queries(engine: Engine) -> None:
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class QueryCountMiddleware:
+    """ASGI middleware adding the number of statements a request ran as `X-Query-Count`."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        with count_queries() as counter:
+            async def send_with_count(message: dict[str, Any]) -> None:
+                if message['type'] == 'http.response.start':
+                    message = {**message, 'headers': [*message.get('headers', []), (b'x-query-count', str(counter.count).encode())]}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
@@ -1,30 +1,422 @@
 from sqlmodel.sql._expression_select_cls import SelectOfScalar
-from app.base.models import BaseModel, SQLModel, FindQuery, Page
+from app.base.models import BaseModel, SQLModel, AggregateFunction, AggregateQuery, FilterQuery, FindQuery, Page
 from app.base.common import SupportsModelPersistance
+from app.base.metrics import time_methods
+from app.base.queries import listen_queries
 from app.exceptions import *
-from app.utils import Positive
-from sqlalchemy import Engine, exc, text
+from app.utils import DateTrunc, Interval, Positive, RegEx, truncate_datetime
+from sqlalchemy import Column, Connection, DateTime, Engine, Insert, String, Update, Row, RowMapping, Select, TextClause, exc, text, insert, update, event, bindparam, func, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, ColumnElement, Executable, FunctionElement
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from sqlmodel import Session, select
-from typing import override
-from collections.abc import Generator
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Any, override
+from collections.abc import Callable, Generator, AsyncGenerator, Iterable, Sequence
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from itertools import batched
+from operator import gt, lt
+from datetime import datetime
+
+# Sessions of the active unit of work, keyed by engine. `None` outside of `unit_of_work()`.
+_scoped_sessions: ContextVar[dict[Engine | AsyncEngine, Session | AsyncSession] | None] = ContextVar('scoped_sessions', default=None)
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncGenerator[None]:
+    # The first repository call on an engine checks a session out of its pool, later calls on
+    # that engine reuse it, and every session is closed (connection returned) on exit.
+    sessions: dict[Engine | AsyncEngine, Session | AsyncSession] = {}
+    token = _scoped_sessions.set(sessions)
+    try:
+        yield
+    finally:
+        _scoped_sessions.reset(token)
+        for session in sessions.values():
+            if isinstance(session, AsyncSession):
+                await session.close()
+            else:
+                session.close()
+
+
+def _case_sensitive_like(dbapi_connection, connection_record) -> None:
+    # RegEx filters rewrite literal patterns to LIKE, which SQLite compares case-insensitively
+    # by default (and then skips indexes on the column).
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA case_sensitive_like = ON")
+    cursor.close()
+
+
+def _listen_sqlite(engine: Engine) -> None:
+    if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', _case_sensitive_like):
+        event.listen(engine, 'connect', _case_sensitive_like)
+
+
+class Explain(Executable, ClauseElement):
+    """
+    `EXPLAIN (FORMAT JSON)` of a statement; returns the planner's estimates without running it.
+    SQLite only has `EXPLAIN QUERY PLAN`, one row per step of the plan.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+@compiles(Explain, 'sqlite')
+def _compile_explain_sqlite(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN QUERY PLAN {compiler.process(element.statement, **kw)}"
+
+
+class DateTruncate(FunctionElement):
+    """`date_trunc(unit, column)`; SQLite spells it with datetime() modifiers."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(DateTruncate)
+def _compile_truncate(element: DateTruncate, compiler, **kw) -> str:
+    # The unit is inlined: a bound parameter would differ between SELECT and GROUP BY.
+    unit, column = element.clauses
+    return f"date_trunc('{unit.value}', {compiler.process(column, **kw)})"
+
+
+_SQLITE_TRUNCATE: dict[str, str] = {
+    'hour': "strftime('%Y-%m-%d %H:00:00', {})",
+    'day': "datetime({}, 'start of day')",
+    'week': "datetime({}, 'start of day', '-6 days', 'weekday 1')",
+    'month': "datetime({}, 'start of month')",
+    'year': "datetime({}, 'start of year')",
+}
+
+@compiles(DateTruncate, 'sqlite')
+def _compile_truncate_sqlite(element: DateTruncate, compiler, **kw) -> str:
+    unit, column = element.clauses
+    return _SQLITE_TRUNCATE[unit.value].format(compiler.process(column, **kw))
+
+
+# Plain filter values (e.g. booleans) compare for equality.
+def _filter_shape(value: Any) -> Any:
+    return value.shape() if isinstance(value, (RegEx, Interval)) else '='
+
+
+def _filter_params(value: Any, key: str) -> dict[str, Any]:
+    return value.params(key) if isinstance(value, (RegEx, Interval)) else {key: value}
+
+
+def _inject_filter[S: Select](stmt: S, value: Any, cls_attr: Any, key: str | None = None) -> S:
+    if isinstance(value, (RegEx, Interval)):
+        return value.inject(stmt, cls_attr, key)
+    return stmt.where(cls_attr == (value if key is None else bindparam(key)))
+
+
+# Distinct find statement shapes kept per repository before the cache starts over.
+FIND_PLANS_MAX = 256
+
+_AGGREGATES: dict[str, Callable[[list[Any]], Any]] = {
+    'count': len,
+    'sum': sum,
+    'avg': lambda values: sum(values) / len(values),
+    'min': min,
+    'max': max,
+}
+
+def _estimated_count(estimate: Any) -> int | None:
+    # Either `pg_class.reltuples` (-1 until the table is first analyzed) or an EXPLAIN plan.
+    if isinstance(estimate, list):
+        estimate = estimate[0]['Plan']['Plan Rows']
+    return int(estimate) if estimate is not None and estimate >= 0 else None
+
 
 class BaseRepository[Model: BaseModel, Query: FindQuery](SupportsModelPersistance[Model, Query]):
-    ...
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        time_methods(cls)
 
+    @override
+    async def add_many(self, models: Sequence[Model]) -> list[Model]:
+        return [await self.add(model) for model in models]
 
-class SQLRepository[Model: SQLModel, Query: FindQuery](BaseRepository):
-    def __init__(self, model: type[Model], engine: Engine, page_size_max: Positive[int]) -> None:
-        self.engine = engine
+    @override
+    async def upsert_many(self, models: Sequence[Model]) -> list[Model]:
+        return [await self.upsert(model) for model in models]
+
+    @override
+    async def count(self, query: FilterQuery, estimate: bool = False) -> int:
+        # Constructed, not validated: the bare `FilterBy` bound would strip the entity's filters.
+        query = FindQuery.model_construct(filter_by=query.filter_by, order_by=('id', 'asc'), last=None, limit=None)
+        count = 0
+        while page := await self.find(query):
+            count += len(page.data)
+            query = page.next
+        return count
+
+    @override
+    async def aggregate(self, query: AggregateQuery) -> list[dict[str, Any]]:
+        find = FindQuery.model_construct(filter_by=query.filter_by, order_by=('id', 'asc'), last=None, limit=None)
+        groups: dict[tuple, list[Model]] = {}
+        while page := await self.find(find):
+            for model in page.data:
+                key = tuple(
+                    truncate_datetime(value, query.date_trunc) if query.date_trunc and isinstance(value, datetime) else value
+                    for value in (getattr(model, attr) for attr in query.group_by)
+                )
+                groups.setdefault(key, []).append(model)
+            find = page.next
+        rows = []
+        for key in sorted(groups, key=lambda key: tuple((value is None, value) for value in key)):
+            row = dict(zip(query.group_by, key))
+            for function, attr in query.aggregates:
+                values = [value for model in groups[key] if (value := getattr(model, attr)) is not None]
+                row[f'{function}_{attr}'] = _AGGREGATES[function](values) if values or function == 'count' else None
+            rows.append(row)
+        return rows
+
+    @override
+    async def find_by_ids(self, ids: Sequence[Positive[int]]) -> list[Model | None]:
+        return [await self.find_by_id(id) for id in ids]
+
+    @override
+    async def project(self, query: Query, attrs: Sequence[str]) -> Page[dict[str, Any], Query] | None:
+        page = await self.find(query)
+        if not page:
+            return None
+        return Page[dict[str, Any], Query](
+            next=page.next,
+            data=[model.model_dump(include={'id', *attrs}) for model in page.data],
+        )
+
+    @override
+    async def project_by_id(self, id: Positive[int], attrs: Sequence[str]) -> dict[str, Any] | None:
+        model = await self.find_by_id(id)
+        return model.model_dump(include={'id', *attrs}) if model else None
+
+    @override
+    async def patch(self, id: Positive[int], **fields: Any) -> Model:
+        model = await self.find_by_id(id)
+        if not model:
+            raise EntityNotFound()
+        for field, value in fields.items():
+            setattr(model, field, value)
+        return await self.update(id, model)
+
+    @override
+    async def stream(self, attrs: Sequence[str] | None = None) -> AsyncGenerator[dict[str, Any]]:
+        query = FindQuery(order_by=('id', 'asc'))
+        while page := await (self.find(query) if attrs is None else self.project(query, attrs)):
+            for item in page.data:
+                yield item if attrs is not None else item.model_dump()
+            query = page.next
+
+
+class BaseSQLRepository[Model: SQLModel, Query: FindQuery](BaseRepository):
+    def __init__(self, model: type[Model], page_size_max: Positive[int], batch_size: Positive[int] = 1000,
+                 page_size_default: Positive[int] | None = None) -> None:
         self.page_size_max = page_size_max
+        # Page size of a query without a `limit`; a `limit` above `page_size_max` is capped.
+        self.page_size_default = min(page_size_default or page_size_max, page_size_max)
+        self.batch_size = batch_size
         self.model = model
+        self._find_plans: dict[tuple, SelectOfScalar[Model] | Select] = {}
+
+    def _page_size(self, query: Query) -> int:
+        return min(query.limit or self.page_size_default, self.page_size_max)
+
+    def _rows(self, models: Sequence[Model]) -> list[dict]:
+        return [model.model_dump(exclude={'id'} if model.id is None else set()) for model in models]
+
+    def _insert_statement(self) -> Insert:
+        return insert(self.model).returning(self.model, sort_by_parameter_order=True)
+
+    def _upsert_statement(self, dialect: str) -> Insert:
+        match dialect:
+            case 'postgresql':
+                stmt = postgresql.insert(self.model)
+            case 'sqlite':
+                stmt = sqlite.insert(self.model)
+            case _:
+                raise NotImplementedError(f"Bulk upsert is not supported on '{dialect}'.")
+        updated = [column.name for column in self.model.__table__.columns if column.name not in {'id', 'created_at'}]
+        return stmt.on_conflict_do_update(
+            index_elements=['id'],
+            set_={column: stmt.excluded[column] for column in updated},
+        ).returning(self.model, sort_by_parameter_order=True)
+
+    def _patch_statement(self, id: Positive[int], fields: dict[str, Any]) -> Update:
+        if 'updated_at' in self.model.__table__.columns:
+            fields = {**fields, 'updated_at': datetime.now()}
+        return update(self.model).where(self.model.id == id).values(fields).returning(self.model)
+
+    def _ids_statements(self, ids: Sequence[Positive[int]]) -> Generator[SelectOfScalar[Model]]:
+        for chunk in batched(dict.fromkeys(ids), self.batch_size):
+            yield select(self.model).where(self.model.id.in_(chunk))
+
+    def _align(self, ids: Sequence[Positive[int]], models: Iterable[Model]) -> list[Model | None]:
+        by_id = {model.id: model for model in models}
+        return [by_id.get(id) for id in ids]
+
+    def _columns(self, attrs: Iterable[str]) -> list[Column]:
+        return [self.model.__table__.columns[attr] for attr in dict.fromkeys(['id', *attrs])]
+
+    def _projection_statement(self, id: Positive[int], attrs: Sequence[str]) -> Select:
+        return sa_select(*self._columns(attrs)).where(self.model.id == id)
+
+    def _filter[S: Select](self, stmt: S, filter_by: dict[str, Any]) -> S:
+        for attr, f_value in filter_by.items():
+            stmt = _inject_filter(stmt, f_value, getattr(self.model, attr))
+        return stmt
+
+    def _count_statement(self, query: FilterQuery) -> Select:
+        return self._filter(sa_select(func.count()).select_from(self.model), query.filter_by)
+
+    def _estimate_statement(self, query: FilterQuery) -> Executable:
+        # Postgres only: table statistics when unfiltered, the planner's row estimate otherwise.
+        if not query.filter_by:
+            return sa_select(text('reltuples')).select_from(text('pg_class')).where(
+                text('oid = CAST(:table AS regclass)').bindparams(table=self.model.__tablename__)
+            )
+        return Explain(self._filter(sa_select(self.model.id), query.filter_by))
+
+    def _group_column(self, attr: str, date_trunc: DateTrunc | None) -> ColumnElement:
+        column = self.model.__table__.columns[attr]
+        if date_trunc and isinstance(column.type, DateTime):
+            return DateTruncate(date_trunc, column)
+        return column
+
+    def _aggregate_statement(self, query: AggregateQuery) -> Select:
+        columns = self.model.__table__.columns
+        groups = [self._group_column(attr, query.date_trunc).label(attr) for attr in query.group_by]
+        measures = [getattr(func, function)(columns[attr]).label(f'{function}_{attr}') for function, attr in query.aggregates]
+        stmt = self._filter(sa_select(*groups, *measures).select_from(self.model), query.filter_by)
+        return stmt.group_by(*groups).order_by(*groups)
+
+    def _stream_statement(self, attrs: Sequence[str] | None) -> Select:
+        columns = self.model.__table__.columns if attrs is None else self._columns(attrs)
+        return sa_select(*columns).order_by(self.model.id).execution_options(yield_per=self.batch_size)
+
+    def _find_statement(self, query: Query, attrs: Sequence[str] | None = None) -> SelectOfScalar[Model] | Select:
+        """
+        The statement shared by every query with the same filters, filter shapes, ordering, cursor
+        length and projection; its values are bound parameters supplied by `_find_params`.
+        """
+        assert isinstance(query, FindQuery), "Invalid query type."
+        key = (
+            tuple((attr, _filter_shape(value)) for attr, value in query.filter_by.items()),
+            tuple(query.order_by),
+            len(query.last or ()),
+            None if attrs is None else tuple(attrs),
+        )
+        stmt = self._find_plans.get(key)
+        if stmt is None:
+            if len(self._find_plans) >= FIND_PLANS_MAX:
+                self._find_plans.clear()
+            stmt = self._find_plans[key] = self._plan_find_statement(query, attrs)
+        return stmt
+
+    def _find_params(self, query: Query) -> dict[str, Any]:
+        params: dict[str, Any] = {'page_size': self._page_size(query)}
+        for attr, value in query.filter_by.items():
+            params |= _filter_params(value, f'filter_{attr}')
+        if query.last:
+            params['last_id'] = query.last[0]
+            if len(query.last) == 2:
+                params['last_value'] = query.last[1]
+        return params
+
+    def _plan_find_statement(self, query: Query, attrs: Sequence[str] | None) -> SelectOfScalar[Model] | Select:
+        filter_by, order_by, last_retrieved = query.filter_by, query.order_by, query.last
+        # A projection still selects the ordering column, which the next page's cursor is built from.
+        stmt = select(self.model) if attrs is None else sa_select(*self._columns([*attrs, order_by[0]]))
+        stmt = stmt.limit(bindparam('page_size'))
+
+        for attr, f_value in filter_by.items():
+            stmt = _inject_filter(stmt, f_value, getattr(self.model, attr), f'filter_{attr}')
+
+        if last_retrieved:
+            # `(col, id) > (:last_value, :last_id)` is a single range over the `(col, id)` index.
+            operator = gt if order_by[1] == 'asc' else lt
+            column, last_id = getattr(self.model, order_by[0]), bindparam('last_id')
+            if order_by[0] != 'id' and len(last_retrieved) == 2:
+                # Row values don't pass the column type on to their parameters.
+                last_value = bindparam('last_value', type_=column.type)
+                stmt = stmt.where(operator(tuple_(column, self.model.id), tuple_(last_value, last_id)))
+            elif len(last_retrieved) == 1:
+                stmt = stmt.where(operator(self.model.id, last_id))
+
+        for attr in [order_by[0], 'id'] if order_by[0] != 'id' else ['id']:
+            stmt = stmt.order_by(getattr(getattr(self.model, attr), order_by[1])())
+
+        return stmt
+
+    def _advance(self, query: Query, last: Model | Row) -> Query:
+        order_by = query.order_by
+        if order_by[0] != 'id':
+            query.last = last.id, getattr(last, order_by[0])
+        else:
+            query.last = last.id,
+        return query
+
+    def _page(self, query: Query, models: list[Model]) -> Page[Model, Query] | None:
+        if not models:
+            return None
+
+        return Page[Model, Query](
+            next=self._advance(query, models[-1]),
+            data=models,
+        )
+
+    def _projected_page(self, query: Query, rows: list[Row], attrs: Sequence[str]) -> Page[dict[str, Any], Query] | None:
+        if not rows:
+            return None
+
+        keys = dict.fromkeys(['id', *attrs])
+        return Page[dict[str, Any], Query](
+            next=self._advance(query, rows[-1]),
+            data=[{key: row._mapping[key] for key in keys} for row in rows],
+        )
+
+
+class SQLRepository[Model: SQLModel, Query: FindQuery](BaseSQLRepository[Model, Query]):
+    def __init__(self, model: type[Model], engine: Engine, page_size_max: Positive[int],
+                 page_size_default: Positive[int] | None = None) -> None:
+        super().__init__(model, page_size_max, page_size_default=page_size_default)
+        self.engine = engine
+        _listen_sqlite(engine)
+        listen_queries(engine)
 
         self.model.__table__.create(engine, checkfirst=True)
 
         self.session_generator = self.get_session_generator()
-        self.session = next(self.session_generator)
+        self._session = next(self.session_generator)
+
+    @property
+    def session(self) -> Session:
+        sessions = _scoped_sessions.get()
+        if sessions is None:
+            return self._session
+        session = sessions.get(self.engine)
+        if session is None:
+            session = sessions[self.engine] = Session(self.engine, expire_on_commit=False)
+        assert isinstance(session, Session)
+        return session
+
+    def commit(self) -> None:
+        try:
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
 
     def get_session_generator(self) -> Generator[Session]:
-        session: Session = Session(self.engine)
+        session: Session = Session(self.engine, expire_on_commit=False)
         try:
             yield session
         except exc.TimeoutError:
@@ -39,56 +431,76 @@ class SQLRepository[Model: SQLModel, Query: FindQuery](BaseRepository):
             raise EntityAlreadyExists()
         return await self.upsert(model)
 
+    @override
+    async def add_many(self, models: Sequence[Model]) -> list[Model]:
+        ids = [model.id for model in models if model.id]
+        if ids and self.session.exec(select(self.model.id).where(self.model.id.in_(ids))).first():
+            raise EntityAlreadyExists()
+        return self._execute_many(self._insert_statement(), models)
+
+    @override
+    async def upsert_many(self, models: Sequence[Model]) -> list[Model]:
+        return self._execute_many(self._upsert_statement(self.engine.dialect.name), models)
+
+    def _execute_many(self, stmt: Insert, models: Sequence[Model]) -> list[Model]:
+        persisted: list[Model] = []
+        try:
+            for chunk in batched(models, self.batch_size):
+                persisted.extend(self.session.scalars(stmt, self._rows(chunk), execution_options={'populate_existing': True}))
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return persisted
+
     @override
     async def find_by_id(self, id: Positive[int]) -> Model | None:
         return self.session.get(self.model, id)
 
     @override
     async def find(self, query: Query) -> Page[Model, Query] | None:
-        assert isinstance(query, FindQuery), "Invalid query type."
-        filter_by, order_by, last_retrieved = query.filter_by, query.order_by, query.last
-        stmt: SelectOfScalar[type[Model]] = select(self.model).limit(self.page_size_max)
-
-        for attr, f_value in filter_by.items():
-            stmt = f_value.inject(stmt, getattr(self.model, attr))
+        models: list[Model] = list(self.session.exec(self._find_statement(query), params=self._find_params(query)).all())
+        return self._page(query, models)
 
-        if last_retrieved:
-            if order_by[1] == 'asc':
-                if order_by[0] != 'id' and len(last_retrieved) == 2:
-                    stmt = stmt.where(
-                        (getattr(self.model, order_by[0]) > last_retrieved[1]) |
-                        ((getattr(self.model, order_by[0]) == last_retrieved[1]) &
-                            (self.model.id > last_retrieved[0]))
-                    )
-                elif len(last_retrieved) == 1:
-                    stmt = stmt.where(self.model.id > last_retrieved[0])
-            else:
-                if order_by[0] != 'id':
-                    stmt = stmt.where(
-                        (getattr(self.model, order_by[0]) < last_retrieved[1]) |
-                        ((getattr(self.model, order_by[0]) == last_retrieved[1]) &
-                            (self.model.id < last_retrieved[0]))
-                    )
-                elif len(last_retrieved) == 1:
-                    stmt = stmt.where(self.model.id < last_retrieved[0])
+    @override
+    async def count(self, query: FilterQuery, estimate: bool = False) -> int:
+        if estimate and self.engine.dialect.name == 'postgresql':
+            counted = _estimated_count(self.session.exec(self._estimate_statement(query)).scalar())
+            if counted is not None:
+                return counted
+        return self.session.exec(self._count_statement(query)).scalar_one()
 
-        for attr in [order_by[0], 'id'] if order_by[0] != 'id' else ['id']:
-            stmt = stmt.order_by(getattr(getattr(self.model, attr), order_by[1])())
+    @override
+    async def aggregate(self, query: AggregateQuery) -> list[dict[str, Any]]:
+        return [dict(row._mapping) for row in self.session.exec(self._aggregate_statement(query))]
 
-        models: list[Model] = self.session.exec(stmt).all()
+    @override
+    async def find_by_ids(self, ids: Sequence[Positive[int]]) -> list[Model | None]:
+        return self._align(ids, (model for stmt in self._ids_statements(ids) for model in self.session.exec(stmt)))
 
-        if not models:
-            return None
+    @override
+    async def project(self, query: Query, attrs: Sequence[str]) -> Page[dict[str, Any], Query] | None:
+        rows = list(self.session.exec(self._find_statement(query, attrs), params=self._find_params(query)).all())
+        return self._projected_page(query, rows, attrs)
 
-        if order_by[0] != 'id':
-            query.last = models[-1].id, getattr(models[-1], order_by[0])
-        else:
-            query.last = models[-1].id,
+    @override
+    async def project_by_id(self, id: Positive[int], attrs: Sequence[str]) -> dict[str, Any] | None:
+        row = self.session.exec(self._projection_statement(id, attrs)).first()
+        return dict(row._mapping) if row else None
 
-        return Page[Model, Query](
-            next=query,
-            data=models,
-        )
+    @override
+    async def stream(self, attrs: Sequence[str] | None = None) -> AsyncGenerator[dict[str, Any]]:
+        # A connection of its own: the export outlives the request's unit of work, and
+        # `yield_per` keeps one server-side cursor open while fetching `batch_size` rows at a time.
+        # The driver blocks, so connecting and every fetch run in the threadpool, off the event loop.
+        conn = await run_in_threadpool(self.engine.connect)
+        try:
+            result = await run_in_threadpool(conn.execute, self._stream_statement(attrs))
+            async for partition in iterate_in_threadpool(result.mappings().partitions()):
+                for row in partition:
+                    yield dict(row)
+        finally:
+            await run_in_threadpool(conn.close)
 
     @override
     async def update(self, id: Positive[int], model: Model) -> Model:
@@ -99,114 +511,296 @@ class SQLRepository[Model: SQLModel, Query: FindQuery](BaseRepository):
             setattr(existing, field, value)
         return await self.upsert(existing)
 
+    @override
+    async def patch(self, id: Positive[int], **fields: Any) -> Model:
+        try:
+            model = self.session.scalars(self._patch_statement(id, fields), execution_options={'populate_existing': True}).one_or_none()
+            if model is None:
+                raise EntityNotFound()
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return model
+
     @override
     async def delete(self, id: Positive[int]) -> Model:
         stored_model: Model | None = self.session.get(self.model, id)
         if stored_model:
             self.session.delete(stored_model)
-            self.session.commit()
+            self.commit()
             return stored_model
         raise EntityNotFound()
 
     @override
     async def upsert(self, model: Model) -> Model:
         self.session.add(model)
-        self.session.commit()
+        self.commit()
         self.session.refresh(model)
         return model
 
 
+class AsyncSQLRepository[Model: SQLModel, Query: FindQuery](BaseSQLRepository[Model, Query]):
+    # Each call checks its own AsyncSession out of the engine pool: an AsyncSession
+    # must never be shared between concurrently running tasks.
+    def __init__(self, model: type[Model], engine: AsyncEngine, page_size_max: Positive[int],
+                 page_size_default: Positive[int] | None = None) -> None:
+        super().__init__(model, page_size_max, page_size_default=page_size_default)
+        self.engine = engine
+        _listen_sqlite(engine.sync_engine)
+        listen_queries(engine.sync_engine)
+        self._table_created = False
+
+    async def create_table(self) -> None:
+        if self._table_created:
+            return
+        async with self.engine.begin() as conn:
+            await conn.run_sync(self.model.__table__.create, checkfirst=True)
+        self._table_created = True
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncGenerator[AsyncSession]:
+        await self.create_table()
+        sessions = _scoped_sessions.get()
+        session = sessions.get(self.engine) if sessions is not None else None
+        if session is None:
+            session = AsyncSession(self.engine, expire_on_commit=False)
+            if sessions is not None:
+                sessions[self.engine] = session
+        assert isinstance(session, AsyncSession)
+        try:
+            yield session
+        except exc.TimeoutError:
+            await session.rollback()
+            raise ConnectionTimeout()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            if sessions is None:
+                await session.close()
+
+    @override
+    async def add(self, model: Model) -> Model:
+        if model.id and await self.find_by_id(model.id):
+            raise EntityAlreadyExists()
+        return await self.upsert(model)
+
+    @override
+    async def add_many(self, models: Sequence[Model]) -> list[Model]:
+        ids = [model.id for model in models if model.id]
+        if ids:
+            async with self.get_session() as session:
+                if (await session.exec(select(self.model.id).where(self.model.id.in_(ids)))).first():
+                    raise EntityAlreadyExists()
+        return await self._execute_many(self._insert_statement(), models)
+
+    @override
+    async def upsert_many(self, models: Sequence[Model]) -> list[Model]:
+        return await self._execute_many(self._upsert_statement(self.engine.dialect.name), models)
+
+    async def _execute_many(self, stmt: Insert, models: Sequence[Model]) -> list[Model]:
+        persisted: list[Model] = []
+        async with self.get_session() as session:
+            for chunk in batched(models, self.batch_size):
+                persisted.extend((await session.exec(stmt, params=self._rows(chunk), execution_options={'populate_existing': True})).scalars())
+            await session.commit()
+        return persisted
+
+    @override
+    async def find_by_id(self, id: Positive[int]) -> Model | None:
+        async with self.get_session() as session:
+            return await session.get(self.model, id)
+
+    @override
+    async def find(self, query: Query) -> Page[Model, Query] | None:
+        async with self.get_session() as session:
+            models: list[Model] = list((await session.exec(self._find_statement(query), params=self._find_params(query))).all())
+        return self._page(query, models)
+
+    @override
+    async def count(self, query: FilterQuery, estimate: bool = False) -> int:
+        async with self.get_session() as session:
+            if estimate and self.engine.dialect.name == 'postgresql':
+                counted = _estimated_count((await session.exec(self._estimate_statement(query))).scalar())
+                if counted is not None:
+                    return counted
+            return (await session.exec(self._count_statement(query))).scalar_one()
+
+    @override
+    async def aggregate(self, query: AggregateQuery) -> list[dict[str, Any]]:
+        async with self.get_session() as session:
+            return [dict(row._mapping) for row in await session.exec(self._aggregate_statement(query))]
+
+    @override
+    async def find_by_ids(self, ids: Sequence[Positive[int]]) -> list[Model | None]:
+        models: list[Model] = []
+        async with self.get_session() as session:
+            for stmt in self._ids_statements(ids):
+                models.extend((await session.exec(stmt)).all())
+        return self._align(ids, models)
+
+    @override
+    async def project(self, query: Query, attrs: Sequence[str]) -> Page[dict[str, Any], Query] | None:
+        async with self.get_session() as session:
+            rows = list((await session.exec(self._find_statement(query, attrs), params=self._find_params(query))).all())
+        return self._projected_page(query, rows, attrs)
+
+    @override
+    async def project_by_id(self, id: Positive[int], attrs: Sequence[str]) -> dict[str, Any] | None:
+        async with self.get_session() as session:
+            row = (await session.exec(self._projection_statement(id, attrs))).first()
+        return dict(row._mapping) if row else None
+
+    @override
+    async def stream(self, attrs: Sequence[str] | None = None) -> AsyncGenerator[dict[str, Any]]:
+        await self.create_table()
+        async with self.engine.connect() as conn:
+            result = await conn.stream(self._stream_statement(attrs))
+            async for partition in result.mappings().partitions():
+                for row in partition:
+                    yield dict(row)
+
+    @override
+    async def update(self, id: Positive[int], model: Model) -> Model:
+        async with self.get_session() as session:
+            existing: Model | None = await session.get(self.model, id)
+            if not existing:
+                raise EntityNotFound()
+            for field, value in model.model_dump(exclude={'id', 'created_at', 'updated_at'}, exclude_unset=True).items():
+                setattr(existing, field, value)
+            await session.commit()
+            await session.refresh(existing)
+            return existing
+
+    @override
+    async def patch(self, id: Positive[int], **fields: Any) -> Model:
+        async with self.get_session() as session:
+            model = (await session.exec(self._patch_statement(id, fields), execution_options={'populate_existing': True})).scalars().one_or_none()
+            if model is None:
+                raise EntityNotFound()
+            await session.commit()
+            return model
+
+    @override
+    async def delete(self, id: Positive[int]) -> Model:
+        async with self.get_session() as session:
+            stored_model: Model | None = await session.get(self.model, id)
+            if stored_model:
+                await session.delete(stored_model)
+                await session.commit()
+                return stored_model
+            raise EntityNotFound()
+
+    @override
+    async def upsert(self, model: Model) -> Model:
+        async with self.get_session() as session:
+            session.add(model)
+            await session.commit()
+            await session.refresh(model)
+            return model
+
+
 class ProcSQLRepository[Model: SQLModel, Query: FindQuery](BaseRepository):
-    def __init__(self, model: type[Model], engine: Engine, page_size_max: Positive[int]):
+    def __init__(self, model: type[Model], engine: Engine, page_size_max: Positive[int],
+                 page_size_default: Positive[int] | None = None, prepare_threshold: int | None = 0):
         self.engine = engine
+        # Applied to psycopg connections only while they run a procedure, so the rest of the
+        # engine's statements keep the engine-wide `prepare_threshold`.
+        self.prepare_threshold = prepare_threshold
+        listen_queries(engine)
         self.model = model
         self.page_size_max = page_size_max
+        self.page_size_default = min(page_size_default or page_size_max, page_size_max)
+        self._statements: dict[tuple[str, tuple[str, ...]], TextClause] = {}
 
     def _proc_name(self, verb: str) -> str:
-        return f"{verb}{self.model.__name__}"
+        return f"{verb}{self.model.__name__.removesuffix('Model')}"
+
+    def _statement(self, verb: str, params: Iterable[str]) -> TextClause:
+        # Built once per (verb, argument names). Named notation lets the procedure defaults fill
+        # whatever is left out, and the stable SQL text is what psycopg keys its prepared statements on.
+        key = verb, tuple(params)
+        if (stmt := self._statements.get(key)) is None:
+            args = ', '.join(f"p_{param} => :{param}" for param in key[1])
+            stmt = text(f"SELECT * FROM {self._proc_name(verb)}({args})")
+            if 'filter' in key[1]:
+                stmt = stmt.bindparams(bindparam('filter', type_=postgresql.JSONB))
+            if 'nulls' in key[1]:
+                stmt = stmt.bindparams(bindparam('nulls', type_=postgresql.ARRAY(String)))
+            self._statements[key] = stmt
+        return stmt
+
+    def _call(self, verb: str, params: dict[str, Any], write: bool = False) -> list[RowMapping]:
+        # Parameters left out take the procedure's default; a None is passed on as NULL.
+        with self.engine.begin() if write else self.engine.connect() as conn, self._prepared(conn):
+            return list(conn.execute(self._statement(verb, params), params).mappings())
+
+    @contextmanager
+    def _prepared(self, conn: Connection) -> Generator[None]:
+        if conn.dialect.driver != 'psycopg':
+            yield
+            return
+        driver_connection = conn.connection.driver_connection
+        previous = driver_connection.prepare_threshold
+        driver_connection.prepare_threshold = self.prepare_threshold
+        try:
+            yield
+        finally:
+            driver_connection.prepare_threshold = previous
+
+    @staticmethod
+    def _set_params(params: dict[str, Any]) -> dict[str, Any]:
+        """Arguments of Update/Upsert: the procedures keep a column on NULL, so NULLs are named in `nulls`."""
+        return {
+            **{name: value for name, value in params.items() if value is not None},
+            'nulls': [name for name, value in params.items() if value is None],
+        }
 
     @override
     async def add(self, model: Model) -> Model:
         if model.id:
             raise EntityAlreadyExists()
-        
-        proc = self._proc_name('Create')
-        # Extract model data excluding id
-        model_data = model.model_dump(exclude={'id'})
-        
-        # Build parameter list dynamically
-        param_names = [f"p_{field}" for field in model_data.keys()]
-        param_placeholders = [f":{param}" for param in param_names]
-        
-        with self.engine.connect() as conn:
-            result = conn.execute(text(f"CALL {proc}({', '.join(param_placeholders)})"), model_data)
-            row = result.mappings().fetchone()
-            if not row:
-                raise EntityNotFound()
-            return self.model(**row)
+
+        rows = self._call('Create', model.model_dump(exclude={'id'}), write=True)
+        if not rows:
+            raise EntityNotFound()
+        return self.model(**rows[0])
 
     @override
     async def update(self, id: Positive[int], model: Model) -> Model:
-        proc = self._proc_name('Update')
-        # Extract model data excluding id, created_at, updated_at
-        model_data = model.model_dump(exclude={'id', 'created_at', 'updated_at'}, exclude_unset=True)
-        model_data['p_id'] = id
-        
-        # Build parameter list dynamically
-        param_names = ['p_id'] + [f"p_{field}" for field in model.model_dump(exclude={'id'}).keys()]
-        param_placeholders = [f":{param}" for param in param_names]
-        
-        with self.engine.connect() as conn:
-            result = conn.execute(text(f"CALL {proc}({', '.join(param_placeholders)})"), model_data)
-            row = result.mappings().fetchone()
-            if not row:
-                raise EntityNotFound()
-            return self.model(**row)
+        params = model.model_dump(exclude={'id', 'created_at', 'updated_at'}, exclude_unset=True)
+        rows = self._call('Update', {'id': id, **self._set_params(params)}, write=True)
+        if not rows:
+            raise EntityNotFound()
+        return self.model(**rows[0])
 
     @override
     async def delete(self, id: Positive[int]) -> Model:
-        proc = self._proc_name('Delete')
-        with self.engine.connect() as conn:
-            result = conn.execute(text(f"CALL {proc}(:p_id)"), {'p_id': id})
-            row = result.mappings().fetchone()
-            if not row:
-                raise EntityNotFound()
-            return self.model(**row)
+        rows = self._call('Delete', {'id': id}, write=True)
+        if not rows:
+            raise EntityNotFound()
+        return self.model(**rows[0])
 
     @override
     async def upsert(self, model: Model) -> Model:
-        proc = self._proc_name('Upsert')
-        # Extract model data including id
-        model_data = model.model_dump()
-        
-        # Build parameter list dynamically
-        param_names = [f"p_{field}" for field in model_data.keys()]
-        param_placeholders = [f":{param}" for param in param_names]
-        
-        with self.engine.connect() as conn:
-            result = conn.execute(text(f"CALL {proc}({', '.join(param_placeholders)})"), model_data)
-            row = result.mappings().fetchone()
-            if not row:
-                raise EntityNotFound()
-            return self.model(**row)
+        params = model.model_dump(exclude={'id'}, exclude_unset=True)
+        rows = self._call('Upsert', {'id': model.id, **self._set_params(params)}, write=True)
+        if not rows:
+            raise EntityNotFound()
+        return self.model(**rows[0])
 
     @override
     async def find_by_id(self, id: Positive[int]) -> Model | None:
-        proc = self._proc_name('FindOne')
-        with self.engine.connect() as conn:
-            result = conn.execute(text(f"CALL {proc}(:p_id)"), {'p_id': id})
-            row = result.mappings().fetchone()
-            return self.model(**row) if row else None
+        rows = self._call('FindOne', {'id': id})
+        return self.model(**rows[0]) if rows else None
 
     @override
     async def find(self, query: Query) -> Page[Model, Query] | None:
-        proc = self._proc_name('Find')
-        
-        # Extract order_by and last from query
         order_by_column, order_by_direction = query.order_by
         last_id = None
         last_value = None
-        
+
         if query.last:
             if len(query.last) == 1:
                 last_id = query.last[0]
@@ -214,27 +808,26 @@ class ProcSQLRepository[Model: SQLModel, Query: FindQuery](BaseRepository):
                 last_id, last_value = query.last
 
         params = {
-            'p_order_by_column': order_by_column,
-            'p_order_by_direction': order_by_direction,
-            'p_last_id': last_id,
-            'p_last_value': last_value,
-            'p_limit': self.page_size_max
+            'order_by_column': order_by_column,
+            'order_by_direction': order_by_direction.upper(),
+            'last_id': last_id,
+            'last_value': last_value,
+            'limit': min(query.limit or self.page_size_default, self.page_size_max),
+            # Intervals and regexes are compiled into a parameterized WHERE clause by the procedure.
+            'filter': query.model_dump(mode='json', include={'filter_by'})['filter_by'] or None,
         }
-        
-        with self.engine.connect() as conn:
-            result = conn.execute(text(f"CALL {proc}(:p_order_by_column, :p_order_by_direction, :p_last_id, :p_last_value, :p_limit)"), params)
-            rows = result.mappings().fetchall()
-            models = [self.model(**row) for row in rows]
-            
-            if not models:
-                return None
-            
-            if order_by_column != 'id':
-                query.last = models[-1].id, getattr(models[-1], order_by_column)
-            else:
-                query.last = (models[-1].id,)
-            
-            return Page[Model, Query](
-                next=query,
-                data=models,
-            )
+        rows = self._call('Find', {name: value for name, value in params.items() if value is not None})
+        models = [self.model(**row) for row in rows]
+
+        if not models:
+            return None
+
+        if order_by_column != 'id':
+            query.last = models[-1].id, getattr(models[-1], order_by_column)
+        else:
+            query.last = (models[-1].id,)
+
+        return Page[Model, Query](
+            next=query,
+            data=models,
+        )
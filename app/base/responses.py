@@ -0,0 +1,21 @@
+from fastapi import Response, status
+from pydantic import TypeAdapter
+from functools import cache
+from typing import Any
+
+@cache
+def _adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+def serialized_response(type_: Any, value: Any, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    `value` validated once into `type_` (from attributes, so ORM models and pages of them go in
+    as they are) and dumped to JSON bytes by pydantic-core. The route's declared return type
+    only documents the response in OpenAPI: FastAPI sends a returned `Response` as it is, so
+    `dump_json` does the serialization and the body is neither validated again nor run through
+    `jsonable_encoder`.
+    """
+    adapter = _adapter(type_)
+    return Response(adapter.dump_json(adapter.validate_python(value, from_attributes=True)),
+                    status_code, media_type='application/json')
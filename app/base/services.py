@@ -1,7 +1,9 @@
 from app.base.repositories import BaseRepository, FindQuery
 from app.base.models import BaseModel
-from app.base.models import Page
+from app.base.models import AggregateQuery, FilterQuery, Page
 from app.utils import Positive
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
 from abc import ABC
 
 class BaseService[Model: BaseModel, Repository: BaseRepository, Query: FindQuery](ABC):
@@ -11,17 +13,44 @@ class BaseService[Model: BaseModel, Repository: BaseRepository, Query: FindQuery
     async def add(self, model: Model) -> Model:
         return await self.repo.add(model)
 
+    async def add_many(self, models: Sequence[Model]) -> list[Model]:
+        return await self.repo.add_many(models)
+
     async def find(self, query: FindQuery) -> Page[Model, Query] | None:
         return await self.repo.find(query)
 
+    async def count(self, query: FilterQuery, estimate: bool = False) -> int:
+        return await self.repo.count(query, estimate)
+
+    async def aggregate(self, query: AggregateQuery) -> list[dict[str, Any]]:
+        return await self.repo.aggregate(query)
+
     async def find_by_id(self, id: Positive[int]) -> Model | None:
         return await self.repo.find_by_id(id)
 
+    async def find_by_ids(self, ids: Sequence[Positive[int]]) -> list[Model | None]:
+        return await self.repo.find_by_ids(ids)
+
+    async def project(self, query: FindQuery, attrs: Sequence[str]) -> Page[dict[str, Any], Query] | None:
+        return await self.repo.project(query, attrs)
+
+    async def project_by_id(self, id: Positive[int], attrs: Sequence[str]) -> dict[str, Any] | None:
+        return await self.repo.project_by_id(id, attrs)
+
+    def stream(self, attrs: Sequence[str] | None = None) -> AsyncIterator[dict[str, Any]]:
+        return self.repo.stream(attrs)
+
     async def update(self, id: Positive[int], model: Model) -> Model:
         return await self.repo.update(id, model)
 
+    async def patch(self, id: Positive[int], **fields: Any) -> Model:
+        return await self.repo.patch(id, **fields)
+
     async def delete(self, id: Positive[int]) -> Model:
         return await self.repo.delete(id)
 
     async def upsert(self, model: Model) -> Model:
         return await self.repo.upsert(model)
+
+    async def upsert_many(self, models: Sequence[Model]) -> list[Model]:
+        return await self.repo.upsert_many(models)
@@ -10,5 +10,26 @@ class Settings(BaseSettings):
     supabase_url: str
     pw_prefix: str
 
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # psycopg prepares a statement server-side after this many executions on a connection; None
+    # never prepares, which transaction-mode poolers (Supabase's included) require.
+    db_prepare_threshold: int | None = None
+
+    # Rows per `find` page when the query sets no `limit`, and the cap on any `limit`.
+    page_size_default: int = 64
+    page_size_max: int = 5000
+
+    cache_max_entries: int = 1024
+    cache_ttl: float = 60.0
+
+    # Adds the `X-Query-Count` header to every response.
+    debug: bool = False
+    # Statements at least this slow are logged with their parameter types; None disables the log.
+    slow_query_ms: float | None = 200.0
+
 
 settings = Settings()
@@ -1,12 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.requests import Request
+from app.base.database import session_scope
+from app.base.cache import CachedRepository
+from app.base.metrics import MetricsMiddleware, registry
+from app.base.queries import QueryCountMiddleware, set_slow_query_threshold
+from app.config import settings
 from app.medicine.repositories import InMemoryMedicineRepository
 from app.medicine.services import MedicineService
 from app.medicine.routers import MedicineRouter
+from app.schedule.repositories import InMemoryScheduleCycleRepository
+from app.schedule.services import ScheduleCycleService
+from app.schedule.routers import ScheduleRouter
 
 class MedicalOfficeAPI(FastAPI):
     def __init__(self) -> None:
-        super().__init__()
+        super().__init__(dependencies=[Depends(session_scope)])
 
         self.add_middleware(
             CORSMiddleware,
@@ -15,11 +25,28 @@ class MedicalOfficeAPI(FastAPI):
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        self.add_middleware(MetricsMiddleware)
+        if settings.debug:
+            self.add_middleware(QueryCountMiddleware)
+        set_slow_query_threshold(None if settings.slow_query_ms is None else settings.slow_query_ms / 1000)
+        # Starlette route: scraping skips the request dependencies of the API routes.
+        self.add_route('/metrics', self.metrics, include_in_schema=False)
 
-        medicine_repository = InMemoryMedicineRepository()
+        medicine_repository = CachedRepository(
+            InMemoryMedicineRepository(),
+            max_entries=settings.cache_max_entries,
+            ttl=settings.cache_ttl,
+        )
         medicine_service_factory = lambda: MedicineService(medicine_repository)
 
+        schedule_cycle_repository = InMemoryScheduleCycleRepository()
+        schedule_cycle_service_factory = lambda: ScheduleCycleService(schedule_cycle_repository)
+
         self.include_router(MedicineRouter('/v1/medicine', medicine_service_factory))
+        self.include_router(ScheduleRouter('/v1/schedule', schedule_cycle_service_factory))
+
+    async def metrics(self, request: Request) -> PlainTextResponse:
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 app = MedicalOfficeAPI()
@@ -1,4 +1,4 @@
-from app.base.models import SQLModel, MappedColumn
+from app.base.models import SQLModel, MappedColumn, keyset_indexes
 from typing import Literal, Annotated
 from datetime import datetime
 
@@ -6,8 +6,9 @@ MedicalDiagnosisAttribute = Literal['id', 'created_at', 'patient_id', 'doctor_id
 
 class MedicalDiagnosisModel(SQLModel, table=True):
     __tablename__ = 'medical_diagnoses'
+    __table_args__ = keyset_indexes('medical_diagnoses', MedicalDiagnosisAttribute)
 
     created_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
-    patient_id: Annotated[int, MappedColumn(gt=0, foreign_key='accounts.id', index=True)]
-    doctor_id: Annotated[int, MappedColumn(gt=0, foreign_key='accounts.id', index=True)]
+    patient_id: Annotated[int, MappedColumn(gt=0, foreign_key='accounts.id')]
+    doctor_id: Annotated[int, MappedColumn(gt=0, foreign_key='accounts.id')]
     disease: Annotated[str, MappedColumn(max_length=255)]
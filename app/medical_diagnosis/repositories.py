@@ -1,10 +1,13 @@
 from app.medical_diagnosis.models import MedicalDiagnosisModel, MedicalDiagnosisAttribute
-from app.base.repositories import BaseRepository, SQLRepository
-from app.base.models import FindQuery, FilterBy
+from app.base.repositories import BaseRepository, SQLRepository, AsyncSQLRepository
+from app.base.models import AggregateQuery, FilterQuery, FindQuery, FilterBy
 from app.exceptions import *
+from app.base.database import get_engine, get_async_engine
 from app.config import settings
 from app.utils import Interval, RegEx
 from sqlmodel import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
 from typing import override
 from abc import ABC
@@ -21,6 +24,14 @@ class MedicalDiagnosisFindQuery(FindQuery[MedicalDiagnosisFilterBy, MedicalDiagn
     ...
 
 
+class MedicalDiagnosisFilterQuery(FilterQuery[MedicalDiagnosisFilterBy]):
+    ...
+
+
+class MedicalDiagnosisAggregateQuery(AggregateQuery[MedicalDiagnosisFilterBy, MedicalDiagnosisAttribute]):
+    model = MedicalDiagnosisModel
+
+
 class MedicalDiagnosisRepository(BaseRepository[MedicalDiagnosisModel, MedicalDiagnosisFindQuery], ABC):
     ...
 
@@ -30,11 +41,13 @@ class InMemoryMedicalDiagnosisRepository(SQLRepository[MedicalDiagnosisModel, Me
     def __init__(self) -> None:
         super().__init__(
             model=MedicalDiagnosisModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
                 'timeout': 2.0,
-                'cached_statements': 512
+                'cached_statements': 512,
+                'check_same_thread': False
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -43,6 +56,32 @@ class SupabaseMedicalDiagnosisRepository(SQLRepository[MedicalDiagnosisModel, Me
     def __init__(self) -> None:
         super().__init__(
             model=MedicalDiagnosisModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryMedicalDiagnosisRepository(AsyncSQLRepository[MedicalDiagnosisModel, MedicalDiagnosisFindQuery], MedicalDiagnosisRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=MedicalDiagnosisModel,
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncSupabaseMedicalDiagnosisRepository(AsyncSQLRepository[MedicalDiagnosisModel, MedicalDiagnosisFindQuery], MedicalDiagnosisRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=MedicalDiagnosisModel,
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, HTTPException, status, Path, Query, Body
-from app.medical_diagnosis.repositories import MedicalDiagnosisFindQuery
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.medical_diagnosis.repositories import MedicalDiagnosisFindQuery, MedicalDiagnosisFilterQuery, MedicalDiagnosisAggregateQuery
 from app.medical_diagnosis.services import MedicalDiagnosisService
 from app.medical_diagnosis.schemas import MedicalDiagnosisRequestSchema, MedicalDiagnosisResponseSchema
-from app.medical_diagnosis.models import MedicalDiagnosisModel
+from app.medical_diagnosis.models import MedicalDiagnosisModel, MedicalDiagnosisAttribute
 from app.exceptions import *
-from app.base.models import Page
-from app.utils import Positive, parse_last_retrieved
+from app.base.models import Batch, Page
+from app.base.responses import serialized_response
+from app.base.export import ExportFormat, export_response
+from app.utils import Positive, attr_pattern, parse_last_retrieved
 from collections.abc import Callable
-from typing import Annotated
+from typing import Annotated, Any
 from datetime import datetime
 
 class MedicalDiagnosisRouter(APIRouter):
@@ -16,7 +20,12 @@ class MedicalDiagnosisRouter(APIRouter):
         self.svc = diagnosis_service_factory
 
         self.add_api_route('/', self.post_diagnosis, name="Post Medical Diagnosis", methods=['post'])
+        self.add_api_route('/bulk', self.post_diagnoses, name="Post Medical Diagnoses", methods=['post'])
+        self.add_api_route('/batch-get', self.batch_get_diagnoses, name="Batch Get Medical Diagnoses", methods=['post'])
         self.add_api_route('/find', self.find_diagnoses, name="Find Medical Diagnoses", methods=['post'])
+        self.add_api_route('/count', self.count_diagnoses, name="Count Medical Diagnoses", methods=['post'])
+        self.add_api_route('/aggregate', self.aggregate_diagnoses, name="Aggregate Medical Diagnoses", methods=['post'])
+        self.add_api_route('/export', self.export_diagnoses, name="Export Medical Diagnoses", methods=['get'])
 
         self.add_api_route('/{id}', self.get_diagnosis, name="Get Medical Diagnosis", methods=['get'])
         self.add_api_route('/{id}', self.put_diagnosis, name="Put Medical Diagnosis", methods=['put'])
@@ -34,27 +43,61 @@ class MedicalDiagnosisRouter(APIRouter):
     async def post_diagnosis(self, diagnosis: Annotated[MedicalDiagnosisRequestSchema, Body()]) -> MedicalDiagnosisResponseSchema:
         return MedicalDiagnosisResponseSchema.model_validate((await self.svc().add(MedicalDiagnosisModel.model_validate(diagnosis))).model_dump())
 
-    async def get_diagnosis(self, id: Annotated[Positive[int], Path()]) -> MedicalDiagnosisResponseSchema:
+    async def post_diagnoses(self, diagnoses: Annotated[list[MedicalDiagnosisRequestSchema], Body()]) -> list[MedicalDiagnosisResponseSchema]:
         try:
+            models = await self.svc().add_many([MedicalDiagnosisModel.model_validate(diagnosis) for diagnosis in diagnoses])
+            return [MedicalDiagnosisResponseSchema.model_validate(model) for model in models]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def batch_get_diagnoses(self, ids: Annotated[list[Positive[int]], Body()]) -> Batch[MedicalDiagnosisResponseSchema]:
+        try:
+            models = await self.svc().find_by_ids(ids)
+            return serialized_response(Batch[MedicalDiagnosisResponseSchema], {
+                'data': [model for model in models if model],
+                'missing': [id for id, model in zip(ids, models) if not model],
+            })
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def get_diagnosis(self, id: Annotated[Positive[int], Path()], attr: Annotated[str | None, Query(pattern=attr_pattern(MedicalDiagnosisAttribute))] = None) -> MedicalDiagnosisResponseSchema | dict[str, Any]:
+        try:
+            if attr:
+                projected = await self.svc().project_by_id(id, attr.split(','))
+                if projected:
+                    return JSONResponse(jsonable_encoder(projected))
+                raise HTTPException(status.HTTP_404_NOT_FOUND, "Medical diagnosis not found.")
             diagnosis: MedicalDiagnosisModel | None = await self.svc().find_by_id(id)
             if diagnosis:
-                return MedicalDiagnosisResponseSchema.model_validate(diagnosis)
+                return serialized_response(MedicalDiagnosisResponseSchema, diagnosis)
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Medical diagnosis not found.")
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
-    async def find_diagnoses(self, query: Annotated[MedicalDiagnosisFindQuery, Body()]) -> Page[MedicalDiagnosisResponseSchema, MedicalDiagnosisFindQuery] | None:
+    async def export_diagnoses(self, attr: Annotated[str | None, Query(pattern=attr_pattern(MedicalDiagnosisAttribute))] = None,
+                               format: Annotated[ExportFormat, Query()] = 'ndjson') -> StreamingResponse:
+        return export_response(self.svc().stream(attr.split(',') if attr else None), format, 'diagnoses')
+
+    async def aggregate_diagnoses(self, query: Annotated[MedicalDiagnosisAggregateQuery, Body()]) -> list[dict[str, Any]]:
+        try:
+            return await self.svc().aggregate(query)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def count_diagnoses(self, query: Annotated[MedicalDiagnosisFilterQuery, Body()],
+                              estimate: Annotated[bool, Query()] = False) -> int:
+        try:
+            return await self.svc().count(query, estimate)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def find_diagnoses(self, query: Annotated[MedicalDiagnosisFindQuery, Body()], attr: Annotated[str | None, Query(pattern=attr_pattern(MedicalDiagnosisAttribute))] = None) -> Page[MedicalDiagnosisResponseSchema, MedicalDiagnosisFindQuery] | Page[dict[str, Any], MedicalDiagnosisFindQuery] | None:
         try:
             if query.last:
                 query.last = parse_last_retrieved(list(query.last), MedicalDiagnosisModel, query.order_by)
-            page = await self.svc().find(query)
-            if not page:
-                return None
-            response_page = Page[MedicalDiagnosisResponseSchema, MedicalDiagnosisFindQuery](
-                next=page.next,
-                data=[MedicalDiagnosisResponseSchema.model_validate(diagnosis) for diagnosis in page.data],
-            )
-            return response_page
+            if attr:
+                return JSONResponse(jsonable_encoder(await self.svc().project(query, attr.split(','))))
+            return serialized_response(Page[MedicalDiagnosisResponseSchema, MedicalDiagnosisFindQuery] | None, await self.svc().find(query))
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
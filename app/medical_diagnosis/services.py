@@ -7,46 +7,34 @@ from datetime import datetime
 
 class MedicalDiagnosisService(BaseService[MedicalDiagnosisModel, MedicalDiagnosisRepository, MedicalDiagnosisFindQuery]):
     async def get_created_at(self, id: Positive[int]) -> datetime:
-        diagnosis: MedicalDiagnosisModel | None = await self.find_by_id(id)
+        diagnosis = await self.project_by_id(id, ['created_at'])
         if not diagnosis:
             raise EntityNotFound()
-        return diagnosis.created_at
+        return diagnosis['created_at']
 
     async def get_patient_id(self, id: Positive[int]) -> int:
-        diagnosis: MedicalDiagnosisModel | None = await self.find_by_id(id)
+        diagnosis = await self.project_by_id(id, ['patient_id'])
         if not diagnosis:
             raise EntityNotFound()
-        return diagnosis.patient_id
+        return diagnosis['patient_id']
 
     async def get_doctor_id(self, id: Positive[int]) -> int:
-        diagnosis: MedicalDiagnosisModel | None = await self.find_by_id(id)
+        diagnosis = await self.project_by_id(id, ['doctor_id'])
         if not diagnosis:
             raise EntityNotFound()
-        return diagnosis.doctor_id
+        return diagnosis['doctor_id']
 
     async def get_disease(self, id: Positive[int]) -> str:
-        diagnosis: MedicalDiagnosisModel | None = await self.find_by_id(id)
+        diagnosis = await self.project_by_id(id, ['disease'])
         if not diagnosis:
             raise EntityNotFound()
-        return diagnosis.disease
+        return diagnosis['disease']
 
     async def update_patient_id(self, id: Positive[int], patient_id: int) -> MedicalDiagnosisModel:
-        diagnosis: MedicalDiagnosisModel | None = await self.find_by_id(id)
-        if not diagnosis:
-            raise EntityNotFound()
-        diagnosis.patient_id = patient_id
-        return await self.repo.update(id, diagnosis)
+        return await self.repo.patch(id, patient_id=patient_id)
 
     async def update_doctor_id(self, id: Positive[int], doctor_id: int) -> MedicalDiagnosisModel:
-        diagnosis: MedicalDiagnosisModel | None = await self.find_by_id(id)
-        if not diagnosis:
-            raise EntityNotFound()
-        diagnosis.doctor_id = doctor_id
-        return await self.repo.update(id, diagnosis)
+        return await self.repo.patch(id, doctor_id=doctor_id)
 
     async def update_disease(self, id: Positive[int], disease: str) -> MedicalDiagnosisModel:
-        diagnosis: MedicalDiagnosisModel | None = await self.find_by_id(id)
-        if not diagnosis:
-            raise EntityNotFound()
-        diagnosis.disease = disease
-        return await self.repo.update(id, diagnosis)
+        return await self.repo.patch(id, disease=disease)
@@ -1,4 +1,4 @@
-from app.base.models import SQLModel, MappedColumn
+from app.base.models import SQLModel, MappedColumn, keyset_indexes
 from typing import Literal, Annotated
 from datetime import datetime
 
@@ -6,6 +6,8 @@ MedicineAttribute = Literal['id', 'created_at', 'updated_at', 'name', 'descripti
 
 class MedicineModel(SQLModel, table=True):
     __tablename__: str = 'medicines'
+    # `description` is long free text that is not sorted on in practice; ordering by it scans.
+    __table_args__ = keyset_indexes('medicines', MedicineAttribute, exclude={'description'})
 
     created_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
     updated_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
@@ -1,10 +1,13 @@
 from app.medicine.models import MedicineModel, MedicineAttribute
-from app.base.repositories import BaseRepository, SQLRepository
-from app.base.models import FindQuery, FilterBy
+from app.base.repositories import BaseRepository, SQLRepository, AsyncSQLRepository
+from app.base.models import AggregateQuery, FilterQuery, FindQuery, FilterBy
 from app.exceptions import *
+from app.base.database import get_engine, get_async_engine
 from app.config import settings
 from app.utils import Interval, RegEx
 from sqlmodel import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
 from typing import override
 from abc import ABC
@@ -24,6 +27,14 @@ class MedicineFindQuery(FindQuery[MedicineFilterBy, MedicineAttribute]):
     ...
 
 
+class MedicineFilterQuery(FilterQuery[MedicineFilterBy]):
+    ...
+
+
+class MedicineAggregateQuery(AggregateQuery[MedicineFilterBy, MedicineAttribute]):
+    model = MedicineModel
+
+
 class MedicineRepository(BaseRepository[MedicineModel, MedicineFindQuery], ABC):
     ...
 
@@ -33,11 +44,13 @@ class InMemoryMedicineRepository(SQLRepository[MedicineModel, MedicineFindQuery]
     def __init__(self) -> None:
         super().__init__(
             model=MedicineModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
                 'timeout': 2.0,
-                'cached_statements': 512
+                'cached_statements': 512,
+                'check_same_thread': False
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -46,6 +59,32 @@ class SupabaseMedicineRepository(SQLRepository[MedicineModel, MedicineFindQuery]
     def __init__(self) -> None:
         super().__init__(
             model=MedicineModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryMedicineRepository(AsyncSQLRepository[MedicineModel, MedicineFindQuery], MedicineRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=MedicineModel,
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncSupabaseMedicineRepository(AsyncSQLRepository[MedicineModel, MedicineFindQuery], MedicineRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=MedicineModel,
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, HTTPException, status, Path, Body
-from app.medicine.repositories import MedicineFindQuery
+from fastapi import APIRouter, HTTPException, status, Path, Body, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.medicine.repositories import MedicineFindQuery, MedicineFilterQuery, MedicineAggregateQuery
 from app.medicine.services import MedicineService
 from app.medicine.schemas import MedicineRequestSchema, MedicineResponseSchema
-from app.medicine.models import MedicineModel
+from app.medicine.models import MedicineModel, MedicineAttribute
 from app.exceptions import *
-from app.base.models import Page
-from app.utils import Positive, parse_last_retrieved
+from app.base.models import Batch, Page
+from app.base.responses import serialized_response
+from app.base.export import ExportFormat, export_response
+from app.utils import Positive, attr_pattern, parse_last_retrieved
 from collections.abc import Callable
-from typing import Annotated
+from typing import Annotated, Any
 from datetime import datetime
 
 class MedicineRouter(APIRouter):
@@ -16,7 +20,12 @@ class MedicineRouter(APIRouter):
         self.svc = medicine_service_factory
 
         self.add_api_route('/', self.post_medicine, name="Post Medicine", methods=['post'])
+        self.add_api_route('/bulk', self.post_medicines, name="Post Medicines", methods=['post'])
+        self.add_api_route('/batch-get', self.batch_get_medicines, name="Batch Get Medicines", methods=['post'])
         self.add_api_route('/find', self.find_medicines, name="Find Medicines", methods=['post'])
+        self.add_api_route('/count', self.count_medicines, name="Count Medicines", methods=['post'])
+        self.add_api_route('/aggregate', self.aggregate_medicines, name="Aggregate Medicines", methods=['post'])
+        self.add_api_route('/export', self.export_medicines, name="Export Medicines", methods=['get'])
 
         self.add_api_route('/{id}', self.get_medicine, name="Get Medicine", methods=['get'])
         self.add_api_route('/{id}', self.put_medicine, name="Put Medicine", methods=['put'])
@@ -51,22 +60,77 @@ class MedicineRouter(APIRouter):
         model = await self.svc().add(MedicineModel.model_validate(medicine))
         return MedicineResponseSchema.model_validate(model)
 
-    async def get_medicine(self, id: Annotated[Positive[int], Path()]) -> MedicineResponseSchema:
+    async def post_medicines(self, medicines: Annotated[list[MedicineRequestSchema], Body()]) -> list[MedicineResponseSchema]:
+        try:
+            models = await self.svc().add_many([MedicineModel.model_validate(medicine) for medicine in medicines])
+            return [MedicineResponseSchema.model_validate(model) for model in models]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def batch_get_medicines(self, ids: Annotated[list[Positive[int]], Body()]) -> Batch[MedicineResponseSchema]:
+        try:
+            models = await self.svc().find_by_ids(ids)
+            return serialized_response(Batch[MedicineResponseSchema], {
+                'data': [model for model in models if model],
+                'missing': [id for id, model in zip(ids, models) if not model],
+            })
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def get_medicine(self, id: Annotated[Positive[int], Path()], attr: Annotated[str | None, Query(pattern=attr_pattern(MedicineAttribute))] = None) -> MedicineResponseSchema | dict[str, Any]:
         """
         ### Examples
           - http://localhost:8000/v1/medicine/101?attr=name,description,created_at
           - http://localhost:8000/v1/medicine/102?attr=name
         """
         try:
+            if attr:
+                projected = await self.svc().project_by_id(id, attr.split(','))
+                if projected:
+                    return JSONResponse(jsonable_encoder(projected))
+                raise HTTPException(status.HTTP_404_NOT_FOUND, "Medicine not found.")
             model: MedicineModel | None = await self.svc().find_by_id(id)
             if model:
-                return MedicineResponseSchema.model_validate(model)
+                return serialized_response(MedicineResponseSchema, model)
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Medicine not found.")
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
-    async def find_medicines(self, query: Annotated[MedicineFindQuery, Body()]
-                             ) -> Page[MedicineResponseSchema, MedicineFindQuery] | None:
+    async def export_medicines(self, attr: Annotated[str | None, Query(pattern=attr_pattern(MedicineAttribute))] = None,
+                               format: Annotated[ExportFormat, Query()] = 'ndjson') -> StreamingResponse:
+        """
+        ### Examples
+          - http://localhost:8000/v1/medicine/export
+          - http://localhost:8000/v1/medicine/export?format=csv&attr=name,dose
+        """
+        return export_response(self.svc().stream(attr.split(',') if attr else None), format, 'medicines')
+
+    async def aggregate_medicines(self, query: Annotated[MedicineAggregateQuery, Body()]) -> list[dict[str, Any]]:
+        """
+        ### Example
+        ~~~json
+        {
+            "filter_by": {"intake_type": "Comprimido"},
+            "group_by": ["measurement", "created_at"],
+            "date_trunc": "month",
+            "aggregates": [["count", "id"], ["avg", "dose"]]
+        }
+        ~~~
+        """
+        try:
+            return await self.svc().aggregate(query)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def count_medicines(self, query: Annotated[MedicineFilterQuery, Body()],
+                              estimate: Annotated[bool, Query()] = False) -> int:
+        try:
+            return await self.svc().count(query, estimate)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def find_medicines(self, query: Annotated[MedicineFindQuery, Body()], attr: Annotated[str | None, Query(pattern=attr_pattern(MedicineAttribute))] = None
+                             ) -> Page[MedicineResponseSchema, MedicineFindQuery] | Page[dict[str, Any], MedicineFindQuery] | None:
         """
         ### Example
         url: http://localhost:8000/v1/medicine/find/?attr=name,description,created_at
@@ -89,14 +153,9 @@ class MedicineRouter(APIRouter):
         try:
             if query.last:
                 query.last = parse_last_retrieved(list(query.last), MedicineModel, query.order_by)
-            page = await self.svc().find(query)
-            if not page:
-                return None
-            response_page= Page[MedicineResponseSchema, MedicineFindQuery](
-                next=page.next,
-                data=[MedicineResponseSchema.model_validate(medicine) for medicine in page.data],
-            )
-            return response_page
+            if attr:
+                return JSONResponse(jsonable_encoder(await self.svc().project(query, attr.split(','))))
+            return serialized_response(Page[MedicineResponseSchema, MedicineFindQuery] | None, await self.svc().find(query))
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
@@ -7,72 +7,52 @@ from datetime import datetime
 
 class MedicineService(BaseService[MedicineModel, MedicineRepository, MedicineFindQuery]):
     async def get_created_at(self, id: Positive[int]) -> datetime:
-        medicine: MedicineModel | None = await self.find_by_id(id)
+        medicine = await self.project_by_id(id, ['created_at'])
         if not medicine:
             raise EntityNotFound()
-        return medicine.created_at
+        return medicine['created_at']
 
     async def get_name(self, id: Positive[int]) -> str:
-        medicine: MedicineModel | None = await self.find_by_id(id)
+        medicine = await self.project_by_id(id, ['name'])
         if not medicine:
             raise EntityNotFound()
-        return medicine.name
+        return medicine['name']
 
     async def get_description(self, id: Positive[int]) -> str:
-        medicine: MedicineModel | None = await self.find_by_id(id)
+        medicine = await self.project_by_id(id, ['description'])
         if not medicine:
             raise EntityNotFound()
-        return medicine.description
+        return medicine['description']
 
     async def get_intake_type(self, id: Positive[int]) -> str:
-        medicine: MedicineModel | None = await self.find_by_id(id)
+        medicine = await self.project_by_id(id, ['intake_type'])
         if not medicine:
             raise EntityNotFound()
-        return medicine.intake_type
+        return medicine['intake_type']
 
     async def get_dose(self, id: Positive[int]) -> float:
-        medicine: MedicineModel | None = await self.find_by_id(id)
+        medicine = await self.project_by_id(id, ['dose'])
         if not medicine:
             raise EntityNotFound()
-        return medicine.dose
+        return medicine['dose']
 
     async def get_measurement(self, id: Positive[int]) -> str:
-        medicine: MedicineModel | None = await self.find_by_id(id)
+        medicine = await self.project_by_id(id, ['measurement'])
         if not medicine:
             raise EntityNotFound()
-        return medicine.measurement
+        return medicine['measurement']
 
     async def update_name(self, id: Positive[int], name: str) -> MedicineModel:
-        medicine: MedicineModel | None = await self.find_by_id(id)
-        if not medicine:
-            raise EntityNotFound()
-        medicine.name = name
-        return await self.repo.update(id, medicine)
+        return await self.repo.patch(id, name=name)
 
     async def update_description(self, id: Positive[int], description: str) -> MedicineModel:
-        medicine: MedicineModel | None = await self.find_by_id(id)
-        if not medicine:
-            raise EntityNotFound()
-        medicine.description = description
-        return await self.repo.update(id, medicine)
+        return await self.repo.patch(id, description=description)
 
     async def update_intake_type(self, id: Positive[int], intake_type: str) -> MedicineModel:
-        medicine: MedicineModel | None = await self.find_by_id(id)
-        if not medicine:
-            raise EntityNotFound()
-        medicine.intake_type = intake_type
-        return await self.repo.update(id, medicine)
+        return await self.repo.patch(id, intake_type=intake_type)
 
     async def update_dose(self, id: Positive[int], dose: float) -> MedicineModel:
-        medicine: MedicineModel | None = await self.find_by_id(id)
-        if not medicine:
-            raise EntityNotFound()
-        medicine.dose = dose
-        return await self.repo.update(id, medicine)
+        return await self.repo.patch(id, dose=dose)
 
     async def update_measurement(self, id: Positive[int], measurement: str) -> MedicineModel:
-        medicine: MedicineModel | None = await self.find_by_id(id)
-        if not medicine:
-            raise EntityNotFound()
-        medicine.measurement = measurement
-        return await self.repo.update(id, medicine)
+        return await self.repo.patch(id, measurement=measurement)
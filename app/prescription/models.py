@@ -1,4 +1,4 @@
-from app.base.models import SQLModel, MappedColumn
+from app.base.models import SQLModel, MappedColumn, keyset_indexes
 from typing import Literal, Annotated
 from datetime import datetime
 
@@ -6,10 +6,11 @@ PrescriptionAttribute = Literal['id', 'created_at', 'patient_id', 'doctor_id']
 
 class PrescriptionModel(SQLModel, table=True):
     __tablename__ = 'prescriptions'
+    __table_args__ = keyset_indexes('prescriptions', PrescriptionAttribute)
 
     created_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
-    patient_id: Annotated[int, MappedColumn(gt=0, foreign_key='accounts.id', index=True)]
-    doctor_id: Annotated[int, MappedColumn(gt=0, foreign_key='accounts.id', index=True)]
+    patient_id: Annotated[int, MappedColumn(gt=0, foreign_key='accounts.id')]
+    doctor_id: Annotated[int, MappedColumn(gt=0, foreign_key='accounts.id')]
     medical_diagnosis_id: Annotated[int, MappedColumn(gt=0, foreign_key='medical_diagnoses.id', index=True)]
     canceled: Annotated[bool, MappedColumn(False)]
 
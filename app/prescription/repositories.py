@@ -2,12 +2,15 @@ from app.prescription.models import (
     PrescriptionModel, PrescriptionAttribute,
     MedicationScheduleModel, MedicationScheduleAttribute
 )
-from app.base.repositories import BaseRepository, SQLRepository
-from app.base.models import FindQuery, FilterBy
+from app.base.repositories import BaseRepository, SQLRepository, AsyncSQLRepository
+from app.base.models import AggregateQuery, FilterQuery, FindQuery, FilterBy
 from app.exceptions import *
+from app.base.database import get_engine, get_async_engine
 from app.config import settings
 from app.utils import Interval
 from sqlmodel import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
 from typing import override
 from abc import ABC
@@ -25,6 +28,14 @@ class PrescriptionFindQuery(FindQuery[PrescriptionFilterBy, PrescriptionAttribut
     ...
 
 
+class PrescriptionFilterQuery(FilterQuery[PrescriptionFilterBy]):
+    ...
+
+
+class PrescriptionAggregateQuery(AggregateQuery[PrescriptionFilterBy, PrescriptionAttribute]):
+    model = PrescriptionModel
+
+
 class PrescriptionRepository(BaseRepository[PrescriptionModel, PrescriptionFindQuery], ABC):
     ...
 
@@ -34,11 +45,13 @@ class InMemoryPrescriptionRepository(SQLRepository[PrescriptionModel, Prescripti
     def __init__(self) -> None:
         super().__init__(
             model=PrescriptionModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
                 'timeout': 2.0,
-                'cached_statements': 512
+                'cached_statements': 512,
+                'check_same_thread': False
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -47,8 +60,34 @@ class SupabasePrescriptionRepository(SQLRepository[PrescriptionModel, Prescripti
     def __init__(self) -> None:
         super().__init__(
             model=PrescriptionModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryPrescriptionRepository(AsyncSQLRepository[PrescriptionModel, PrescriptionFindQuery], PrescriptionRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=PrescriptionModel,
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncSupabasePrescriptionRepository(AsyncSQLRepository[PrescriptionModel, PrescriptionFindQuery], PrescriptionRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=PrescriptionModel,
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -64,6 +103,14 @@ class MedicationScheduleFindQuery(FindQuery[MedicationScheduleFilterBy, Medicati
     ...
 
 
+class MedicationScheduleFilterQuery(FilterQuery[MedicationScheduleFilterBy]):
+    ...
+
+
+class MedicationScheduleAggregateQuery(AggregateQuery[MedicationScheduleFilterBy, MedicationScheduleAttribute]):
+    model = MedicationScheduleModel
+
+
 class MedicationScheduleRepository(BaseRepository[MedicationScheduleModel, MedicationScheduleFindQuery], ABC):
     ...
 
@@ -73,11 +120,13 @@ class InMemoryMedicationScheduleRepository(SQLRepository[MedicationScheduleModel
     def __init__(self) -> None:
         super().__init__(
             model=MedicationScheduleModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
                 'timeout': 2.0,
-                'cached_statements': 512
+                'cached_statements': 512,
+                'check_same_thread': False
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -86,6 +135,32 @@ class SupabaseMedicationScheduleRepository(SQLRepository[MedicationScheduleModel
     def __init__(self) -> None:
         super().__init__(
             model=MedicationScheduleModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryMedicationScheduleRepository(AsyncSQLRepository[MedicationScheduleModel, MedicationScheduleFindQuery], MedicationScheduleRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=MedicationScheduleModel,
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncSupabaseMedicationScheduleRepository(AsyncSQLRepository[MedicationScheduleModel, MedicationScheduleFindQuery], MedicationScheduleRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=MedicationScheduleModel,
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, HTTPException, status, Path, Query, Body
-from app.prescription.repositories import PrescriptionFindQuery
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.prescription.repositories import PrescriptionFindQuery, PrescriptionFilterQuery, PrescriptionAggregateQuery
 from app.prescription.services import PrescriptionService
 from app.prescription.schemas import PrescriptionRequestSchema, PrescriptionResponseSchema
-from app.prescription.models import PrescriptionModel
+from app.prescription.models import PrescriptionModel, PrescriptionAttribute
 from app.exceptions import *
-from app.base.models import Page
-from app.utils import Positive, parse_last_retrieved
+from app.base.models import Batch, Page
+from app.base.responses import serialized_response
+from app.base.export import ExportFormat, export_response
+from app.utils import Positive, attr_pattern, parse_last_retrieved
 from collections.abc import Callable
-from typing import Annotated
+from typing import Annotated, Any
 from datetime import datetime
 
 class PrescriptionRouter(APIRouter):
@@ -16,7 +20,12 @@ class PrescriptionRouter(APIRouter):
         self.svc = prescription_service_factory
 
         self.add_api_route('/', self.post_prescription, name="Post Prescription", methods=['post'])
+        self.add_api_route('/bulk', self.post_prescriptions, name="Post Prescriptions", methods=['post'])
+        self.add_api_route('/batch-get', self.batch_get_prescriptions, name="Batch Get Prescriptions", methods=['post'])
         self.add_api_route('/find', self.find_prescriptions, name="Find Prescriptions", methods=['post'])
+        self.add_api_route('/count', self.count_prescriptions, name="Count Prescriptions", methods=['post'])
+        self.add_api_route('/aggregate', self.aggregate_prescriptions, name="Aggregate Prescriptions", methods=['post'])
+        self.add_api_route('/export', self.export_prescriptions, name="Export Prescriptions", methods=['get'])
 
         self.add_api_route('/{id}', self.get_prescription, name="Get Prescription", methods=['get'])
         self.add_api_route('/{id}', self.put_prescription, name="Put Prescription", methods=['put'])
@@ -36,27 +45,61 @@ class PrescriptionRouter(APIRouter):
     async def post_prescription(self, prescription: Annotated[PrescriptionRequestSchema, Body()]) -> PrescriptionResponseSchema:
         return PrescriptionResponseSchema.model_validate((await self.svc().add(PrescriptionModel.model_validate(prescription))).model_dump())
 
-    async def get_prescription(self, id: Annotated[Positive[int], Path()]) -> PrescriptionResponseSchema:
+    async def post_prescriptions(self, prescriptions: Annotated[list[PrescriptionRequestSchema], Body()]) -> list[PrescriptionResponseSchema]:
         try:
+            models = await self.svc().add_many([PrescriptionModel.model_validate(prescription) for prescription in prescriptions])
+            return [PrescriptionResponseSchema.model_validate(model) for model in models]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def batch_get_prescriptions(self, ids: Annotated[list[Positive[int]], Body()]) -> Batch[PrescriptionResponseSchema]:
+        try:
+            models = await self.svc().find_by_ids(ids)
+            return serialized_response(Batch[PrescriptionResponseSchema], {
+                'data': [model for model in models if model],
+                'missing': [id for id, model in zip(ids, models) if not model],
+            })
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def get_prescription(self, id: Annotated[Positive[int], Path()], attr: Annotated[str | None, Query(pattern=attr_pattern(PrescriptionAttribute))] = None) -> PrescriptionResponseSchema | dict[str, Any]:
+        try:
+            if attr:
+                projected = await self.svc().project_by_id(id, attr.split(','))
+                if projected:
+                    return JSONResponse(jsonable_encoder(projected))
+                raise HTTPException(status.HTTP_404_NOT_FOUND, "Prescription not found.")
             prescription: PrescriptionModel | None = await self.svc().find_by_id(id)
             if prescription:
-                return PrescriptionResponseSchema.model_validate(prescription)
+                return serialized_response(PrescriptionResponseSchema, prescription)
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Prescription not found.")
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
-    async def find_prescriptions(self, query: Annotated[PrescriptionFindQuery, Body()]) -> Page[PrescriptionResponseSchema, PrescriptionFindQuery] | None:
+    async def export_prescriptions(self, attr: Annotated[str | None, Query(pattern=attr_pattern(PrescriptionAttribute))] = None,
+                                   format: Annotated[ExportFormat, Query()] = 'ndjson') -> StreamingResponse:
+        return export_response(self.svc().stream(attr.split(',') if attr else None), format, 'prescriptions')
+
+    async def aggregate_prescriptions(self, query: Annotated[PrescriptionAggregateQuery, Body()]) -> list[dict[str, Any]]:
+        try:
+            return await self.svc().aggregate(query)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def count_prescriptions(self, query: Annotated[PrescriptionFilterQuery, Body()],
+                                  estimate: Annotated[bool, Query()] = False) -> int:
+        try:
+            return await self.svc().count(query, estimate)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def find_prescriptions(self, query: Annotated[PrescriptionFindQuery, Body()], attr: Annotated[str | None, Query(pattern=attr_pattern(PrescriptionAttribute))] = None) -> Page[PrescriptionResponseSchema, PrescriptionFindQuery] | Page[dict[str, Any], PrescriptionFindQuery] | None:
         try:
             if query.last:
                 query.last = parse_last_retrieved(list(query.last), PrescriptionModel, query.order_by)
-            page = await self.svc().find(query)
-            if not page:
-                return None
-            response_page = Page[PrescriptionResponseSchema, PrescriptionFindQuery](
-                next=page.next,
-                data=[PrescriptionResponseSchema.model_validate(prescription) for prescription in page.data],
-            )
-            return response_page
+            if attr:
+                return JSONResponse(jsonable_encoder(await self.svc().project(query, attr.split(','))))
+            return serialized_response(Page[PrescriptionResponseSchema, PrescriptionFindQuery] | None, await self.svc().find(query))
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
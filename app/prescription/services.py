@@ -7,59 +7,43 @@ from datetime import datetime
 
 class PrescriptionService(BaseService[PrescriptionModel, PrescriptionRepository, PrescriptionFindQuery]):
     async def get_created_at(self, id: Positive[int]) -> datetime:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
+        prescription = await self.project_by_id(id, ['created_at'])
         if not prescription:
             raise EntityNotFound()
-        return prescription.created_at
+        return prescription['created_at']
 
     async def get_patient_id(self, id: Positive[int]) -> int:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
+        prescription = await self.project_by_id(id, ['patient_id'])
         if not prescription:
             raise EntityNotFound()
-        return prescription.patient_id
+        return prescription['patient_id']
 
     async def get_doctor_id(self, id: Positive[int]) -> int:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
+        prescription = await self.project_by_id(id, ['doctor_id'])
         if not prescription:
             raise EntityNotFound()
-        return prescription.doctor_id
+        return prescription['doctor_id']
 
     async def get_medical_diagnosis_id(self, id: Positive[int]) -> int:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
+        prescription = await self.project_by_id(id, ['medical_diagnosis_id'])
         if not prescription:
             raise EntityNotFound()
-        return prescription.medical_diagnosis_id
+        return prescription['medical_diagnosis_id']
 
     async def is_canceled(self, id: Positive[int]) -> bool:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
+        prescription = await self.project_by_id(id, ['canceled'])
         if not prescription:
             raise EntityNotFound()
-        return prescription.canceled
+        return prescription['canceled']
 
     async def update_patient_id(self, id: Positive[int], patient_id: int) -> PrescriptionModel:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
-        if not prescription:
-            raise EntityNotFound()
-        prescription.patient_id = patient_id
-        return await self.repo.update(id, prescription)
+        return await self.repo.patch(id, patient_id=patient_id)
 
     async def update_doctor_id(self, id: Positive[int], doctor_id: int) -> PrescriptionModel:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
-        if not prescription:
-            raise EntityNotFound()
-        prescription.doctor_id = doctor_id
-        return await self.repo.update(id, prescription)
+        return await self.repo.patch(id, doctor_id=doctor_id)
 
     async def update_medical_diagnosis_id(self, id: Positive[int], medical_diagnosis_id: int) -> PrescriptionModel:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
-        if not prescription:
-            raise EntityNotFound()
-        prescription.medical_diagnosis_id = medical_diagnosis_id
-        return await self.repo.update(id, prescription)
+        return await self.repo.patch(id, medical_diagnosis_id=medical_diagnosis_id)
 
     async def update_canceled(self, id: Positive[int], canceled: bool) -> PrescriptionModel:
-        prescription: PrescriptionModel | None = await self.find_by_id(id)
-        if not prescription:
-            raise EntityNotFound()
-        prescription.canceled = canceled
-        return await self.repo.update(id, prescription)
+        return await self.repo.patch(id, canceled=canceled)
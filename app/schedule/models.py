@@ -1,6 +1,6 @@
-from app.base.models import SQLModel, MappedColumn
+from app.base.models import BaseModel, SQLModel, MappedColumn, keyset_indexes
 from typing import Literal, Annotated
-from datetime import datetime
+from datetime import datetime, timedelta
 
 ScheduleAttribute = Literal['id']
 
@@ -9,13 +9,27 @@ class ScheduleModel(SQLModel, table=True):
 
 
 
-ScheduleCycleAttribute = Literal['id', 'created_at', 'start', 'repeat_each', 'repetition_number', 'schedule_id']
+ScheduleCycleAttribute = Literal['id', 'created_at', 'start', 'end', 'repeat_each', 'repetition_number', 'schedule_id']
+
+def schedule_cycle_end(start: datetime, repeat_each: int, repetition_number: int) -> datetime:
+    return start + timedelta(hours=repeat_each * repetition_number)
+
 
 class ScheduleCycleModel(SQLModel, table=True):
     __tablename__ = 'schedule_cycles'
+    __table_args__ = keyset_indexes('schedule_cycles', ScheduleCycleAttribute)
 
     created_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
     start: Annotated[datetime, MappedColumn()]
+    # Materialized `schedule_cycle_end(start, repeat_each, repetition_number)`, kept by the repositories.
+    end: Annotated[datetime | None, MappedColumn(None)]
     repeat_each: Annotated[int, MappedColumn(gt=0)]
     repetition_number: Annotated[int, MappedColumn(ge=0)]
     schedule_id: Annotated[int, MappedColumn(gt=0, foreign_key='schedules.id')]
+
+
+class Occurrence(BaseModel):
+    cycle_id: int
+    schedule_id: int
+    index: int
+    at: datetime
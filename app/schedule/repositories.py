@@ -1,16 +1,22 @@
 from app.schedule.models import (
     ScheduleModel, ScheduleAttribute,
-    ScheduleCycleModel, ScheduleCycleAttribute
+    ScheduleCycleModel, ScheduleCycleAttribute, schedule_cycle_end
 )
-from app.base.repositories import BaseRepository, SQLRepository
-from app.base.models import FindQuery, FilterBy
+from app.base.repositories import BaseRepository, SQLRepository, AsyncSQLRepository
+from app.base.models import AggregateQuery, FilterQuery, FindQuery, FilterBy
 from app.exceptions import *
+from app.base.database import get_engine, get_async_engine
 from app.config import settings
-from app.utils import Interval
-from sqlmodel import create_engine
+from app.utils import Interval, Positive
+from sqlmodel import create_engine, select
+from sqlmodel.sql._expression_select_cls import SelectOfScalar
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlalchemy import event
 from datetime import datetime
-from typing import override
-from abc import ABC
+from collections.abc import Sequence
+from typing import Any, override
+from abc import ABC, abstractmethod
 
 class ScheduleFilterBy(FilterBy, total=False):
     id: Interval[int]
@@ -20,6 +26,14 @@ class ScheduleFindQuery(FindQuery[ScheduleFilterBy, ScheduleAttribute]):
     ...
 
 
+class ScheduleFilterQuery(FilterQuery[ScheduleFilterBy]):
+    ...
+
+
+class ScheduleAggregateQuery(AggregateQuery[ScheduleFilterBy, ScheduleAttribute]):
+    model = ScheduleModel
+
+
 class ScheduleRepository(BaseRepository[ScheduleModel, ScheduleFindQuery], ABC):
     ...
 
@@ -29,11 +43,13 @@ class InMemoryScheduleRepository(SQLRepository[ScheduleModel, ScheduleFindQuery]
     def __init__(self) -> None:
         super().__init__(
             model=ScheduleModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
                 'timeout': 2.0,
-                'cached_statements': 512
+                'cached_statements': 512,
+                'check_same_thread': False
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -42,8 +58,34 @@ class SupabaseScheduleRepository(SQLRepository[ScheduleModel, ScheduleFindQuery]
     def __init__(self) -> None:
         super().__init__(
             model=ScheduleModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryScheduleRepository(AsyncSQLRepository[ScheduleModel, ScheduleFindQuery], ScheduleRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=ScheduleModel,
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncSupabaseScheduleRepository(AsyncSQLRepository[ScheduleModel, ScheduleFindQuery], ScheduleRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=ScheduleModel,
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -51,6 +93,7 @@ class ScheduleCycleFilterBy(FilterBy, total=False):
     id: Interval[int]
     created_at: Interval[datetime]
     start: Interval[datetime]
+    end: Interval[datetime]
     repeat_each: Interval[datetime]
     repetition_number: Interval[int]
     schedule_id: Interval[int]
@@ -60,28 +103,154 @@ class ScheduleCycleFindQuery(FindQuery[ScheduleCycleFilterBy, ScheduleCycleAttri
     ...
 
 
-class ScheduleCycleRepository(BaseRepository[ScheduleCycleModel, ScheduleCycleFindQuery], ABC):
+class ScheduleCycleFilterQuery(FilterQuery[ScheduleCycleFilterBy]):
     ...
 
 
-class InMemoryScheduleCycleRepository(SQLRepository[ScheduleCycleModel, ScheduleCycleFindQuery]):
+class ScheduleCycleAggregateQuery(AggregateQuery[ScheduleCycleFilterBy, ScheduleCycleAttribute]):
+    model = ScheduleCycleModel
+
+
+class ScheduleCycleRepository(BaseRepository[ScheduleCycleModel, ScheduleCycleFindQuery], ABC):
+    @abstractmethod
+    async def active_at(self, moment: datetime, schedule_ids: Sequence[int] | None = None) -> list[ScheduleCycleModel]:
+        """Cycles of `schedule_ids` (all schedules if None) whose span [start, end) contains `moment`."""
+
+    @abstractmethod
+    async def overlapping(self, start: datetime, end: datetime,
+                          schedule_ids: Sequence[int] | None = None) -> list[ScheduleCycleModel]:
+        """Cycles of `schedule_ids` (all schedules if None) whose span overlaps the window [start, end)."""
+
+
+SPAN_FIELDS = frozenset({'start', 'repeat_each', 'repetition_number'})
+
+@event.listens_for(ScheduleCycleModel, 'before_insert')
+@event.listens_for(ScheduleCycleModel, 'before_update')
+def _materialize_end(mapper, connection, cycle: ScheduleCycleModel) -> None:
+    cycle.end = schedule_cycle_end(cycle.start, cycle.repeat_each, cycle.repetition_number)
+
+
+def _span_statement(start: datetime, end: datetime, schedule_ids: Sequence[int] | None) -> SelectOfScalar[ScheduleCycleModel]:
+    # Cycles that already ended pile up over time, so the `end` bound is the selective one: the
+    # planner range-scans (end, id) and checks `start` on each row it reaches. Those rows are the
+    # ones still running or not yet started, so the `start` check is not given an index of its own.
+    stmt = select(ScheduleCycleModel).where(ScheduleCycleModel.start < end, ScheduleCycleModel.end > start)
+    if schedule_ids is not None:
+        stmt = stmt.where(ScheduleCycleModel.schedule_id.in_(schedule_ids))
+    return stmt
+
+
+def _active_at_statement(moment: datetime, schedule_ids: Sequence[int] | None) -> SelectOfScalar[ScheduleCycleModel]:
+    stmt = select(ScheduleCycleModel).where(ScheduleCycleModel.start <= moment, ScheduleCycleModel.end > moment)
+    if schedule_ids is not None:
+        stmt = stmt.where(ScheduleCycleModel.schedule_id.in_(schedule_ids))
+    return stmt
+
+
+def _rows_with_end(rows: list[dict]) -> list[dict]:
+    # Bulk statements skip mapper events.
+    for row in rows:
+        row['end'] = schedule_cycle_end(row['start'], row['repeat_each'], row['repetition_number'])
+    return rows
+
+
+def _span_fields(cycle: ScheduleCycleModel | None, fields: dict[str, Any]) -> dict[str, Any]:
+    if cycle is None:
+        raise EntityNotFound()
+    span = {field: fields.get(field, getattr(cycle, field)) for field in SPAN_FIELDS}
+    return {**fields, 'end': schedule_cycle_end(**span)}
+
+
+class ScheduleCycleSQLRepository(SQLRepository[ScheduleCycleModel, ScheduleCycleFindQuery], ScheduleCycleRepository):
+    @override
+    def _rows(self, models: Sequence[ScheduleCycleModel]) -> list[dict]:
+        return _rows_with_end(super()._rows(models))
+
+    @override
+    async def patch(self, id: Positive[int], **fields: Any) -> ScheduleCycleModel:
+        if SPAN_FIELDS & fields.keys():
+            fields = _span_fields(await self.find_by_id(id), fields)
+        return await super().patch(id, **fields)
+
+    @override
+    async def active_at(self, moment: datetime, schedule_ids: Sequence[int] | None = None) -> list[ScheduleCycleModel]:
+        return list(self.session.exec(_active_at_statement(moment, schedule_ids)).all())
+
+    @override
+    async def overlapping(self, start: datetime, end: datetime,
+                          schedule_ids: Sequence[int] | None = None) -> list[ScheduleCycleModel]:
+        return list(self.session.exec(_span_statement(start, end, schedule_ids)).all())
+
+
+class ScheduleCycleAsyncSQLRepository(AsyncSQLRepository[ScheduleCycleModel, ScheduleCycleFindQuery], ScheduleCycleRepository):
+    @override
+    def _rows(self, models: Sequence[ScheduleCycleModel]) -> list[dict]:
+        return _rows_with_end(super()._rows(models))
+
+    @override
+    async def patch(self, id: Positive[int], **fields: Any) -> ScheduleCycleModel:
+        if SPAN_FIELDS & fields.keys():
+            fields = _span_fields(await self.find_by_id(id), fields)
+        return await super().patch(id, **fields)
+
+    @override
+    async def active_at(self, moment: datetime, schedule_ids: Sequence[int] | None = None) -> list[ScheduleCycleModel]:
+        async with self.get_session() as session:
+            return list((await session.exec(_active_at_statement(moment, schedule_ids))).all())
+
+    @override
+    async def overlapping(self, start: datetime, end: datetime,
+                          schedule_ids: Sequence[int] | None = None) -> list[ScheduleCycleModel]:
+        async with self.get_session() as session:
+            return list((await session.exec(_span_statement(start, end, schedule_ids))).all())
+
+
+class InMemoryScheduleCycleRepository(ScheduleCycleSQLRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=ScheduleCycleModel,
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512,
+                'check_same_thread': False
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class SupabaseScheduleCycleRepository(ScheduleCycleSQLRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=ScheduleCycleModel,
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryScheduleCycleRepository(ScheduleCycleAsyncSQLRepository):
     @override
     def __init__(self) -> None:
         super().__init__(
             model=ScheduleCycleModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
                 'timeout': 2.0,
                 'cached_statements': 512
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
-class SupabaseScheduleCycleRepository(SQLRepository[ScheduleCycleModel, ScheduleCycleFindQuery]):
+class AsyncSupabaseScheduleCycleRepository(ScheduleCycleAsyncSQLRepository):
     @override
     def __init__(self) -> None:
         super().__init__(
             model=ScheduleCycleModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
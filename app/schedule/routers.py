@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, status, Body, Query
+from app.schedule.services import ScheduleCycleService
+from app.schedule.schemas import ScheduleCycleResponseSchema, OccurrencesRequestSchema, OccurrenceResponseSchema
+from app.exceptions import *
+from collections.abc import Callable
+from typing import Annotated
+from datetime import datetime
+
+class ScheduleRouter(APIRouter):
+    def __init__(self, prefix: str, schedule_cycle_service_factory: Callable[[], ScheduleCycleService]) -> None:
+        super().__init__(prefix=prefix)
+        self.cycle_svc = schedule_cycle_service_factory
+
+        self.add_api_route('/cycles/active', self.get_active_cycles, name="Get Active Schedule Cycles", methods=['get'])
+        self.add_api_route('/occurrences', self.find_occurrences, name="Find Occurrences", methods=['post'])
+
+    async def get_active_cycles(self, at: Annotated[datetime, Query()],
+                                schedule_id: Annotated[list[int] | None, Query()] = None) -> list[ScheduleCycleResponseSchema]:
+        """
+        ### Example
+          - http://localhost:8000/v1/schedule/cycles/active?at=2025-06-01T08:00:00&schedule_id=1&schedule_id=2
+        """
+        try:
+            cycles = await self.cycle_svc().active_at(at, schedule_id)
+            return [ScheduleCycleResponseSchema.model_validate(cycle) for cycle in cycles]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def find_occurrences(self, query: Annotated[OccurrencesRequestSchema, Body()]) -> list[OccurrenceResponseSchema]:
+        """
+        ### Example
+        ~~~json
+        {
+          "start": "2025-06-01T00:00:00",
+          "end": "2025-06-08T00:00:00",
+          "schedule_ids": [1, 2]
+        }
+        ~~~
+        """
+        if query.end <= query.start:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Window end must be after its start.")
+        try:
+            occurrences = await self.cycle_svc().find_occurrences(query.start, query.end, query.schedule_ids)
+            return [OccurrenceResponseSchema.model_validate(occurrence) for occurrence in occurrences]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
@@ -0,0 +1,25 @@
+from app.base.models import BaseModel, Field
+from datetime import datetime
+from typing import Annotated
+
+class ScheduleCycleResponseSchema(BaseModel):
+    id: Annotated[int, Field(gt=0)]
+    created_at: Annotated[datetime, Field()]
+    start: Annotated[datetime, Field()]
+    end: Annotated[datetime | None, Field()]
+    repeat_each: Annotated[int, Field(gt=0)]
+    repetition_number: Annotated[int, Field(ge=0)]
+    schedule_id: Annotated[int, Field(gt=0)]
+
+
+class OccurrencesRequestSchema(BaseModel):
+    start: Annotated[datetime, Field()]
+    end: Annotated[datetime, Field()]
+    schedule_ids: Annotated[list[Annotated[int, Field(gt=0)]] | None, Field()] = None
+
+
+class OccurrenceResponseSchema(BaseModel):
+    cycle_id: Annotated[int, Field(gt=0)]
+    schedule_id: Annotated[int, Field(gt=0)]
+    index: Annotated[int, Field(ge=0)]
+    at: Annotated[datetime, Field()]
@@ -0,0 +1,61 @@
+from app.schedule.repositories import ScheduleCycleRepository, ScheduleCycleFindQuery
+from app.schedule.models import ScheduleCycleModel, Occurrence
+from app.base.services import BaseService
+from collections.abc import Sequence
+from datetime import datetime
+import numpy as np
+
+MICROSECONDS_PER_HOUR = 3_600_000_000
+
+def expand_occurrences(start: np.ndarray, repeat_each: np.ndarray, repetition_number: np.ndarray,
+                       window_start: datetime, window_end: datetime) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Occurrence `k` of cycle `i` falls at `start[i] + k * repeat_each[i]` hours, `0 <= k < repetition_number[i]`.
+    Returns `(i, k, at)` of every occurrence in [window_start, window_end), ordered by `at`.
+    """
+    start = start.astype('datetime64[us]')
+    step = repeat_each.astype(np.int64) * MICROSECONDS_PER_HOUR
+    repetition_number = repetition_number.astype(np.int64)
+    to_start = (np.datetime64(window_start, 'us') - start).astype(np.int64)
+    to_end = (np.datetime64(window_end, 'us') - start).astype(np.int64)
+
+    first = np.clip(-(-to_start // step), 0, repetition_number)
+    last = np.clip(-(-to_end // step), 0, repetition_number)
+    counts = np.maximum(last - first, 0)
+
+    cycle = np.repeat(np.arange(len(start)), counts)
+    k = first[cycle] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    at = start[cycle] + (k * step[cycle]).astype('timedelta64[us]')
+    order = np.argsort(at, kind='stable')
+    return cycle[order], k[order], at[order]
+
+
+def _naive(moment: datetime) -> datetime:
+    """Cycles are stored as naive local times; compare windows on the same footing."""
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+
+class ScheduleCycleService(BaseService[ScheduleCycleModel, ScheduleCycleRepository, ScheduleCycleFindQuery]):
+    async def active_at(self, moment: datetime, schedule_ids: Sequence[int] | None = None) -> list[ScheduleCycleModel]:
+        return await self.repo.active_at(_naive(moment), schedule_ids)
+
+    async def overlapping(self, start: datetime, end: datetime,
+                          schedule_ids: Sequence[int] | None = None) -> list[ScheduleCycleModel]:
+        return await self.repo.overlapping(_naive(start), _naive(end), schedule_ids)
+
+    async def find_occurrences(self, start: datetime, end: datetime,
+                               schedule_ids: Sequence[int] | None = None) -> list[Occurrence]:
+        start, end = _naive(start), _naive(end)
+        cycles = await self.repo.overlapping(start, end, schedule_ids)
+        cycle, k, at = expand_occurrences(
+            np.array([c.start for c in cycles], dtype='datetime64[us]'),
+            np.array([c.repeat_each for c in cycles], dtype=np.int64),
+            np.array([c.repetition_number for c in cycles], dtype=np.int64),
+            start, end,
+        )
+        ids = np.array([c.id for c in cycles], dtype=np.int64)[cycle]
+        schedules = np.array([c.schedule_id for c in cycles], dtype=np.int64)[cycle]
+        return [
+            Occurrence(cycle_id=i, schedule_id=s, index=n, at=t)
+            for i, s, n, t in zip(ids.tolist(), schedules.tolist(), k.tolist(), at.tolist())
+        ]
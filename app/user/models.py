@@ -1,5 +1,5 @@
 from __future__ import annotations
-from app.base.models import SQLModel, MappedColumn
+from app.base.models import SQLModel, MappedColumn, keyset_indexes
 from sqlmodel import Relationship
 from typing import Literal, Annotated
 from datetime import datetime, date
@@ -8,6 +8,7 @@ AccountAttribute = Literal['id', 'updated_at', 'email', 'password', 'enabled']
 
 class AccountModel(SQLModel, table=True):
     __tablename__ = 'accounts'
+    __table_args__ = keyset_indexes('accounts', AccountAttribute, exclude={'password'})
 
     id: Annotated[int | None, MappedColumn(None, gt=0, primary_key=True, foreign_key="users.id")]
     updated_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
@@ -22,6 +23,7 @@ ProfileAttribute = Literal['id', 'updated_at', 'name', 'paternal', 'maternal', '
 
 class ProfileModel(SQLModel, table=True):
     __tablename__ = 'profiles'
+    __table_args__ = keyset_indexes('profiles', ProfileAttribute)
 
     id: Annotated[int | None, MappedColumn(None, gt=0, primary_key=True, foreign_key="users.id")]
     updated_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
@@ -38,6 +40,7 @@ RoleAttribute = Literal['id', 'created_at', 'updated_at', 'name']
 
 class RoleModel(SQLModel, table=True):
     __tablename__ = 'roles'
+    __table_args__ = keyset_indexes('roles', RoleAttribute)
 
     created_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
     updated_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
@@ -50,6 +53,7 @@ UserAttribute = Literal['id', 'created_at', 'role_id']
 
 class UserModel(SQLModel, table=True):
     __tablename__ = 'users'
+    __table_args__ = keyset_indexes('users', UserAttribute)
 
     created_at: Annotated[datetime, MappedColumn(default_factory=datetime.now)]
     role_id: Annotated[int | None, MappedColumn(None, gt=0, foreign_key="roles.id")]
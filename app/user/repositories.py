@@ -5,13 +5,21 @@ from app.user.models import (
     UserModel, UserAttribute,
 )
 from app.exceptions import *
-from app.base.repositories import BaseRepository, SQLRepository
-from app.base.models import FindQuery, FilterBy
+from app.base.repositories import BaseRepository, SQLRepository, AsyncSQLRepository
+from app.base.cache import CachedRepository, TTLCache
+from app.base.models import AggregateQuery, FilterQuery, FindQuery, FilterBy, Page
+from app.base.database import get_engine, get_async_engine
 from app.config import settings
 from app.utils import Interval, RegEx, Number
 from sqlmodel import create_engine, select
+from sqlalchemy import Engine
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
 from datetime import datetime, date
-from typing import override
+from typing import Literal, override
+from collections.abc import Sequence
 from abc import ABC, abstractmethod
 
 class AccountFilterBy(FilterBy, total=False):
@@ -25,6 +33,14 @@ class AccountFindQuery(FindQuery[AccountFilterBy, AccountAttribute]):
     ...
 
 
+class AccountFilterQuery(FilterQuery[AccountFilterBy]):
+    ...
+
+
+class AccountAggregateQuery(AggregateQuery[AccountFilterBy, AccountAttribute]):
+    model = AccountModel
+
+
 class AccountRepository(BaseRepository[AccountModel, AccountFindQuery], ABC):
     ...
 
@@ -34,11 +50,13 @@ class InMemoryAccountRepository(SQLRepository[AccountModel, AccountFindQuery], A
     def __init__(self) -> None:
         super().__init__(
             model=AccountModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
                 'timeout': 2.0,
-                'cached_statements': 512
+                'cached_statements': 512,
+                'check_same_thread': False
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -47,8 +65,34 @@ class SupabaseAccountRepository(SQLRepository[AccountModel, AccountFindQuery], A
     def __init__(self) -> None:
         super().__init__(
             model=AccountModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryAccountRepository(AsyncSQLRepository[AccountModel, AccountFindQuery], AccountRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=AccountModel,
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncSupabaseAccountRepository(AsyncSQLRepository[AccountModel, AccountFindQuery], AccountRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=AccountModel,
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -66,6 +110,14 @@ class ProfileFindQuery(FindQuery[ProfileFilterBy, ProfileAttribute]):
     ...
 
 
+class ProfileFilterQuery(FilterQuery[ProfileFilterBy]):
+    ...
+
+
+class ProfileAggregateQuery(AggregateQuery[ProfileFilterBy, ProfileAttribute]):
+    model = ProfileModel
+
+
 class ProfileRepository(BaseRepository[ProfileModel, ProfileFindQuery], ABC):
     ...
 
@@ -75,11 +127,13 @@ class InMemoryProfileRepository(SQLRepository[ProfileModel, ProfileFindQuery], P
     def __init__(self) -> None:
         super().__init__(
             model=ProfileModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
                 'timeout': 2.0,
-                'cached_statements': 512
+                'cached_statements': 512,
+                'check_same_thread': False
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -88,8 +142,34 @@ class SupabaseProfileRepository(SQLRepository[ProfileModel, ProfileFindQuery], P
     def __init__(self) -> None:
         super().__init__(
             model=ProfileModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryProfileRepository(AsyncSQLRepository[ProfileModel, ProfileFindQuery], ProfileRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=ProfileModel,
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncSupabaseProfileRepository(AsyncSQLRepository[ProfileModel, ProfileFindQuery], ProfileRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=ProfileModel,
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -104,6 +184,14 @@ class RoleFindQuery(FindQuery[RoleFilterBy, RoleAttribute]):
     ...
 
 
+class RoleFilterQuery(FilterQuery[RoleFilterBy]):
+    ...
+
+
+class RoleAggregateQuery(AggregateQuery[RoleFilterBy, RoleAttribute]):
+    model = RoleModel
+
+
 class RoleRepository(BaseRepository[RoleModel, RoleFindQuery], ABC):
     @abstractmethod
     async def find_by_name(self, name: str) -> RoleModel | None: ...
@@ -121,16 +209,55 @@ class RoleSQLRepository(SQLRepository[RoleModel, RoleFindQuery], RoleRepository)
         return self.session.exec(select(self.model).where(self.model.name == name)).first()
 
 
+class RoleAsyncSQLRepository(AsyncSQLRepository[RoleModel, RoleFindQuery], RoleRepository):
+    async def create_defaults(self) -> None:
+        roles = ["Base User", "Family Medicine Doctor", "Administrator"]
+        for role in roles:
+            if not await self.find_by_name(role):
+                await self.add(RoleModel(name=role))
+
+    async def find_by_name(self, name: str) -> RoleModel | None:
+        assert isinstance(name, str), "Name must be a string."
+        async with self.get_session() as session:
+            return (await session.exec(select(self.model).where(self.model.name == name))).first()
+
+
+class CachedRoleRepository(CachedRepository[RoleModel, RoleFindQuery], RoleRepository):
+    def __init__(self, repository: RoleRepository, max_entries: int = 1024, ttl: float = 60.0) -> None:
+        super().__init__(repository, max_entries, ttl)
+        self.names: TTLCache[str, RoleModel] = TTLCache(max_entries, ttl)
+        self._name_writes = 0
+
+    @override
+    def _evict(self, id: int | None) -> None:
+        super()._evict(id)
+        self.names.clear()
+        self._name_writes += 1
+
+    @override
+    async def find_by_name(self, name: str) -> RoleModel | None:
+        role = self.names.get(name)
+        if role is not None:
+            return self._snapshot(role)
+        writes = self._name_writes
+        role = await self.repo.find_by_name(name)
+        if role is not None and writes == self._name_writes:
+            self.names.set(name, self._snapshot(role))
+        return role
+
+
 class InMemoryRoleRepository(RoleSQLRepository, RoleRepository):
     @override
     def __init__(self) -> None:
         super().__init__(
             model=RoleModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
                 'timeout': 2.0,
-                'cached_statements': 512
+                'cached_statements': 512,
+                'check_same_thread': False
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -139,8 +266,34 @@ class SupabaseRoleRepository(RoleSQLRepository, RoleRepository):
     def __init__(self) -> None:
         super().__init__(
             model=RoleModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryRoleRepository(RoleAsyncSQLRepository, RoleRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=RoleModel,
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncSupabaseRoleRepository(RoleAsyncSQLRepository, RoleRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=RoleModel,
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
@@ -154,28 +307,139 @@ class UserFindQuery(FindQuery[UserFilterBy, UserAttribute]):
     ...
 
 
+class UserFilterQuery(FilterQuery[UserFilterBy]):
+    ...
+
+
+class UserAggregateQuery(AggregateQuery[UserFilterBy, UserAttribute]):
+    model = UserModel
+
+
 class UserRepository(BaseRepository[UserModel, UserFindQuery], ABC):
     ...
 
 
-class InMemoryUserRepository(SQLRepository[UserModel, UserFindQuery], UserRepository):
+type UserGraphLoader = Literal['selectin', 'joined', 'lazy']
+
+# Tables a user is loaded together with; created next to `users` so the graph can be joined.
+USER_GRAPH_TABLES = [RoleModel.__table__, UserModel.__table__, AccountModel.__table__, ProfileModel.__table__]
+
+def user_graph_options(loader: UserGraphLoader) -> list[ExecutableOption]:
+    match loader:
+        case 'selectin':
+            strategy = selectinload
+        case 'joined':
+            strategy = joinedload
+        case 'lazy':
+            return []
+    return [strategy(UserModel.account), strategy(UserModel.profile), strategy(UserModel.role)]
+
+
+class UserSQLRepository(SQLRepository[UserModel, UserFindQuery], UserRepository):
+    # 'selectin' costs one query per relationship regardless of page size, 'joined' a single query.
+    loader: UserGraphLoader = 'selectin'
+
+    @override
+    def __init__(self, model: type[UserModel], engine: Engine, page_size_max: int,
+                 page_size_default: int | None = None) -> None:
+        UserModel.metadata.create_all(engine, tables=USER_GRAPH_TABLES)
+        super().__init__(model, engine, page_size_max, page_size_default)
+
+    @override
+    async def find_by_id(self, id: int, loader: UserGraphLoader | None = None) -> UserModel | None:
+        return self.session.get(self.model, id, options=user_graph_options(loader or self.loader))
+
+    @override
+    async def find(self, query: UserFindQuery, loader: UserGraphLoader | None = None) -> Page[UserModel, UserFindQuery] | None:
+        stmt = self._find_statement(query).options(*user_graph_options(loader or self.loader))
+        return self._page(query, list(self.session.exec(stmt, params=self._find_params(query)).all()))
+
+    @override
+    async def find_by_ids(self, ids: Sequence[int], loader: UserGraphLoader | None = None) -> list[UserModel | None]:
+        options = user_graph_options(loader or self.loader)
+        return self._align(ids, (model for stmt in self._ids_statements(ids) for model in self.session.exec(stmt.options(*options))))
+
+
+class UserAsyncSQLRepository(AsyncSQLRepository[UserModel, UserFindQuery], UserRepository):
+    # Lazy loads cannot run under an AsyncSession, so 'lazy' leaves the graph unloaded.
+    loader: UserGraphLoader = 'selectin'
+
+    @override
+    async def create_table(self) -> None:
+        if self._table_created:
+            return
+        async with self.engine.begin() as conn:
+            await conn.run_sync(UserModel.metadata.create_all, tables=USER_GRAPH_TABLES)
+        self._table_created = True
+
+    @override
+    async def find_by_id(self, id: int, loader: UserGraphLoader | None = None) -> UserModel | None:
+        async with self.get_session() as session:
+            return await session.get(self.model, id, options=user_graph_options(loader or self.loader))
+
+    @override
+    async def find(self, query: UserFindQuery, loader: UserGraphLoader | None = None) -> Page[UserModel, UserFindQuery] | None:
+        stmt = self._find_statement(query).options(*user_graph_options(loader or self.loader))
+        async with self.get_session() as session:
+            models = list((await session.exec(stmt, params=self._find_params(query))).all())
+        return self._page(query, models)
+
+    @override
+    async def find_by_ids(self, ids: Sequence[int], loader: UserGraphLoader | None = None) -> list[UserModel | None]:
+        options = user_graph_options(loader or self.loader)
+        models: list[UserModel] = []
+        async with self.get_session() as session:
+            for stmt in self._ids_statements(ids):
+                models.extend((await session.exec(stmt.options(*options))).all())
+        return self._align(ids, models)
+
+
+class InMemoryUserRepository(UserSQLRepository, UserRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=UserModel,
+            engine=create_engine(url="sqlite://", poolclass=StaticPool, connect_args={
+                'timeout': 2.0,
+                'cached_statements': 512,
+                'check_same_thread': False
+            }),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class SupabaseUserRepository(UserSQLRepository, UserRepository):
+    @override
+    def __init__(self) -> None:
+        super().__init__(
+            model=UserModel,
+            engine=get_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
+        )
+
+
+class AsyncInMemoryUserRepository(UserAsyncSQLRepository, UserRepository):
     @override
     def __init__(self) -> None:
         super().__init__(
             model=UserModel,
-            engine=create_engine(url="sqlite://", connect_args={
+            engine=create_async_engine(url="sqlite+aiosqlite://", connect_args={
                 'timeout': 2.0,
                 'cached_statements': 512
             }),
-            page_size_max=64
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
 
 
-class SupabaseUserRepository(SQLRepository[UserModel, UserFindQuery], UserRepository):
+class AsyncSupabaseUserRepository(UserAsyncSQLRepository, UserRepository):
     @override
     def __init__(self) -> None:
         super().__init__(
             model=UserModel,
-            engine=create_engine(url=settings.supabase_url),
-            page_size_max=64
+            engine=get_async_engine(settings.supabase_url),
+            page_size_max=settings.page_size_max,
+            page_size_default=settings.page_size_default
         )
@@ -1,5 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Path, Body
-from app.user.repositories import AccountFindQuery, ProfileFindQuery, RoleFindQuery, UserFindQuery
+from fastapi import APIRouter, HTTPException, status, Path, Body, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.user.repositories import (
+    AccountFindQuery, AccountFilterQuery, AccountAggregateQuery,
+    ProfileFindQuery, ProfileFilterQuery, ProfileAggregateQuery,
+    RoleFindQuery, RoleFilterQuery, RoleAggregateQuery,
+    UserFindQuery, UserFilterQuery, UserAggregateQuery,
+)
 from app.user.services import AccountService, ProfileService, RoleService, UserService
 from app.user.schemas import (
     AccountRequestSchema, AccountResponseSchema,
@@ -7,12 +14,19 @@ from app.user.schemas import (
     RoleRequestSchema, RoleResponseSchema,
     UserResponseSchema, UserRequestSchema,
 )
-from app.user.models import AccountModel, ProfileModel, RoleModel, UserModel
+from app.user.models import (
+    AccountModel, AccountAttribute,
+    ProfileModel, ProfileAttribute,
+    RoleModel, RoleAttribute,
+    UserModel, UserAttribute,
+)
 from app.exceptions import *
-from app.base.models import Page
-from app.utils import Positive, parse_last_retrieved
+from app.base.models import Batch, Page
+from app.base.responses import serialized_response
+from app.base.export import ExportFormat, export_response
+from app.utils import Positive, attr_pattern, parse_last_retrieved
 from collections.abc import Callable
-from typing import Annotated
+from typing import Annotated, Any
 from datetime import datetime
 
 class AccountRouter(APIRouter):
@@ -21,7 +35,12 @@ class AccountRouter(APIRouter):
         self.svc = account_service_factory
 
         self.add_api_route('/', self.post_account, name="Post Account", methods=['post'])
+        self.add_api_route('/bulk', self.post_accounts, name="Post Accounts", methods=['post'])
+        self.add_api_route('/batch-get', self.batch_get_accounts, name="Batch Get Accounts", methods=['post'])
         self.add_api_route('/find', self.find_accounts, name="Find Accounts", methods=['post'])
+        self.add_api_route('/count', self.count_accounts, name="Count Accounts", methods=['post'])
+        self.add_api_route('/aggregate', self.aggregate_accounts, name="Aggregate Accounts", methods=['post'])
+        self.add_api_route('/export', self.export_accounts, name="Export Accounts", methods=['get'])
         self.add_api_route('/{id}', self.get_account, name="Get Account", methods=['get'])
         self.add_api_route('/{id}', self.put_account, name="Put Account", methods=['put'])
         self.add_api_route('/{id}', self.delete_account, name="Delete Account", methods=['delete'])
@@ -35,27 +54,61 @@ class AccountRouter(APIRouter):
         model = await self.svc().add(AccountModel.model_validate(account))
         return AccountResponseSchema.model_validate(model)
 
-    async def get_account(self, id: Annotated[Positive[int], Path()]) -> AccountResponseSchema:
+    async def post_accounts(self, accounts: Annotated[list[AccountRequestSchema], Body()]) -> list[AccountResponseSchema]:
+        try:
+            models = await self.svc().add_many([AccountModel.model_validate(account) for account in accounts])
+            return [AccountResponseSchema.model_validate(model) for model in models]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def batch_get_accounts(self, ids: Annotated[list[Positive[int]], Body()]) -> Batch[AccountResponseSchema]:
+        try:
+            models = await self.svc().find_by_ids(ids)
+            return serialized_response(Batch[AccountResponseSchema], {
+                'data': [model for model in models if model],
+                'missing': [id for id, model in zip(ids, models) if not model],
+            })
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def get_account(self, id: Annotated[Positive[int], Path()], attr: Annotated[str | None, Query(pattern=attr_pattern(AccountAttribute))] = None) -> AccountResponseSchema | dict[str, Any]:
         try:
+            if attr:
+                projected = await self.svc().project_by_id(id, attr.split(','))
+                if projected:
+                    return JSONResponse(jsonable_encoder(projected))
+                raise HTTPException(status.HTTP_404_NOT_FOUND, "Account not found.")
             model: AccountModel | None = await self.svc().find_by_id(id)
             if model:
-                return AccountResponseSchema.model_validate(model)
+                return serialized_response(AccountResponseSchema, model)
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Account not found.")
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
-    async def find_accounts(self, query: Annotated[AccountFindQuery, Body()]) -> Page[AccountResponseSchema, AccountFindQuery] | None:
+    async def export_accounts(self, attr: Annotated[str | None, Query(pattern=attr_pattern(AccountAttribute))] = None,
+                              format: Annotated[ExportFormat, Query()] = 'ndjson') -> StreamingResponse:
+        return export_response(self.svc().stream(attr.split(',') if attr else None), format, 'accounts')
+
+    async def aggregate_accounts(self, query: Annotated[AccountAggregateQuery, Body()]) -> list[dict[str, Any]]:
+        try:
+            return await self.svc().aggregate(query)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def count_accounts(self, query: Annotated[AccountFilterQuery, Body()],
+                             estimate: Annotated[bool, Query()] = False) -> int:
+        try:
+            return await self.svc().count(query, estimate)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def find_accounts(self, query: Annotated[AccountFindQuery, Body()], attr: Annotated[str | None, Query(pattern=attr_pattern(AccountAttribute))] = None) -> Page[AccountResponseSchema, AccountFindQuery] | Page[dict[str, Any], AccountFindQuery] | None:
         try:
             if query.last:
                 query.last = parse_last_retrieved(list(query.last), AccountModel, query.order_by)
-            page = await self.svc().find(query)
-            if not page:
-                return None
-            response_page = Page[AccountResponseSchema, AccountFindQuery](
-                next=page.next,
-                data=[AccountResponseSchema.model_validate(account) for account in page.data],
-            )
-            return response_page
+            if attr:
+                return JSONResponse(jsonable_encoder(await self.svc().project(query, attr.split(','))))
+            return serialized_response(Page[AccountResponseSchema, AccountFindQuery] | None, await self.svc().find(query))
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
@@ -110,7 +163,12 @@ class ProfileRouter(APIRouter):
         self.svc = profile_service_factory
 
         self.add_api_route('/', self.post_profile, name="Post Profile", methods=['post'])
+        self.add_api_route('/bulk', self.post_profiles, name="Post Profiles", methods=['post'])
+        self.add_api_route('/batch-get', self.batch_get_profiles, name="Batch Get Profiles", methods=['post'])
         self.add_api_route('/find', self.find_profiles, name="Find Profiles", methods=['post'])
+        self.add_api_route('/count', self.count_profiles, name="Count Profiles", methods=['post'])
+        self.add_api_route('/aggregate', self.aggregate_profiles, name="Aggregate Profiles", methods=['post'])
+        self.add_api_route('/export', self.export_profiles, name="Export Profiles", methods=['get'])
         self.add_api_route('/{id}', self.get_profile, name="Get Profile", methods=['get'])
         self.add_api_route('/{id}', self.put_profile, name="Put Profile", methods=['put'])
         self.add_api_route('/{id}', self.delete_profile, name="Delete Profile", methods=['delete'])
@@ -121,27 +179,61 @@ class ProfileRouter(APIRouter):
     async def post_profile(self, profile: Annotated[ProfileRequestSchema, Body()]) -> ProfileResponseSchema:
         return ProfileResponseSchema.model_validate((await self.svc().add(ProfileModel.model_validate(profile))).model_dump())
 
-    async def get_profile(self, id: Annotated[Positive[int], Path()]) -> ProfileResponseSchema:
+    async def post_profiles(self, profiles: Annotated[list[ProfileRequestSchema], Body()]) -> list[ProfileResponseSchema]:
+        try:
+            models = await self.svc().add_many([ProfileModel.model_validate(profile) for profile in profiles])
+            return [ProfileResponseSchema.model_validate(model) for model in models]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def batch_get_profiles(self, ids: Annotated[list[Positive[int]], Body()]) -> Batch[ProfileResponseSchema]:
+        try:
+            models = await self.svc().find_by_ids(ids)
+            return serialized_response(Batch[ProfileResponseSchema], {
+                'data': [model for model in models if model],
+                'missing': [id for id, model in zip(ids, models) if not model],
+            })
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def get_profile(self, id: Annotated[Positive[int], Path()], attr: Annotated[str | None, Query(pattern=attr_pattern(ProfileAttribute))] = None) -> ProfileResponseSchema | dict[str, Any]:
         try:
+            if attr:
+                projected = await self.svc().project_by_id(id, attr.split(','))
+                if projected:
+                    return JSONResponse(jsonable_encoder(projected))
+                raise HTTPException(status.HTTP_404_NOT_FOUND, "Profile not found.")
             profile: ProfileModel | None = await self.svc().find_by_id(id)
             if profile:
-                return ProfileResponseSchema.model_validate(profile)
+                return serialized_response(ProfileResponseSchema, profile)
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Profile not found.")
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
-    async def find_profiles(self, query: Annotated[ProfileFindQuery, Body()]) -> Page[ProfileResponseSchema, ProfileFindQuery] | None:
+    async def export_profiles(self, attr: Annotated[str | None, Query(pattern=attr_pattern(ProfileAttribute))] = None,
+                              format: Annotated[ExportFormat, Query()] = 'ndjson') -> StreamingResponse:
+        return export_response(self.svc().stream(attr.split(',') if attr else None), format, 'profiles')
+
+    async def aggregate_profiles(self, query: Annotated[ProfileAggregateQuery, Body()]) -> list[dict[str, Any]]:
+        try:
+            return await self.svc().aggregate(query)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def count_profiles(self, query: Annotated[ProfileFilterQuery, Body()],
+                             estimate: Annotated[bool, Query()] = False) -> int:
+        try:
+            return await self.svc().count(query, estimate)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def find_profiles(self, query: Annotated[ProfileFindQuery, Body()], attr: Annotated[str | None, Query(pattern=attr_pattern(ProfileAttribute))] = None) -> Page[ProfileResponseSchema, ProfileFindQuery] | Page[dict[str, Any], ProfileFindQuery] | None:
         try:
             if query.last:
                 query.last = parse_last_retrieved(list(query.last), ProfileModel, query.order_by)
-            page = await self.svc().find(query)
-            if not page:
-                return None
-            response_page = Page[ProfileResponseSchema, ProfileFindQuery](
-                next=page.next,
-                data=[ProfileResponseSchema.model_validate(profile) for profile in page.data],
-            )
-            return response_page
+            if attr:
+                return JSONResponse(jsonable_encoder(await self.svc().project(query, attr.split(','))))
+            return serialized_response(Page[ProfileResponseSchema, ProfileFindQuery] | None, await self.svc().find(query))
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
@@ -184,7 +276,12 @@ class RoleRouter(APIRouter):
         self.svc = role_service_factory
 
         self.add_api_route('/', self.post_role, name="Post Role", methods=['post'])
+        self.add_api_route('/bulk', self.post_roles, name="Post Roles", methods=['post'])
+        self.add_api_route('/batch-get', self.batch_get_roles, name="Batch Get Roles", methods=['post'])
         self.add_api_route('/find', self.find_roles, name="Find Roles", methods=['post'])
+        self.add_api_route('/count', self.count_roles, name="Count Roles", methods=['post'])
+        self.add_api_route('/aggregate', self.aggregate_roles, name="Aggregate Roles", methods=['post'])
+        self.add_api_route('/export', self.export_roles, name="Export Roles", methods=['get'])
         self.add_api_route('/{id}', self.get_role, name="Get Role", methods=['get'])
         self.add_api_route('/{id}', self.put_role, name="Put Role", methods=['put'])
         self.add_api_route('/{id}', self.delete_role, name="Delete Role", methods=['delete'])
@@ -196,27 +293,61 @@ class RoleRouter(APIRouter):
     async def post_role(self, role: Annotated[RoleRequestSchema, Body()]) -> RoleResponseSchema:
         return RoleResponseSchema.model_validate((await self.svc().add(RoleModel.model_validate(role))).model_dump())
 
-    async def get_role(self, id: Annotated[Positive[int], Path()]) -> RoleResponseSchema:
+    async def post_roles(self, roles: Annotated[list[RoleRequestSchema], Body()]) -> list[RoleResponseSchema]:
         try:
+            models = await self.svc().add_many([RoleModel.model_validate(role) for role in roles])
+            return [RoleResponseSchema.model_validate(model) for model in models]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def batch_get_roles(self, ids: Annotated[list[Positive[int]], Body()]) -> Batch[RoleResponseSchema]:
+        try:
+            models = await self.svc().find_by_ids(ids)
+            return serialized_response(Batch[RoleResponseSchema], {
+                'data': [model for model in models if model],
+                'missing': [id for id, model in zip(ids, models) if not model],
+            })
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def get_role(self, id: Annotated[Positive[int], Path()], attr: Annotated[str | None, Query(pattern=attr_pattern(RoleAttribute))] = None) -> RoleResponseSchema | dict[str, Any]:
+        try:
+            if attr:
+                projected = await self.svc().project_by_id(id, attr.split(','))
+                if projected:
+                    return JSONResponse(jsonable_encoder(projected))
+                raise HTTPException(status.HTTP_404_NOT_FOUND, "Role not found.")
             role: RoleModel | None = await self.svc().find_by_id(id)
             if role:
-                return RoleResponseSchema.model_validate(role)
+                return serialized_response(RoleResponseSchema, role)
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Role not found.")
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
-    async def find_roles(self, query: Annotated[RoleFindQuery, Body()]) -> Page[RoleResponseSchema, RoleFindQuery] | None:
+    async def export_roles(self, attr: Annotated[str | None, Query(pattern=attr_pattern(RoleAttribute))] = None,
+                           format: Annotated[ExportFormat, Query()] = 'ndjson') -> StreamingResponse:
+        return export_response(self.svc().stream(attr.split(',') if attr else None), format, 'roles')
+
+    async def aggregate_roles(self, query: Annotated[RoleAggregateQuery, Body()]) -> list[dict[str, Any]]:
+        try:
+            return await self.svc().aggregate(query)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def count_roles(self, query: Annotated[RoleFilterQuery, Body()],
+                          estimate: Annotated[bool, Query()] = False) -> int:
+        try:
+            return await self.svc().count(query, estimate)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def find_roles(self, query: Annotated[RoleFindQuery, Body()], attr: Annotated[str | None, Query(pattern=attr_pattern(RoleAttribute))] = None) -> Page[RoleResponseSchema, RoleFindQuery] | Page[dict[str, Any], RoleFindQuery] | None:
         try:
             if query.last:
                 query.last = parse_last_retrieved(list(query.last), RoleModel, query.order_by)
-            page = await self.svc().find(query)
-            if not page:
-                return None
-            response_page = Page[RoleResponseSchema, RoleFindQuery](
-                next=page.next,
-                data=[RoleResponseSchema.model_validate(role) for role in page.data],
-            )
-            return response_page
+            if attr:
+                return JSONResponse(jsonable_encoder(await self.svc().project(query, attr.split(','))))
+            return serialized_response(Page[RoleResponseSchema, RoleFindQuery] | None, await self.svc().find(query))
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
@@ -264,7 +395,12 @@ class UserRouter(APIRouter):
         super().__init__(prefix=prefix)
         self.svc = user_service_factory
         self.add_api_route('/', self.post_user, name="Post User", methods=['post'])
+        self.add_api_route('/bulk', self.post_users, name="Post Users", methods=['post'])
+        self.add_api_route('/batch-get', self.batch_get_users, name="Batch Get Users", methods=['post'])
         self.add_api_route('/find', self.find_users, name="Find Users", methods=['post'])
+        self.add_api_route('/count', self.count_users, name="Count Users", methods=['post'])
+        self.add_api_route('/aggregate', self.aggregate_users, name="Aggregate Users", methods=['post'])
+        self.add_api_route('/export', self.export_users, name="Export Users", methods=['get'])
         self.add_api_route('/{id}', self.get_user, name="Get User", methods=['get'])
         self.add_api_route('/{id}', self.put_user, name="Put User", methods=['put'])
         self.add_api_route('/{id}', self.delete_user, name="Delete User", methods=['delete'])
@@ -278,25 +414,60 @@ class UserRouter(APIRouter):
         model = await self.svc().add(UserModel.model_validate(user))
         return UserResponseSchema.model_validate(model)
 
-    async def find_users(self, query: Annotated[UserFindQuery, Body()]) -> Page[UserResponseSchema, UserFindQuery] | None:
+    async def post_users(self, users: Annotated[list[UserRequestSchema], Body()]) -> list[UserResponseSchema]:
+        try:
+            models = await self.svc().add_many([UserModel.model_validate(user) for user in users])
+            return [UserResponseSchema.model_validate(model) for model in models]
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def batch_get_users(self, ids: Annotated[list[Positive[int]], Body()]) -> Batch[UserResponseSchema]:
+        try:
+            models = await self.svc().find_by_ids(ids)
+            return serialized_response(Batch[UserResponseSchema], {
+                'data': [model for model in models if model],
+                'missing': [id for id, model in zip(ids, models) if not model],
+            })
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def export_users(self, attr: Annotated[str | None, Query(pattern=attr_pattern(UserAttribute))] = None,
+                           format: Annotated[ExportFormat, Query()] = 'ndjson') -> StreamingResponse:
+        return export_response(self.svc().stream(attr.split(',') if attr else None), format, 'users')
+
+    async def aggregate_users(self, query: Annotated[UserAggregateQuery, Body()]) -> list[dict[str, Any]]:
+        try:
+            return await self.svc().aggregate(query)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def count_users(self, query: Annotated[UserFilterQuery, Body()],
+                          estimate: Annotated[bool, Query()] = False) -> int:
+        try:
+            return await self.svc().count(query, estimate)
+        except ConnectionTimeout:
+            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
+
+    async def find_users(self, query: Annotated[UserFindQuery, Body()], attr: Annotated[str | None, Query(pattern=attr_pattern(UserAttribute))] = None) -> Page[UserResponseSchema, UserFindQuery] | Page[dict[str, Any], UserFindQuery] | None:
         try:
             if query.last:
                 query.last = parse_last_retrieved(query.last, UserModel, query.order_by)
-            page = await self.svc().find(query)
-            if not page:
-                return None
-            return Page[UserResponseSchema, UserFindQuery](
-                next=page.next,
-                data=[UserResponseSchema.model_validate(user) for user in page.data],
-            )
+            if attr:
+                return JSONResponse(jsonable_encoder(await self.svc().project(query, attr.split(','))))
+            return serialized_response(Page[UserResponseSchema, UserFindQuery] | None, await self.svc().find(query))
         except ConnectionTimeout:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database connection timeout.")
 
-    async def get_user(self, id: Annotated[Positive[int], Path()]) -> UserResponseSchema:
+    async def get_user(self, id: Annotated[Positive[int], Path()], attr: Annotated[str | None, Query(pattern=attr_pattern(UserAttribute))] = None) -> UserResponseSchema | dict[str, Any]:
+        if attr:
+            projected = await self.svc().project_by_id(id, attr.split(','))
+            if projected:
+                return JSONResponse(jsonable_encoder(projected))
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found.")
         user = await self.svc().find_by_id(id)
         if not user:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found.")
-        return UserResponseSchema.model_validate(user)
+        return serialized_response(UserResponseSchema, user)
 
     async def put_user(self, id: Annotated[Positive[int], Path()], user: Annotated[UserRequestSchema, Body()]) -> UserResponseSchema:
         try:
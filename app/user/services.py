@@ -9,141 +9,109 @@ from app.base.services import BaseService
 from app.exceptions import *
 from app.utils import Positive
 from datetime import datetime, date
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from typing import override
 
 class AccountService(BaseService[AccountModel, AccountRepository, AccountFindQuery]):
     async def get_updated_at(self, id: Positive[int]) -> datetime:
-        account: AccountModel | None = await self.find_by_id(id)
+        account = await self.project_by_id(id, ['updated_at'])
         if not account:
             raise EntityNotFound()
-        return account.updated_at
+        return account['updated_at']
 
     async def get_email(self, id: Positive[int]) -> str:
-        account: AccountModel | None = await self.find_by_id(id)
+        account = await self.project_by_id(id, ['email'])
         if not account:
             raise EntityNotFound()
-        return account.email
+        return account['email']
 
     async def get_enabled(self, id: Positive[int]) -> bool:
-        account: AccountModel | None = await self.find_by_id(id)
+        account = await self.project_by_id(id, ['enabled'])
         if not account:
             raise EntityNotFound()
-        return account.enabled
+        return account['enabled']
 
     async def update_email(self, id: Positive[int], email: str) -> AccountModel:
-        account: AccountModel | None = await self.find_by_id(id)
-        if not account:
-            raise EntityNotFound()
-        account.email = email
-        return await self.repo.update(id, account)
+        return await self.repo.patch(id, email=email)
 
     async def update_enabled(self, id: Positive[int], enabled: bool) -> AccountModel:
-        account: AccountModel | None = await self.find_by_id(id)
-        if not account:
-            raise EntityNotFound()
-        account.enabled = enabled
-        return await self.repo.update(id, account)
+        return await self.repo.patch(id, enabled=enabled)
 
 
 class ProfileService(BaseService[ProfileModel, ProfileRepository, ProfileFindQuery]):
     async def get_updated_at(self, id: Positive[int]) -> datetime:
-        profile: ProfileModel | None = await self.find_by_id(id)
+        profile = await self.project_by_id(id, ['updated_at'])
         if not profile:
             raise EntityNotFound()
-        return profile.updated_at
+        return profile['updated_at']
 
     async def get_name(self, id: Positive[int]) -> str:
-        profile: ProfileModel | None = await self.find_by_id(id)
+        profile = await self.project_by_id(id, ['name'])
         if not profile:
             raise EntityNotFound()
-        return profile.name
+        return profile['name']
 
     async def get_paternal(self, id: Positive[int]) -> str:
-        profile: ProfileModel | None = await self.find_by_id(id)
+        profile = await self.project_by_id(id, ['paternal'])
         if not profile:
             raise EntityNotFound()
-        return profile.paternal
+        return profile['paternal']
 
     async def get_maternal(self, id: Positive[int]) -> str:
-        profile: ProfileModel | None = await self.find_by_id(id)
+        profile = await self.project_by_id(id, ['maternal'])
         if not profile:
             raise EntityNotFound()
-        return profile.maternal
+        return profile['maternal']
 
     async def get_phone(self, id: Positive[int]) -> int | None:
-        profile: ProfileModel | None = await self.find_by_id(id)
+        profile = await self.project_by_id(id, ['phone'])
         if not profile:
             raise EntityNotFound()
-        return profile.phone
+        return profile['phone']
 
     async def get_birthdate(self, id: Positive[int]) -> date:
-        profile: ProfileModel | None = await self.find_by_id(id)
+        profile = await self.project_by_id(id, ['birthdate'])
         if not profile:
             raise EntityNotFound()
-        return profile.birthdate
+        return profile['birthdate']
 
     async def update_name(self, id: Positive[int], name: str) -> ProfileModel:
-        profile: ProfileModel | None = await self.find_by_id(id)
-        if not profile:
-            raise EntityNotFound()
-        profile.name = name
-        return await self.repo.update(id, profile)
+        return await self.repo.patch(id, name=name)
 
     async def update_paternal(self, id: Positive[int], paternal: str) -> ProfileModel:
-        profile: ProfileModel | None = await self.find_by_id(id)
-        if not profile:
-            raise EntityNotFound()
-        profile.paternal = paternal
-        return await self.repo.update(id, profile)
+        return await self.repo.patch(id, paternal=paternal)
 
     async def update_maternal(self, id: Positive[int], maternal: str) -> ProfileModel:
-        profile: ProfileModel | None = await self.find_by_id(id)
-        if not profile:
-            raise EntityNotFound()
-        profile.maternal = maternal
-        return await self.repo.update(id, profile)
+        return await self.repo.patch(id, maternal=maternal)
 
     async def update_phone(self, id: Positive[int], phone: int | None) -> ProfileModel:
-        profile: ProfileModel | None = await self.find_by_id(id)
-        if not profile:
-            raise EntityNotFound()
-        profile.phone = phone
-        return await self.repo.update(id, profile)
+        return await self.repo.patch(id, phone=phone)
 
     async def update_birthdate(self, id: Positive[int], birthdate: date) -> ProfileModel:
-        profile: ProfileModel | None = await self.find_by_id(id)
-        if not profile:
-            raise EntityNotFound()
-        profile.birthdate = birthdate
-        return await self.repo.update(id, profile)
+        return await self.repo.patch(id, birthdate=birthdate)
 
 
 class RoleService(BaseService[RoleModel, RoleRepository, RoleFindQuery]):
     async def get_created_at(self, id: Positive[int]) -> datetime:
-        role: RoleModel | None = await self.find_by_id(id)
+        role = await self.project_by_id(id, ['created_at'])
         if not role:
             raise EntityNotFound()
-        return role.created_at
+        return role['created_at']
 
     async def get_updated_at(self, id: Positive[int]) -> datetime:
-        role: RoleModel | None = await self.find_by_id(id)
+        role = await self.project_by_id(id, ['updated_at'])
         if not role:
             raise EntityNotFound()
-        return role.updated_at
+        return role['updated_at']
 
     async def get_name(self, id: Positive[int]) -> str:
-        role: RoleModel | None = await self.find_by_id(id)
+        role = await self.project_by_id(id, ['name'])
         if not role:
             raise EntityNotFound()
-        return role.name
+        return role['name']
 
     async def update_name(self, id: Positive[int], name: str) -> RoleModel:
-        role: RoleModel | None = await self.find_by_id(id)
-        if not role:
-            raise EntityNotFound()
-        role.name = name
-        return await self.repo.update(id, role)
+        return await self.repo.patch(id, name=name)
 
     async def find_by_name(self, name: str) -> RoleModel | None:
         return await self.repo.find_by_name(name)
@@ -177,6 +145,15 @@ class UserService(BaseService[UserModel, UserRepository, UserFindQuery]):
 
         return persisted_user
 
+    @override
+    async def add_many(self, models: Sequence[UserModel]) -> list[UserModel]:
+        # Users cascade into account and profile rows, which a single INSERT cannot express.
+        return [await self.add(model) for model in models]
+
+    @override
+    async def upsert_many(self, models: Sequence[UserModel]) -> list[UserModel]:
+        return [await self.upsert(model) for model in models]
+
     @override
     async def find_by_id(self, id: Positive[int]) -> UserModel | None:
         user = await super().find_by_id(id)
@@ -191,10 +168,10 @@ class UserService(BaseService[UserModel, UserRepository, UserFindQuery]):
         return user
 
     async def get_created_at(self, id: Positive[int]) -> datetime:
-        user: UserModel | None = await self.find_by_id(id)
+        user = await self.project_by_id(id, ['created_at'])
         if not user:
             raise EntityNotFound()
-        return user.created_at
+        return user['created_at']
 
     async def get_role(self, id: Positive[int]) -> RoleModel:
         user: UserModel | None = await self.find_by_id(id)
@@ -215,11 +192,7 @@ class UserService(BaseService[UserModel, UserRepository, UserFindQuery]):
         return user.profile
 
     async def update_role_by_id(self, id: Positive[int], role_id: int) -> UserModel:
-        user: UserModel | None = await self.find_by_id(id)
-        if not user:
-            raise EntityNotFound()
-        user.role_id = role_id
-        updated = await self.repo.update(id, user)
+        updated = await self.repo.patch(id, role_id=role_id)
         role = await self.role_service().find_by_id(role_id)
         if not role:
             raise EntityNotFound("Role not found.")
@@ -227,13 +200,9 @@ class UserService(BaseService[UserModel, UserRepository, UserFindQuery]):
         return updated
 
     async def update_role_by_name(self, id: Positive[int], role_name: str) -> UserModel:
-        user: UserModel | None = await self.find_by_id(id)
-        if not user:
-            raise EntityNotFound()
         role = await self.role_service().find_by_name(role_name)
         if not role:
             raise EntityNotFound("Role not found.")
-        user.role_id = role.id
-        updated = await self.repo.update(id, user)
+        updated = await self.repo.patch(id, role_id=role.id)
         updated.role = role
         return updated
@@ -1,10 +1,11 @@
 # from fastapi import Path, Query, Header, Body
-from typing import Annotated, Literal, Any, ClassVar
+from typing import Annotated, Literal, Any, ClassVar, get_args
 from abc import ABC, abstractmethod
 from enum import Enum
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pydantic import Field, BaseModel
 from pydantic_core import CoreSchema, core_schema
+from sqlalchemy import bindparam
 import httpx
 import re
 
@@ -22,6 +23,32 @@ type Negative[T: Number] = Annotated[T, Field(lt=0)]
 
 type OrderBy[T: Literal] = tuple[T, Literal['asc', 'desc']]
 
+type DateTrunc = Literal['hour', 'day', 'week', 'month', 'year']
+
+def truncate_datetime(value: datetime, unit: DateTrunc) -> datetime:
+    """Start of the `unit` containing `value`; weeks start on Monday, as Postgres' `date_trunc`."""
+    hour = value.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+    match unit:
+        case 'hour':
+            return hour
+        case 'day':
+            return day
+        case 'week':
+            return day - timedelta(days=day.weekday())
+        case 'month':
+            return day.replace(day=1)
+        case 'year':
+            return day.replace(month=1, day=1)
+
+def attr_pattern(attribute: Any) -> str:
+    """Pattern for a comma-separated `attr` projection over the names of an `<Entity>Attribute` literal."""
+    names = '|'.join(map(re.escape, get_args(attribute)))
+    return rf'^(?:{names})(?:,(?:{names}))*$'
+
+# A pattern made only of plain or escaped characters, optionally anchored at either end.
+_LITERAL_PATTERN = re.compile(r'(?P<start>\^)?(?P<literal>(?:[^.^$*+?{}\[\]|()\\]|\\[^A-Za-z0-9])*)(?P<end>\$)?')
+
 class RegEx(str):
     def __new__(cls, content: Any):
         if not isinstance(content, str):
@@ -50,8 +77,40 @@ class RegEx(str):
     def find_all_matches(self, text: str) -> list[str]:
         return re.findall(self, text)
 
-    def inject[S: Any](self, stmt: S, cls_attr, Any) -> S:
-        return stmt
+    def _operation(self) -> tuple[str, str]:
+        """`(operator, operand)` of the bound form: `=` or LIKE (escaped with '/') for literal patterns."""
+        if parts := _LITERAL_PATTERN.fullmatch(self):
+            literal = re.sub(r'\\(.)', r'\1', parts['literal'])
+            like = re.sub(r'([/%_])', r'/\1', literal)
+            match bool(parts['start']), bool(parts['end']):
+                case True, True:
+                    return '=', literal
+                case True, False:
+                    return 'like', f'{like}%'
+                case False, True:
+                    return 'like', f'%{like}'
+                case False, False:
+                    return 'like', f'%{like}%'
+        return 'regexp', str(self)
+
+    def shape(self) -> str:
+        return self._operation()[0]
+
+    def params(self, key: str) -> dict[str, Any]:
+        return {key: self._operation()[1]}
+
+    def inject[S: Any](self, stmt: S, cls_attr: Any, key: str | None = None) -> S:
+        # Literal patterns become = / LIKE, which (when anchored) can use the column's B-tree index.
+        # With a `key` the value comes from `params(key)`, so the statement can be reused for any pattern of this shape.
+        operator, operand = self._operation()
+        value = operand if key is None else bindparam(key)
+        match operator:
+            case '=':
+                return stmt.where(cls_attr == value)
+            case 'like':
+                return stmt.where(cls_attr.like(value, escape='/'))
+            case _:
+                return stmt.where(cls_attr.regexp_match(value))
 
 
 class Interval[T: Any](BaseModel):
@@ -60,17 +119,26 @@ class Interval[T: Any](BaseModel):
     start_inclusive: Annotated[bool, Field(True)]
     end_inclusive: Annotated[bool, Field(False)]
 
-    def inject[S: Any](self, stmt: S, cls_attr: Any) -> S:
+    def shape(self) -> tuple[bool, bool, bool, bool]:
+        return self.start is not None, self.end is not None, self.start_inclusive, self.end_inclusive
+
+    def params(self, key: str) -> dict[str, Any]:
+        bounds = {f'{key}_start': self.start, f'{key}_end': self.end}
+        return {name: value for name, value in bounds.items() if value is not None}
+
+    def inject[S: Any](self, stmt: S, cls_attr: Any, key: str | None = None) -> S:
+        start = self.start if key is None else bindparam(f'{key}_start')
+        end = self.end if key is None else bindparam(f'{key}_end')
         if not self.start is None:
             if self.start_inclusive:
-                stmt = stmt.where(cls_attr >= self.start)
+                stmt = stmt.where(cls_attr >= start)
             else:
-                stmt = stmt.where(cls_attr > self.start)
+                stmt = stmt.where(cls_attr > start)
         if not self.end is None:
             if self.end_inclusive:
-                stmt = stmt.where(cls_attr <= self.end)
+                stmt = stmt.where(cls_attr <= end)
             else:
-                stmt = stmt.where(cls_attr < self.end)
+                stmt = stmt.where(cls_attr < end)
         return stmt
 
 
@@ -221,6 +289,56 @@ class HttpxClient(HttpClient):
         response.raise_for_status()
         return response.json()
 
+
+class AsyncHttpxClient(HttpClient):
+    """
+    `HttpClient` whose methods are coroutines, over one pooled `httpx.AsyncClient`; callers
+    await them and can run many requests concurrently over the kept-alive connections.
+    HTTP/2 needs the `h2` package (`httpx[http2]`).
+    """
+
+    def __init__(self, timeout: float = 3.0, http2: bool = True,
+                 max_connections: int | None = 100, max_keepalive_connections: int | None = 20,
+                 keepalive_expiry: float | None = 5.0,
+                 transport: httpx.AsyncBaseTransport | None = None):
+        self.client = httpx.AsyncClient(
+            timeout=timeout, follow_redirects=True, http2=http2, transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+    async def __aenter__(self) -> 'AsyncHttpxClient':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def get(self, url: str, params: dict[str, Any] | None = None, headers: dict[str, str] | None = None) -> Any:
+        response = await self.client.get(url, params=params, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def post(self, url: str, data: dict | str | None = None, json: dict[str, Any] | None = None, headers: dict[str, str] | None = None) -> Any:
+        response = await self.client.post(url, data=data, json=json, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def put(self, url: str, data: dict | str | None = None, json: dict[str, Any] | None = None, headers: dict[str, str] | None = None) -> Any:
+        response = await self.client.put(url, data=data, json=json, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def delete(self, url: str, headers: dict[str, str] | None = None) -> Any:
+        response = await self.client.delete(url, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
 def parse_last_retrieved(last_retrieved, model, order_by):
     if len(last_retrieved) == 2:
         field = model.model_fields[order_by[0]]
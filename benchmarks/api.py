@@ -0,0 +1,160 @@
+"""
+Latency percentiles and throughput of the HTTP API: boots `MedicalOfficeAPI` in-process
+behind an ASGI transport (no network), seeds a deterministic number of medicines through
+`POST /v1/medicine/bulk`, then drives `find`, `find_by_id`, `add` and a per-field `PUT`
+at each level of concurrency. Results are JSON, so runs on two commits can be compared.
+
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.api --rows 10000 100000 --output before.json
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.api --rows 10000 100000 --output after.json
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.api --compare before.json after.json
+
+`MedicalOfficeAPI` only mounts the medicine and schedule routers, so medicines are the
+seeded and measured entity.
+"""
+from app.main import MedicalOfficeAPI
+from benchmarks.concurrency import make_medicine
+from collections.abc import Callable
+from random import Random
+from typing import Any
+import argparse
+import asyncio
+import httpx
+import json
+import platform
+import subprocess
+import sys
+import time
+
+SEED_CHUNK = 5_000
+
+type Operation = Callable[[httpx.AsyncClient, Random, int], Any]
+
+def medicine_json(i: int) -> dict[str, Any]:
+    return make_medicine(i).model_dump(mode='json', exclude={'id', 'created_at', 'updated_at'})
+
+
+async def find(client: httpx.AsyncClient, rng: Random, rows: int) -> httpx.Response:
+    # A page at a random depth of the keyset order; `make_medicine` makes row i's dose 1 + (i - 1) % 500.
+    id = rng.randint(1, rows)
+    query = {'order_by': ['dose', 'asc'], 'last': [id, 1 + (id - 1) % 500]}
+    return await client.post("/v1/medicine/find", json=query)
+
+
+async def find_by_id(client: httpx.AsyncClient, rng: Random, rows: int) -> httpx.Response:
+    return await client.get(f"/v1/medicine/{rng.randint(1, rows)}")
+
+
+async def add(client: httpx.AsyncClient, rng: Random, rows: int) -> httpx.Response:
+    return await client.post("/v1/medicine/", json=medicine_json(rows + rng.randint(1, rows)))
+
+
+async def put_dose(client: httpx.AsyncClient, rng: Random, rows: int) -> httpx.Response:
+    return await client.put(f"/v1/medicine/{rng.randint(1, rows)}/dose", json=float(rng.randint(1, 500)))
+
+
+OPERATIONS: dict[str, Operation] = {'find': find, 'find_by_id': find_by_id, 'add': add, 'put_dose': put_dose}
+
+
+async def seed(client: httpx.AsyncClient, rows: int) -> None:
+    for start in range(0, rows, SEED_CHUNK):
+        response = await client.post("/v1/medicine/bulk", json=[medicine_json(i) for i in range(start, min(start + SEED_CHUNK, rows))])
+        response.raise_for_status()
+
+
+def percentile(latencies: list[float], p: float) -> float:
+    return latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+
+
+async def measure(client: httpx.AsyncClient, operation: Operation, rows: int,
+                  concurrency: int, requests: int, seed: int) -> dict[str, Any]:
+    rng = Random(seed)
+    latencies: list[float] = []
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await operation(client, rng, rows)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': requests,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'throughput_rps': round(requests / elapsed, 1),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    key = lambda result: (result['rows'], result['operation'], result['concurrency'])
+    baseline = {key(result): result for result in before['results']}
+
+    print(f"{'rows':>9} {'operation':<12} {'clients':>7} {'p50':>16} {'p99':>16} {'req/s':>18}")
+    for result in after['results']:
+        if (old := baseline.get(key(result))) is None:
+            continue
+        cells = [
+            f"{old[metric]:>7.2f}->{result[metric]:<7.2f}" if metric != 'throughput_rps' else f"{old[metric]:>8.0f}->{result[metric]:<8.0f}"
+            for metric in ('p50_ms', 'p99_ms', 'throughput_rps')
+        ]
+        print(f"{result['rows']:>9} {result['operation']:<12} {result['concurrency']:>7} {' '.join(cells)}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--requests', type=int, default=2_000, help="Requests per operation and concurrency level.")
+    parser.add_argument('--operations', nargs='+', choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON results here instead of stdout.")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Print the change between two result files.")
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare)
+
+    results = []
+    for rows in args.rows:
+        # A fresh app per volume: its repositories are in-memory databases.
+        transport = httpx.ASGITransport(MedicalOfficeAPI())
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", follow_redirects=True) as client:
+            await seed(client, rows)
+            for name in args.operations:
+                for concurrency in args.concurrency:
+                    result = await measure(client, OPERATIONS[name], rows, concurrency, args.requests, args.seed)
+                    results.append({'rows': rows, 'operation': name, 'concurrency': concurrency, **result})
+                    print(results[-1], file=sys.stderr)
+
+    report = json.dumps({
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'arguments': {'rows': args.rows, 'concurrency': args.concurrency, 'requests': args.requests, 'seed': args.seed},
+        'results': results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
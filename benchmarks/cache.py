@@ -0,0 +1,56 @@
+"""
+Latency of a hot `GET /v1/medicine/{id}` with and without `CachedRepository` in front of
+the repository, driven in-process through the ASGI app (no network in the measurement).
+
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.cache
+"""
+from app.base.cache import CachedRepository
+from app.base.database import session_scope
+from app.base.repositories import BaseRepository
+from app.medicine.repositories import InMemoryMedicineRepository
+from app.medicine.services import MedicineService
+from app.medicine.routers import MedicineRouter
+from benchmarks.concurrency import make_medicine
+from fastapi import FastAPI, Depends
+from statistics import median
+import argparse
+import asyncio
+import httpx
+import time
+
+def make_app(repo: BaseRepository) -> FastAPI:
+    app = FastAPI(dependencies=[Depends(session_scope)])
+    app.include_router(MedicineRouter('/v1/medicine', lambda: MedicineService(repo)))
+    return app
+
+
+async def measure(app: FastAPI, ids: list[int], requests: int) -> list[float]:
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://bench") as client:
+        for i in range(requests):
+            start = time.perf_counter()
+            response = await client.get(f"/v1/medicine/{ids[i % len(ids)]}")
+            latencies.append((time.perf_counter() - start) * 1e6)
+            response.raise_for_status()
+    return sorted(latencies)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hot', type=int, default=16, help="Number of distinct ids requested.")
+    parser.add_argument('--requests', type=int, default=5_000)
+    args = parser.parse_args()
+
+    uncached = InMemoryMedicineRepository()
+    ids = [medicine.id for medicine in await uncached.add_many([make_medicine(i) for i in range(args.hot)])]
+    cached = CachedRepository(uncached)
+
+    print(f"{'repository':<20} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for name, repo in (('uncached', uncached), ('cached', cached)):
+        latencies = await measure(make_app(repo), ids, args.requests)
+        print(f"{name:<20} {median(latencies):>10.1f} {latencies[int(len(latencies) * 0.99)]:>10.1f}")
+    print(cached.cache.stats)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Requests/sec of `find_by_id` through the blocking `SQLRepository` and the
+`AsyncSQLRepository` at several levels of concurrent clients.
+
+    python -m benchmarks.concurrency
+    python -m benchmarks.concurrency --sync-url postgresql+psycopg://... --async-url postgresql+psycopg://...
+
+In-memory SQLite answers in microseconds and serializes on a single connection,
+so run it against Postgres to see the event loop stop stalling on slow round trips.
+"""
+from app.base.repositories import SQLRepository, AsyncSQLRepository, BaseRepository
+from app.medicine.models import MedicineModel
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import create_engine
+from random import Random
+import argparse
+import asyncio
+import time
+
+def make_medicine(i: int) -> MedicineModel:
+    return MedicineModel(
+        name=f"Medicine {i}",
+        description="Benchmark medicine.",
+        intake_type="Comprimido",
+        dose=1 + i % 500,
+        measurement="mg",
+    )
+
+
+async def seed(repo: BaseRepository, rows: int) -> list[int]:
+    return [(await repo.add(make_medicine(i))).id for i in range(rows)]
+
+
+async def run(repo: BaseRepository, ids: list[int], clients: int, requests: int) -> float:
+    rng = Random(clients)
+    queue = [rng.choice(ids) for _ in range(requests)]
+
+    async def client() -> None:
+        while queue:
+            await repo.find_by_id(queue.pop())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sync-url', default="sqlite://")
+    parser.add_argument('--async-url', default="sqlite+aiosqlite://")
+    parser.add_argument('--rows', type=int, default=1_000)
+    parser.add_argument('--requests', type=int, default=5_000)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 16, 128])
+    args = parser.parse_args()
+
+    repos: dict[str, BaseRepository] = {
+        'SQLRepository': SQLRepository(MedicineModel, create_engine(args.sync_url), page_size_max=64),
+        'AsyncSQLRepository': AsyncSQLRepository(MedicineModel, create_async_engine(args.async_url), page_size_max=64),
+    }
+
+    print(f"{'repository':<20} {'clients':>8} {'req/s':>12}")
+    for name, repo in repos.items():
+        ids = await seed(repo, args.rows)
+        for clients in args.clients:
+            rps = await run(repo, ids, clients, args.requests)
+            print(f"{name:<20} {clients:>8} {rps:>12.1f}")
+
+    await repos['AsyncSQLRepository'].engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
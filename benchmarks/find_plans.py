@@ -0,0 +1,71 @@
+"""
+Per-request CPU time of `SQLRepository.find` for a repeated dashboard query, with the
+statement plan cached per filter shape against planning and compiling it on every call
+(no plan cache, SQLAlchemy's compiled cache disabled).
+
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.find_plans
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.find_plans --profile find_plans.prof
+"""
+from app.base.repositories import SQLRepository
+from app.medicine.models import MedicineModel
+from app.medicine.repositories import MedicineFindQuery
+from app.utils import Interval, RegEx
+from benchmarks.concurrency import make_medicine
+from sqlmodel import create_engine
+from sqlmodel.sql.expression import Select, SelectOfScalar
+from collections.abc import Sequence
+from statistics import median
+from typing import Any
+import argparse
+import asyncio
+import cProfile
+import time
+
+class UnplannedSQLRepository(SQLRepository):
+    def _find_statement(self, query: Any, attrs: Sequence[str] | None = None) -> SelectOfScalar | Select:
+        self._find_plans.clear()
+        return super()._find_statement(query, attrs)
+
+
+def make_query(i: int) -> MedicineFindQuery:
+    return MedicineFindQuery(
+        filter_by={'name': RegEx(f"^Medicine {i % 10}"), 'dose': Interval(start=i % 100, end=500)},
+        order_by=('dose', 'asc'),
+    )
+
+
+async def measure(repo: SQLRepository, requests: int) -> list[float]:
+    cpu = []
+    for i in range(requests):
+        query = make_query(i)
+        start = time.process_time()
+        await repo.find(query)
+        cpu.append((time.process_time() - start) * 1e6)
+    return sorted(cpu)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default="sqlite://")
+    parser.add_argument('--rows', type=int, default=1_000)
+    parser.add_argument('--requests', type=int, default=5_000)
+    parser.add_argument('--profile', help="Write a cProfile dump of the cached run to this path.")
+    args = parser.parse_args()
+
+    print(f"{'plans':<12} {'p50 cpu (us)':>14} {'p99 cpu (us)':>14}")
+    for name, repo_cls, cache_size in (('per request', UnplannedSQLRepository, 0), ('cached', SQLRepository, 500)):
+        repo = repo_cls(MedicineModel, create_engine(args.url, query_cache_size=cache_size), page_size_max=64)
+        await repo.add_many([make_medicine(i) for i in range(args.rows)])
+        await measure(repo, 100)
+        profiler = cProfile.Profile() if args.profile and repo_cls is SQLRepository else None
+        if profiler:
+            profiler.enable()
+        cpu = await measure(repo, args.requests)
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        print(f"{name:<12} {median(cpu):>14.1f} {cpu[int(len(cpu) * 0.99)]:>14.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Latency of "which schedule cycles are active now": `active_at` range-scanning the indexed `end`
+column against what the table allowed before `end` was materialized, loading every cycle started
+before T and computing its end in Python. T is drawn from the last week of the generated history.
+
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.intervals
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.intervals --url postgresql+psycopg://...
+"""
+from app.schedule.models import ScheduleCycleModel, schedule_cycle_end
+from app.schedule.repositories import ScheduleCycleSQLRepository
+from sqlalchemy import insert
+from sqlalchemy import select as sa_select
+from sqlmodel import create_engine
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from itertools import batched
+from statistics import median
+import argparse
+import asyncio
+import random
+import time
+
+EPOCH = datetime(2024, 1, 1)
+
+def make_cycle(rng: random.Random, days: int) -> dict:
+    start = EPOCH + timedelta(minutes=rng.randrange(days * 24 * 60))
+    repeat_each, repetition_number = rng.choice([4, 6, 8, 12, 24]), rng.randrange(1, 60)
+    return {
+        'created_at': start,
+        'start': start,
+        'end': schedule_cycle_end(start, repeat_each, repetition_number),
+        'repeat_each': repeat_each,
+        'repetition_number': repetition_number,
+        'schedule_id': rng.randrange(1, 10_000),
+    }
+
+
+async def scan(repo: ScheduleCycleSQLRepository, moment: datetime) -> int:
+    columns = ScheduleCycleModel.__table__.columns
+    rows = repo.session.execute(
+        sa_select(columns.id, columns.start, columns.repeat_each, columns.repetition_number).where(columns.start <= moment)
+    )
+    return sum(1 for row in rows if schedule_cycle_end(row.start, row.repeat_each, row.repetition_number) > moment)
+
+
+async def indexed(repo: ScheduleCycleSQLRepository, moment: datetime) -> int:
+    return len(await repo.active_at(moment))
+
+
+async def measure(query: Callable[[ScheduleCycleSQLRepository, datetime], Awaitable[int]],
+                  repo: ScheduleCycleSQLRepository, moments: list[datetime]) -> tuple[list[float], int]:
+    latencies, found = [], 0
+    for moment in moments:
+        start = time.perf_counter()
+        found += await query(repo, moment)
+        latencies.append((time.perf_counter() - start) * 1e3)
+    return sorted(latencies), found
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default="sqlite://")
+    parser.add_argument('--cycles', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=730, help="Span of the cycle start times.")
+    parser.add_argument('--queries', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    repo = ScheduleCycleSQLRepository(ScheduleCycleModel, create_engine(args.url), page_size_max=64)
+    with repo.engine.begin() as conn:
+        for chunk in batched((make_cycle(rng, args.days) for _ in range(args.cycles)), 10_000):
+            conn.execute(insert(ScheduleCycleModel), list(chunk))
+    now = EPOCH + timedelta(days=args.days)
+    moments = [now - timedelta(minutes=rng.randrange(7 * 24 * 60)) for _ in range(args.queries)]
+
+    print(f"{'strategy':<10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'found':>10}")
+    for name, query in (('scan', scan), ('active_at', indexed)):
+        latencies, found = await measure(query, repo, moments)
+        print(f"{name:<10} {median(latencies):>10.2f} {latencies[int(len(latencies) * 0.99)]:>10.2f} {found:>10}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+Time to expand the occurrences of many schedule cycles over a window: the vectorized
+`expand_occurrences` against a per-occurrence Python loop over the same cycles.
+
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.occurrences
+"""
+from app.schedule.services import expand_occurrences
+from datetime import datetime, timedelta
+import numpy as np
+import argparse
+import time
+
+def expand_loop(start: list[datetime], repeat_each: list[int], repetition_number: list[int],
+                window_start: datetime, window_end: datetime) -> list[tuple[datetime, int, int]]:
+    occurrences = []
+    for i, (first, hours, repetitions) in enumerate(zip(start, repeat_each, repetition_number)):
+        for k in range(repetitions):
+            at = first + timedelta(hours=k * hours)
+            if at >= window_end:
+                break
+            if at >= window_start:
+                occurrences.append((at, i, k))
+    occurrences.sort()
+    return occurrences
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cycles', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    window_start = datetime(2025, 1, 1)
+    window_end = window_start + timedelta(days=args.days)
+    start = np.datetime64(window_start, 'us') + rng.integers(-30 * 24, args.days * 24, args.cycles).astype('timedelta64[h]')
+    repeat_each = rng.choice([4, 6, 8, 12, 24, 168], args.cycles)
+    repetition_number = rng.integers(1, 120, args.cycles)
+
+    print(f"{'strategy':<12} {'seconds':>10} {'occurrences':>12}")
+    began = time.perf_counter()
+    cycle, _, _ = expand_occurrences(start, repeat_each, repetition_number, window_start, window_end)
+    print(f"{'numpy':<12} {time.perf_counter() - began:>10.3f} {len(cycle):>12}")
+
+    start_list = start.astype('datetime64[us]').tolist()
+    began = time.perf_counter()
+    occurrences = expand_loop(start_list, repeat_each.tolist(), repetition_number.tolist(), window_start, window_end)
+    print(f"{'loop':<12} {time.perf_counter() - began:>10.3f} {len(occurrences):>12}")
+
+
+if __name__ == '__main__':
+    main()
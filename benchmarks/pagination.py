@@ -0,0 +1,69 @@
+"""
+Total time to pull a whole table through `POST /v1/medicine/find` for several page `limit`s,
+walking the `next` cursor the way a backfill client does, driven in-process through the ASGI
+app. `--latency-ms` adds a simulated network round trip to every request.
+`GET /v1/medicine/export` is timed as the lower bound.
+
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.pagination --latency-ms 2
+"""
+from app.base.database import session_scope
+from app.medicine.repositories import InMemoryMedicineRepository
+from app.medicine.services import MedicineService
+from app.medicine.routers import MedicineRouter
+from benchmarks.concurrency import make_medicine
+from fastapi import FastAPI, Depends
+import argparse
+import asyncio
+import httpx
+import time
+
+async def backfill(client: httpx.AsyncClient, limit: int, latency: float) -> tuple[int, int]:
+    query, rows, requests = {'order_by': ['id', 'asc'], 'limit': limit}, 0, 0
+    while True:
+        await asyncio.sleep(latency)
+        response = await client.post("/v1/medicine/find", json=query)
+        response.raise_for_status()
+        requests += 1
+        page = response.json()
+        if not page:
+            return rows, requests
+        rows += len(page['data'])
+        query = page['next']
+
+
+async def export(client: httpx.AsyncClient, latency: float) -> tuple[int, int]:
+    rows = 0
+    await asyncio.sleep(latency)
+    async with client.stream('GET', "/v1/medicine/export") as response:
+        async for _ in response.aiter_lines():
+            rows += 1
+    return rows, 1
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--limits', type=int, nargs='+', default=[64, 256, 1000, 5000])
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    repo = InMemoryMedicineRepository()
+    repo.page_size_max = max(args.limits)
+    await repo.add_many([make_medicine(i) for i in range(args.rows)])
+    app = FastAPI(dependencies=[Depends(session_scope)])
+    app.include_router(MedicineRouter('/v1/medicine', lambda: MedicineService(repo)))
+
+    print(f"{'strategy':<14} {'requests':>10} {'seconds':>10} {'rows/s':>12}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://bench", timeout=None) as client:
+        latency = args.latency_ms / 1e3
+        runs = [(f"limit={limit}", lambda limit=limit: backfill(client, limit, latency)) for limit in args.limits]
+        for name, run in [*runs, ('export', lambda: export(client, latency))]:
+            start = time.perf_counter()
+            rows, requests = await run()
+            elapsed = time.perf_counter() - start
+            assert rows == args.rows, rows
+            print(f"{name:<14} {requests:>10} {elapsed:>10.2f} {rows / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
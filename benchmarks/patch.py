@@ -0,0 +1,52 @@
+"""
+Writes/sec of single-column updates: the previous read-modify-write through `update`
+(load, copy fields, commit, refresh) against one `UPDATE ... RETURNING` through `patch`.
+
+    python -m benchmarks.patch
+    python -m benchmarks.patch --url postgresql+psycopg://...
+"""
+from app.base.repositories import SQLRepository
+from app.medicine.models import MedicineModel
+from benchmarks.concurrency import make_medicine
+from sqlmodel import create_engine
+from collections.abc import Awaitable, Callable
+import argparse
+import asyncio
+import time
+
+async def read_modify_write(repo: SQLRepository, id: int, dose: float) -> None:
+    medicine = await repo.find_by_id(id)
+    assert medicine
+    medicine.dose = dose
+    await repo.update(id, medicine)
+
+
+async def patch(repo: SQLRepository, id: int, dose: float) -> None:
+    await repo.patch(id, dose=dose)
+
+
+async def run(write: Callable[[SQLRepository, int, float], Awaitable[None]],
+              repo: SQLRepository, ids: list[int], writes: int) -> float:
+    start = time.perf_counter()
+    for i in range(writes):
+        await write(repo, ids[i % len(ids)], 1 + i % 500)
+    return writes / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default="sqlite://")
+    parser.add_argument('--rows', type=int, default=1_000)
+    parser.add_argument('--writes', type=int, default=5_000)
+    args = parser.parse_args()
+
+    repo = SQLRepository(MedicineModel, create_engine(args.url), page_size_max=64)
+    ids = [medicine.id for medicine in await repo.add_many([make_medicine(i) for i in range(args.rows)])]
+
+    print(f"{'strategy':<20} {'writes/s':>12}")
+    for name, write in (('read-modify-write', read_modify_write), ('patch', patch)):
+        print(f"{name:<20} {await run(write, repo, ids, args.writes):>12.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
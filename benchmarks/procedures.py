@@ -0,0 +1,63 @@
+"""
+Per-call latency of `ProcSQLRepository.find_by_id`/`add` with cached statements prepared
+server-side, against rebuilding the statement text on every call with preparation disabled.
+
+    psql "$URL" -f medicine_procedures.sql
+    python -m benchmarks.procedures --url postgresql+psycopg://...
+"""
+from app.base.repositories import ProcSQLRepository
+from app.medicine.models import MedicineModel
+from benchmarks.concurrency import make_medicine
+from sqlalchemy import TextClause
+from sqlmodel import create_engine
+from collections.abc import Awaitable, Callable, Iterable
+from statistics import median
+import argparse
+import asyncio
+import time
+
+class UncachedProcSQLRepository(ProcSQLRepository):
+    def _statement(self, verb: str, params: Iterable[str]) -> TextClause:
+        self._statements.clear()
+        return super()._statement(verb, params)
+
+
+async def measure(call: Callable[[int], Awaitable[object]], calls: int) -> list[float]:
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await call(i)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--calls', type=int, default=2_000)
+    args = parser.parse_args()
+
+    repos = {
+        'uncached, unprepared': UncachedProcSQLRepository(
+            MedicineModel, create_engine(args.url), page_size_max=64, prepare_threshold=None
+        ),
+        'cached, prepared': ProcSQLRepository(MedicineModel, create_engine(args.url), page_size_max=64),
+    }
+
+    print(f"{'repository':<22} {'method':<12} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for name, repo in repos.items():
+        ids: list[int] = []
+
+        async def add(i: int) -> None:
+            ids.append((await repo.add(make_medicine(i))).id)
+
+        async def find_by_id(i: int) -> None:
+            await repo.find_by_id(ids[i % len(ids)])
+
+        for method, call in (('add', add), ('find_by_id', find_by_id)):
+            latencies = sorted(await measure(call, args.calls))
+            print(f"{name:<22} {method:<12} {median(latencies):>10.1f} {latencies[int(len(latencies) * 0.99)]:>10.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
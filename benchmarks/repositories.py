@@ -0,0 +1,111 @@
+"""
+The same medicine workload through the ORM path (`SQLRepository`) and the stored-procedure
+path (`ProcSQLRepository` + `medicine_procedures.sql`): per-operation latency percentiles and
+the peak memory allocated by one call, measured in a separate tracemalloc pass.
+
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.repositories
+    psql "$URL" -f medicine_procedures.sql
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.repositories --url postgresql+psycopg://... --proc-url postgresql+psycopg://...
+
+The procedures only exist on Postgres; without `--proc-url` only the ORM path runs.
+"""
+from app.base.repositories import BaseRepository, ProcSQLRepository, SQLRepository
+from app.medicine.models import MedicineModel
+from app.medicine.repositories import MedicineFindQuery
+from benchmarks.concurrency import make_medicine
+from sqlmodel import create_engine
+from collections.abc import Awaitable, Callable
+from statistics import median
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+ORDERS = [('id', 'asc'), ('name', 'asc'), ('dose', 'desc'), ('created_at', 'asc')]
+
+type Call = Callable[[int], Awaitable[object]]
+
+async def latencies(call: Call, calls: int) -> list[float]:
+    result = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await call(i)
+        result.append((time.perf_counter() - start) * 1e6)
+    return sorted(result)
+
+
+async def peak_allocated(call: Call, calls: int, offset: int) -> float:
+    """Mean over `calls` of the peak bytes held during one call beyond what was held before it."""
+    total = 0
+    tracemalloc.start()
+    try:
+        for i in range(offset, offset + calls):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await call(i)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / calls
+
+
+def workload(repo: BaseRepository, ids: list[int], added: list[int], page_size: int) -> dict[str, Call]:
+    async def add(i: int) -> None:
+        added.append((await repo.add(make_medicine(len(ids) + i))).id)
+
+    async def find_by_id(i: int) -> None:
+        await repo.find_by_id(ids[i * 7919 % len(ids)])
+
+    def find(order_by: tuple[str, str]) -> Call:
+        pages: list[MedicineFindQuery] = []
+
+        async def call(i: int) -> None:
+            # Walks the keyset order page by page, starting over once it runs out.
+            query = pages.pop() if pages else MedicineFindQuery(order_by=order_by, limit=page_size)
+            page = await repo.find(query)
+            if page is not None:
+                pages.append(page.next)
+        return call
+
+    async def update(i: int) -> None:
+        id = ids[i * 7919 % len(ids)]
+        await repo.update(id, make_medicine(i))
+
+    async def delete(i: int) -> None:
+        await repo.delete(added.pop())
+
+    return {
+        'add': add,
+        'find_by_id': find_by_id,
+        **{f'find {column} {direction}': find((column, direction)) for column, direction in ORDERS},
+        'update': update,
+        'delete': delete,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default="sqlite://", help="Database of the ORM path.")
+    parser.add_argument('--proc-url', help="Postgres with medicine_procedures.sql loaded.")
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--calls', type=int, default=1_000)
+    parser.add_argument('--page-size', type=int, default=64)
+    args = parser.parse_args()
+
+    repos: dict[str, BaseRepository] = {'SQLRepository': SQLRepository(MedicineModel, create_engine(args.url), page_size_max=5000)}
+    if args.proc_url:
+        repos['ProcSQLRepository'] = ProcSQLRepository(MedicineModel, create_engine(args.proc_url), page_size_max=5000)
+
+    print(f"{'repository':<18} {'operation':<20} {'p50 (us)':>10} {'p99 (us)':>10} {'peak KiB/call':>14}")
+    for name, repo in repos.items():
+        ids = [medicine.id for medicine in await repo.add_many([make_medicine(i) for i in range(args.rows)])]
+        # Rows created by `add` and removed again by `delete`, two passes of `--calls` each.
+        added: list[int] = []
+        for operation, call in workload(repo, ids, added, args.page_size).items():
+            timings = await latencies(call, args.calls)
+            allocated = await peak_allocated(call, args.calls, offset=args.calls)
+            print(f"{name:<18} {operation:<20} {median(timings):>10.1f} {timings[int(len(timings) * 0.99)]:>10.1f} {allocated / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+CPU time per `POST /v1/medicine/find` request returning a full page, before and after the
+routes started returning bytes dumped by pydantic-core. "before" is the previous handler:
+a `model_validate` per row into a `Page`, validated again against the response model and
+run through `jsonable_encoder` by FastAPI. Both apps run in-process on the same repository.
+
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.serialization
+    SUPABASE_URL=... PW_PREFIX=... python -m benchmarks.serialization --page-size 64 --requests 5000
+"""
+from app.base.database import session_scope
+from app.base.models import Page
+from app.base.repositories import SQLRepository
+from app.medicine.models import MedicineModel
+from app.medicine.repositories import MedicineFindQuery
+from app.medicine.routers import MedicineRouter
+from app.medicine.schemas import MedicineResponseSchema
+from app.medicine.services import MedicineService
+from benchmarks.concurrency import make_medicine
+from fastapi import Body, Depends, FastAPI
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+from typing import Annotated
+import argparse
+import asyncio
+import httpx
+import time
+
+class ValidatingMedicineRouter(MedicineRouter):
+    async def find_medicines(self, query: Annotated[MedicineFindQuery, Body()]) -> Page[MedicineResponseSchema, MedicineFindQuery] | None:
+        page = await self.svc().find(query)
+        if not page:
+            return None
+        return Page[MedicineResponseSchema, MedicineFindQuery](
+            next=page.next,
+            data=[MedicineResponseSchema.model_validate(medicine) for medicine in page.data],
+        )
+
+
+async def measure(app: FastAPI, page_size: int, requests: int) -> tuple[float, float]:
+    """Mean CPU and wall microseconds per request, after a warm-up pass."""
+    query = {'order_by': ['id', 'asc'], 'limit': page_size}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://bench") as client:
+        for _ in range(requests // 10):
+            (await client.post("/v1/medicine/find", json=query)).raise_for_status()
+        cpu, wall = time.process_time(), time.perf_counter()
+        for _ in range(requests):
+            response = await client.post("/v1/medicine/find", json=query)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    assert len(response.json()['data']) == page_size
+    return cpu / requests * 1e6, wall / requests * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--page-size', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2_000)
+    args = parser.parse_args()
+
+    repo = SQLRepository(MedicineModel, create_engine("sqlite://", poolclass=StaticPool), page_size_max=args.page_size)
+    await repo.add_many([make_medicine(i) for i in range(args.page_size)])
+
+    print(f"{'handler':<10} {'CPU us/request':>15} {'wall us/request':>16}")
+    for name, router in (('before', ValidatingMedicineRouter), ('after', MedicineRouter)):
+        app = FastAPI(dependencies=[Depends(session_scope)])
+        app.include_router(router('/v1/medicine', lambda: MedicineService(repo)))
+        cpu, wall = await measure(app, args.page_size, args.requests)
+        print(f"{name:<10} {cpu:>15.1f} {wall:>16.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -34,6 +34,9 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- UpdateMedicine procedure
+-- NULL arguments keep the current value; columns named in p_nulls are set to NULL instead.
+-- Adding p_nulls changes the signature, so drop the previous overload first.
+DROP FUNCTION IF EXISTS UpdateMedicine(INTEGER, TIMESTAMP, TIMESTAMP, VARCHAR, VARCHAR, VARCHAR, NUMERIC, VARCHAR);
 CREATE OR REPLACE FUNCTION UpdateMedicine(
     p_id INTEGER,
     p_created_at TIMESTAMP DEFAULT NULL,
@@ -42,7 +45,8 @@ CREATE OR REPLACE FUNCTION UpdateMedicine(
     p_description VARCHAR(511) DEFAULT NULL,
     p_intake_type VARCHAR(31) DEFAULT NULL,
     p_dose NUMERIC DEFAULT NULL,
-    p_measurement VARCHAR(31) DEFAULT NULL
+    p_measurement VARCHAR(31) DEFAULT NULL,
+    p_nulls VARCHAR[] DEFAULT '{}'
 ) RETURNS TABLE(
     id INTEGER,
     created_at TIMESTAMP,
@@ -56,13 +60,13 @@ CREATE OR REPLACE FUNCTION UpdateMedicine(
 BEGIN
     UPDATE medicines 
     SET 
-        created_at = COALESCE(p_created_at, created_at),
-        updated_at = COALESCE(p_updated_at, updated_at),
-        name = COALESCE(p_name, name),
-        description = COALESCE(p_description, description),
-        intake_type = COALESCE(p_intake_type, intake_type),
-        dose = COALESCE(p_dose, dose),
-        measurement = COALESCE(p_measurement, measurement)
+        created_at = CASE WHEN 'created_at' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_created_at, created_at) END,
+        updated_at = CASE WHEN 'updated_at' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_updated_at, updated_at) END,
+        name = CASE WHEN 'name' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_name, name) END,
+        description = CASE WHEN 'description' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_description, description) END,
+        intake_type = CASE WHEN 'intake_type' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_intake_type, intake_type) END,
+        dose = CASE WHEN 'dose' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_dose, dose) END,
+        measurement = CASE WHEN 'measurement' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_measurement, measurement) END
     WHERE id = p_id
     RETURNING * INTO id, created_at, updated_at, name, description, intake_type, dose, measurement;
     
@@ -75,12 +79,15 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- FindMedicine procedure
+-- Adding p_filter changes the signature, so drop the previous overload first.
+DROP FUNCTION IF EXISTS FindMedicine(VARCHAR, VARCHAR, INTEGER, ANYELEMENT, INTEGER);
 CREATE OR REPLACE FUNCTION FindMedicine(
     p_order_by_column VARCHAR(50) DEFAULT 'id',
     p_order_by_direction VARCHAR(4) DEFAULT 'ASC',
     p_last_id INTEGER DEFAULT NULL,
     p_last_value ANYELEMENT DEFAULT NULL,
-    p_limit INTEGER DEFAULT 50
+    p_limit INTEGER DEFAULT 50,
+    p_filter JSONB DEFAULT '{}'
 ) RETURNS TABLE(
     id INTEGER,
     created_at TIMESTAMP,
@@ -94,26 +101,67 @@ CREATE OR REPLACE FUNCTION FindMedicine(
 DECLARE
     query_text TEXT;
     where_clause TEXT := '';
+    filter_key TEXT;
+    filter_value JSONB;
+    filter_type TEXT;
 BEGIN
-    query_text := 'SELECT * FROM medicines';
+    query_text := 'SELECT * FROM medicines WHERE TRUE';
+
+    -- Compile p_filter into the WHERE clause. Values are read from $1 (p_filter itself)
+    -- instead of being spliced into the query, and keys must name a known column.
+    -- String values are regexes bound at run time, so the planner cannot turn them into an index
+    -- range: they filter the rows the other conditions (or a sequential scan) produce.
+    FOR filter_key, filter_value IN SELECT * FROM jsonb_each(COALESCE(p_filter, '{}'::JSONB)) LOOP
+        filter_type := CASE filter_key
+            WHEN 'id' THEN 'INTEGER'
+            WHEN 'created_at' THEN 'TIMESTAMP'
+            WHEN 'updated_at' THEN 'TIMESTAMP'
+            WHEN 'dose' THEN 'NUMERIC'
+            WHEN 'name' THEN 'TEXT'
+            WHEN 'description' THEN 'TEXT'
+            WHEN 'intake_type' THEN 'TEXT'
+            WHEN 'measurement' THEN 'TEXT'
+        END;
+
+        IF filter_type IS NULL THEN
+            RAISE EXCEPTION 'Unknown medicine filter: %', filter_key;
+        END IF;
+
+        IF jsonb_typeof(filter_value) = 'string' THEN
+            where_clause := where_clause || format(' AND %I ~ ($1->>%L)', filter_key, filter_key);
+        ELSIF jsonb_typeof(filter_value) = 'object' THEN
+            IF filter_value->>'start' IS NOT NULL THEN
+                where_clause := where_clause || format(' AND %I %s ($1->%L->>''start'')::%s',
+                    filter_key,
+                    CASE WHEN COALESCE((filter_value->>'start_inclusive')::BOOLEAN, TRUE) THEN '>=' ELSE '>' END,
+                    filter_key, filter_type);
+            END IF;
+            IF filter_value->>'end' IS NOT NULL THEN
+                where_clause := where_clause || format(' AND %I %s ($1->%L->>''end'')::%s',
+                    filter_key,
+                    CASE WHEN COALESCE((filter_value->>'end_inclusive')::BOOLEAN, FALSE) THEN '<=' ELSE '<' END,
+                    filter_key, filter_type);
+            END IF;
+        ELSE
+            RAISE EXCEPTION 'Invalid medicine filter for %: %', filter_key, filter_value;
+        END IF;
+    END LOOP;
     
     -- Handle cursor-based pagination with last attribute
     IF p_last_id IS NOT NULL THEN
         IF p_order_by_direction = 'ASC' THEN
             IF p_order_by_column != 'id' AND p_last_value IS NOT NULL THEN
-                where_clause := ' WHERE (' || p_order_by_column || ' > ' || quote_literal(p_last_value) || 
-                               ' OR (' || p_order_by_column || ' = ' || quote_literal(p_last_value) || 
-                               ' AND id > ' || p_last_id || '))';
+                where_clause := where_clause || ' AND (' || p_order_by_column || ', id) > (' ||
+                               quote_literal(p_last_value) || ', ' || p_last_id || ')';
             ELSE
-                where_clause := ' WHERE id > ' || p_last_id;
+                where_clause := where_clause || ' AND id > ' || p_last_id;
             END IF;
         ELSE
             IF p_order_by_column != 'id' AND p_last_value IS NOT NULL THEN
-                where_clause := ' WHERE (' || p_order_by_column || ' < ' || quote_literal(p_last_value) || 
-                               ' OR (' || p_order_by_column || ' = ' || quote_literal(p_last_value) || 
-                               ' AND id < ' || p_last_id || '))';
+                where_clause := where_clause || ' AND (' || p_order_by_column || ', id) < (' ||
+                               quote_literal(p_last_value) || ', ' || p_last_id || ')';
             ELSE
-                where_clause := ' WHERE id < ' || p_last_id;
+                where_clause := where_clause || ' AND id < ' || p_last_id;
             END IF;
         END IF;
     END IF;
@@ -131,7 +179,7 @@ BEGIN
     -- Add pagination
     query_text := query_text || ' LIMIT ' || p_limit;
     
-    RETURN QUERY EXECUTE query_text;
+    RETURN QUERY EXECUTE query_text USING p_filter;
 END;
 $$ LANGUAGE plpgsql;
 
@@ -181,6 +229,7 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- UpsertMedicine procedure
+DROP FUNCTION IF EXISTS UpsertMedicine(INTEGER, TIMESTAMP, TIMESTAMP, VARCHAR, VARCHAR, VARCHAR, NUMERIC, VARCHAR);
 CREATE OR REPLACE FUNCTION UpsertMedicine(
     p_id INTEGER DEFAULT NULL,
     p_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -189,7 +238,8 @@ CREATE OR REPLACE FUNCTION UpsertMedicine(
     p_description VARCHAR(511) DEFAULT NULL,
     p_intake_type VARCHAR(31) DEFAULT NULL,
     p_dose NUMERIC DEFAULT NULL,
-    p_measurement VARCHAR(31) DEFAULT NULL
+    p_measurement VARCHAR(31) DEFAULT NULL,
+    p_nulls VARCHAR[] DEFAULT '{}'
 ) RETURNS TABLE(
     id INTEGER,
     created_at TIMESTAMP,
@@ -210,13 +260,13 @@ BEGIN
         -- Update existing record
         UPDATE medicines 
         SET 
-            created_at = COALESCE(p_created_at, created_at),
-            updated_at = COALESCE(p_updated_at, updated_at),
-            name = COALESCE(p_name, name),
-            description = COALESCE(p_description, description),
-            intake_type = COALESCE(p_intake_type, intake_type),
-            dose = COALESCE(p_dose, dose),
-            measurement = COALESCE(p_measurement, measurement)
+            created_at = CASE WHEN 'created_at' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_created_at, created_at) END,
+            updated_at = CASE WHEN 'updated_at' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_updated_at, updated_at) END,
+            name = CASE WHEN 'name' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_name, name) END,
+            description = CASE WHEN 'description' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_description, description) END,
+            intake_type = CASE WHEN 'intake_type' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_intake_type, intake_type) END,
+            dose = CASE WHEN 'dose' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_dose, dose) END,
+            measurement = CASE WHEN 'measurement' = ANY(p_nulls) THEN NULL ELSE COALESCE(p_measurement, measurement) END
         WHERE id = p_id
         RETURNING * INTO id, created_at, updated_at, name, description, intake_type, dose, measurement;
         
@@ -245,7 +295,15 @@ CREATE TABLE IF NOT EXISTS medicines (
     measurement VARCHAR(31) NOT NULL
 );
 
--- Indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_medicines_name ON medicines(name);
-CREATE INDEX IF NOT EXISTS idx_medicines_intake_type ON medicines(intake_type);
-CREATE INDEX IF NOT EXISTS idx_medicines_created_at ON medicines(created_at); 
\ No newline at end of file
+-- Single-column indexes the (column, id) ones below replace, and the description index
+-- (free text up to 511 characters that is not sorted on, so it only cost writes and space)
+DROP INDEX IF EXISTS idx_medicines_name, idx_medicines_intake_type, idx_medicines_created_at;
+DROP INDEX IF EXISTS ix_medicines_description_id;
+
+-- (column, id) for every orderable column except description, matching the keyset pagination order
+CREATE INDEX IF NOT EXISTS ix_medicines_created_at_id ON medicines(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_medicines_updated_at_id ON medicines(updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_medicines_name_id ON medicines(name, id);
+CREATE INDEX IF NOT EXISTS ix_medicines_intake_type_id ON medicines(intake_type, id);
+CREATE INDEX IF NOT EXISTS ix_medicines_dose_id ON medicines(dose, id);
+CREATE INDEX IF NOT EXISTS ix_medicines_measurement_id ON medicines(measurement, id); 
\ No newline at end of file
@@ -0,0 +1,14 @@
+-- Migration for ScheduleCycleModel.end (app/schedule/models.py)
+-- create_all never adds a column to an existing table, so databases created before `end`
+-- existed need this once. Until then `active_at` and `overlapping` skip the older cycles,
+-- whose `end` is NULL. Safe to run more than once.
+
+ALTER TABLE schedule_cycles ADD COLUMN IF NOT EXISTS "end" TIMESTAMP WITHOUT TIME ZONE;
+
+-- Backfill with schedule_cycle_end(start, repeat_each, repetition_number).
+UPDATE schedule_cycles
+SET "end" = start + make_interval(hours => repeat_each * repetition_number)
+WHERE "end" IS NULL;
+
+-- The keyset index the model declares for `end`.
+CREATE INDEX IF NOT EXISTS ix_schedule_cycles_end_id ON schedule_cycles("end", id);
@@ -0,0 +1,17 @@
+from app.base.queries import QueryCount, count_queries
+from collections.abc import Iterator
+import pytest
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line('markers', "max_queries(n): fail the test when it executes more than n SQL statements")
+
+
+@pytest.fixture(autouse=True)
+def query_count(request: pytest.FixtureRequest) -> Iterator[QueryCount]:
+    """Statements the test executed; enforces the `max_queries` marker, so N+1 regressions fail."""
+    with count_queries() as counter:
+        yield counter
+    marker = request.node.get_closest_marker('max_queries')
+    if marker is not None and counter.count > marker.args[0]:
+        pytest.fail(f"{counter.count} SQL statements executed, at most {marker.args[0]} expected:\n"
+                    + '\n'.join(counter.statements), pytrace=False)
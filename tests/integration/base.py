@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from typing import Any
 from abc import ABC
 import httpx
+import inspect
 
 class BaseApiClient[RequestSchema: BaseModel, ResponseSchema: BaseModel, Query: FindQuery](ABC):
     def __init__(self, _ResponseSchema: type[ResponseSchema],
@@ -15,14 +16,19 @@ class BaseApiClient[RequestSchema: BaseModel, ResponseSchema: BaseModel, Query:
         self.ResponseSchema = _ResponseSchema
         self.client = client
 
+    @staticmethod
+    async def _resolved(response: Any) -> Any:
+        """The response of a sync `HttpClient`, or the awaited one of an async one."""
+        return await response if inspect.isawaitable(response) else response
+
     async def add(self, model: RequestSchema) -> ResponseSchema:
         url: str = f"{self.base_route}"
-        response: dict[str, Any] = self.client.post(url, json=model.model_dump(mode='json'))
+        response: dict[str, Any] = await self._resolved(self.client.post(url, json=model.model_dump(mode='json')))
         return self.ResponseSchema(**response)
 
     async def find(self, query: Query) -> Page[RequestSchema, Query] | None:
         url: str = f"{self.base_route}/find"
-        response: dict[str, Any] = self.client.post(url, json=query.model_dump(mode='json'))
+        response: dict[str, Any] = await self._resolved(self.client.post(url, json=query.model_dump(mode='json')))
         if not response:
             return None
         response["data"] = [self.ResponseSchema(**model) for model in response.get("data", [])]
@@ -31,7 +37,7 @@ class BaseApiClient[RequestSchema: BaseModel, ResponseSchema: BaseModel, Query:
     async def find_by_id(self, id: Positive[int]) -> ResponseSchema | None:
         url: str = f"{self.base_route}/{id}"
         try:
-            response: dict[str, Any] = self.client.get(url)
+            response: dict[str, Any] = await self._resolved(self.client.get(url))
             return self.ResponseSchema(**response)
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
@@ -40,10 +46,10 @@ class BaseApiClient[RequestSchema: BaseModel, ResponseSchema: BaseModel, Query:
 
     async def update(self, id: Positive[int], model: RequestSchema) -> ResponseSchema:
         url: str = f"{self.base_route}/{id}"
-        response: dict[str, Any] = self.client.put(url, json=model.model_dump(mode='json'))
+        response: dict[str, Any] = await self._resolved(self.client.put(url, json=model.model_dump(mode='json')))
         return self.ResponseSchema(**response)
 
     async def delete(self, id: Positive[int]) -> ResponseSchema:
         url: str = f"{self.base_route}/{id}"
-        response: dict[str, Any] = self.client.delete(url)
+        response: dict[str, Any] = await self._resolved(self.client.delete(url))
         return self.ResponseSchema(**response)
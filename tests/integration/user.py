@@ -189,7 +189,9 @@ class UserApiClient(BaseApiClient[UserRequestSchema, UserResponseSchema, UserFin
 
     async def update_role_by_name(self, id: int, role_name: str) -> UserResponseSchema:
         url = f"{self.base_route}/{id}/role"
-        response = self.client.put(url, data=json.dumps(role_name), headers={"Content-Type": "application/json"})
+        response = await self._resolved(
+            self.client.put(url, data=json.dumps(role_name), headers={"Content-Type": "application/json"})
+        )
         return self.ResponseSchema(**response)
 
     async def get_account(self, id: int) -> AccountResponseSchema:
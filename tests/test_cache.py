@@ -0,0 +1,130 @@
+from app.base.cache import TTLCache, CachedRepository
+from app.medicine.repositories import InMemoryMedicineRepository
+from app.medicine.models import MedicineModel
+from app.user.repositories import InMemoryRoleRepository, CachedRoleRepository
+from app.user.models import RoleModel
+from tests.test_medicines import get_medicines
+import asyncio
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_lru_and_expiry():
+    clock = FakeClock()
+    cache: TTLCache[int, str] = TTLCache(max_entries=2, ttl=10.0, clock=clock)
+
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+    cache.set(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a" and cache.get(3) == "c"
+    assert cache.stats.evictions == 1
+
+    clock.now = 10.0
+    assert cache.get(1) is None
+    assert len(cache) == 1
+    assert cache.stats.hits == 3
+    assert cache.stats.misses == 2
+    assert cache.stats.evictions == 2
+
+
+async def test_cached_repository():
+    repo = CachedRepository(InMemoryMedicineRepository(), max_entries=8, ttl=60.0)
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+
+    first = await repo.find_by_id(medicines[0].id)
+    assert first == medicines[0]
+    again = await repo.find_by_id(medicines[0].id)
+    assert again == first and again is not first
+    assert repo.cache.stats.hits == 1 and repo.cache.stats.misses == 1
+
+    found = await repo.find_by_ids([medicines[0].id, medicines[1].id])
+    assert [medicine.id for medicine in found] == [medicines[0].id, medicines[1].id]
+    assert repo.cache.stats.hits == 2
+
+    assert await repo.project_by_id(medicines[0].id, ['name']) == {'id': medicines[0].id, 'name': medicines[0].name}
+    assert repo.cache.stats.hits == 3
+
+    await repo.patch(medicines[0].id, dose=800)
+    assert medicines[0].id not in repo.cache._entries
+    assert (await repo.find_by_id(medicines[0].id)).dose == 800
+
+    await repo.delete(medicines[1].id)
+    assert await repo.find_by_id(medicines[1].id) is None
+
+
+async def test_cached_repository_returns_copies():
+    repo = CachedRepository(InMemoryMedicineRepository(), max_entries=8, ttl=60.0)
+    medicine = (await repo.add_many(get_medicines(MedicineModel)))[0]
+    name, dose = medicine.name, medicine.dose
+
+    for found in (await repo.find_by_id(medicine.id), (await repo.find_by_ids([medicine.id]))[0]):
+        found.dose = 1
+        found.name = "Mutated"
+    cached = await repo.find_by_id(medicine.id)
+    assert repo.cache.stats.hits == 2
+    assert (cached.name, cached.dose) == (name, dose)
+    cached.dose = 1
+    assert (await repo.find_by_id(medicine.id)).dose == dose
+
+
+class GatedMedicineRepository(InMemoryMedicineRepository):
+    """Reads the rows, then waits on `gate` before handing them back."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.read = asyncio.Event()
+        self.gate = asyncio.Event()
+
+    async def find_by_ids(self, ids):
+        models = [type(model).model_validate(model.model_dump()) if model is not None else None
+                  for model in await super().find_by_ids(ids)]
+        self.read.set()
+        await self.gate.wait()
+        return models
+
+    async def find_by_id(self, id):
+        return (await self.find_by_ids([id]))[0]
+
+
+async def test_cached_repository_skips_fill_after_write():
+    inner = GatedMedicineRepository()
+    repo = CachedRepository(inner, max_entries=8, ttl=60.0)
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+    ids = [medicine.id for medicine in medicines[:2]]
+
+    for dose, read in ((800, lambda: repo.find_by_id(ids[0])), (900, lambda: repo.find_by_ids(ids))):
+        inner.read.clear()
+        inner.gate.clear()
+        pending = asyncio.create_task(read())
+        await inner.read.wait()
+        await repo.patch(ids[0], dose=dose)
+        inner.gate.set()
+        await pending
+        assert ids[0] not in repo.cache._entries
+        assert repo._reads == {}
+
+    assert ids[1] in repo.cache._entries
+    assert (await repo.find_by_id(ids[0])).dose == 900
+
+
+async def test_cached_role_repository():
+    repo = CachedRoleRepository(InMemoryRoleRepository())
+    await repo.create_defaults()
+
+    role = await repo.find_by_name("Administrator")
+    assert role is not None
+    assert await repo.find_by_name("Administrator") == role
+    assert repo.names.stats.hits == 1
+    role.name = "Mutated"
+    assert (await repo.find_by_name("Administrator")).name == "Administrator"
+
+    await repo.patch(role.id, name="Admin")
+    assert await repo.find_by_name("Administrator") is None
+    assert (await repo.find_by_name("Admin")).id == role.id
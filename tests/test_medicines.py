@@ -1,14 +1,33 @@
 from app.medicine.repositories import (
-    MedicineFindQuery,
+    MedicineFindQuery, MedicineFilterQuery, MedicineAggregateQuery,
     InMemoryMedicineRepository,
+    AsyncInMemoryMedicineRepository,
 )
 from app.medicine.services import MedicineService
+from app.medicine.routers import MedicineRouter
 from app.medicine.schemas import MedicineRequestSchema, MedicineResponseSchema
 from app.medicine.models import MedicineModel
 from app.base.common import SupportsModelPersistance
-from app.base.models import Page
+from app.base.repositories import BaseRepository, Explain, ProcSQLRepository, unit_of_work
+from app.base.models import Batch, Page
+from app.base.export import ndjson_chunks, csv_chunks
+from app.base.database import session_scope
+from app.exceptions import EntityAlreadyExists, EntityNotFound
+from app.utils import AsyncHttpxClient
 from tests.integration.medicine import MedicineApiClient
+from fastapi import FastAPI, Depends
+from pydantic import ValidationError
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
 from random import randint
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+import asyncio
+import httpx
+import json
+import re
+import threading
 import pytest
 
 def get_medicines[T: MedicineModel | MedicineRequestSchema](model: type[T]) -> list[T]:
@@ -88,6 +107,7 @@ def get_medicines[T: MedicineModel | MedicineRequestSchema](model: type[T]) -> l
 @pytest.mark.parametrize('request_schema,response_schema,mp', [
     (MedicineModel, MedicineModel, InMemoryMedicineRepository()),
     (MedicineModel, MedicineModel, MedicineService(InMemoryMedicineRepository())),
+    (MedicineModel, MedicineModel, AsyncInMemoryMedicineRepository()),
     # (MedicineRequestSchema, MedicineResponseSchema, MedicineApiClient('http://127.0.0.1:8080')),
 ])
 async def test_basic_persistance(request_schema: type[MedicineModel | MedicineRequestSchema],
@@ -137,3 +157,331 @@ async def test_basic_persistance(request_schema: type[MedicineModel | MedicineRe
 
     await mp.delete(medicine.id)
     assert await mp.find_by_id(medicine.id) is None
+
+
+async def test_unit_of_work() -> None:
+    repo = InMemoryMedicineRepository()
+    medicine = get_medicines(MedicineModel)[0]
+
+    async with unit_of_work():
+        session = repo.session
+        assert session is not repo._session
+        medicine = await repo.add(medicine)
+        assert repo.session is session
+
+    assert repo.session is repo._session
+    assert medicine.id is not None
+    assert await repo.find_by_id(medicine.id) == medicine
+
+
+@pytest.mark.parametrize('repo', [
+    InMemoryMedicineRepository(),
+    AsyncInMemoryMedicineRepository(),
+])
+async def test_bulk_persistance(repo: InMemoryMedicineRepository | AsyncInMemoryMedicineRepository) -> None:
+    repo.batch_size = 4
+    medicines = get_medicines(MedicineModel)
+
+    persisted = await repo.add_many(medicines)
+    assert [medicine.name for medicine in persisted] == [medicine.name for medicine in medicines]
+    assert all(medicine.id for medicine in persisted)
+    assert len({medicine.id for medicine in persisted}) == len(medicines)
+
+    with pytest.raises(EntityAlreadyExists):
+        await repo.add_many([persisted[0]])
+
+    updated = persisted[0].model_copy(update={'description': "New description"})
+    new = get_medicines(MedicineModel)[0]
+    upserted = await repo.upsert_many([updated, new])
+    assert upserted[0].id == updated.id and upserted[0].description == "New description"
+    assert upserted[1].id is not None and upserted[1].id not in {medicine.id for medicine in persisted}
+    assert (await repo.find_by_id(updated.id)).description == "New description"
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+@pytest.mark.parametrize('pattern,expected', [
+    ("^Amoxicilina$", {"Amoxicilina"}),
+    ("^Am", {"Amlodipino", "Amoxicilina"}),
+    ("^am", set()),
+    ("cilina", {"Amoxicilina"}),
+    ("^A[lz]", {"Albendazol", "Azitromicina"}),
+    ("^A_b", set()),
+])
+async def test_regex_filter(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository],
+                            pattern: str, expected: set[str]) -> None:
+    repo = repo_cls()
+    await repo.add_many(get_medicines(MedicineModel))
+    page = await repo.find(MedicineFindQuery(filter_by={'name': pattern}, order_by=('id', 'asc')))
+    assert {medicine.name for medicine in page.data} == expected if page else not expected
+
+
+def test_proc_statements() -> None:
+    repo = ProcSQLRepository(MedicineModel, create_engine("postgresql+psycopg://"), page_size_max=64)
+
+    stmt = repo._statement('Find', ['order_by_column', 'limit', 'filter'])
+    assert repo._statement('Find', ['order_by_column', 'limit', 'filter']) is stmt
+    assert repo._statement('Find', ['order_by_column', 'limit']) is not stmt
+    assert str(stmt.compile(dialect=postgresql.dialect())) == (
+        "SELECT * FROM FindMedicine(p_order_by_column => %(order_by_column)s, p_limit => %(limit)s, "
+        "p_filter => %(filter)s::JSONB)"
+    )
+
+
+def test_proc_explicit_nulls() -> None:
+    # Unset fields keep their value; an explicit None reaches the procedure as a NULL to write.
+    repo = ProcSQLRepository(MedicineModel, create_engine("postgresql+psycopg://"), page_size_max=64)
+    params = repo._set_params({'name': "Ibuprofeno", 'description': None})
+    assert params == {'name': "Ibuprofeno", 'nulls': ['description']}
+    assert str(repo._statement('Update', ['id', *params]).compile(dialect=postgresql.dialect())) == (
+        "SELECT * FROM UpdateMedicine(p_id => %(id)s, p_name => %(name)s, p_nulls => %(nulls)s::VARCHAR[])"
+    )
+
+
+def test_proc_prepare_threshold() -> None:
+    # Only the procedure calls are prepared; the connection goes back to the pool as it was.
+    repo = ProcSQLRepository(MedicineModel, create_engine("postgresql+psycopg://"), page_size_max=64)
+    driver_connection = SimpleNamespace(prepare_threshold=None)
+    conn = SimpleNamespace(dialect=SimpleNamespace(driver='psycopg'), connection=SimpleNamespace(driver_connection=driver_connection))
+
+    with repo._prepared(conn):
+        assert driver_connection.prepare_threshold == 0
+    assert driver_connection.prepare_threshold is None
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+async def test_patch(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository]) -> None:
+    svc = MedicineService(repo_cls())
+    medicine = await svc.add(get_medicines(MedicineModel)[0])
+    assert medicine.id is not None
+    created_at, updated_at = medicine.created_at, medicine.updated_at
+
+    patched = await svc.update_dose(medicine.id, 800)
+    assert patched.dose == 800 and patched.name == medicine.name
+    assert patched.created_at == created_at and patched.updated_at > updated_at
+    assert (await svc.find_by_id(medicine.id)).dose == 800
+
+    with pytest.raises(EntityNotFound):
+        await svc.update_dose(medicine.id + 1, 800)
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+async def test_projection(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository]) -> None:
+    repo = repo_cls()
+    repo.page_size_max = 4
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+
+    assert await repo.project_by_id(medicines[0].id, ['name']) == {'id': medicines[0].id, 'name': medicines[0].name}
+    assert await repo.project_by_id(len(medicines) + 1, ['name']) is None
+
+    query = MedicineFindQuery(order_by=('name', 'desc'))
+    stmt = repo._find_statement(query, ['dose'])
+    assert [column.name for column in stmt.selected_columns] == ['id', 'dose', 'name']
+
+    names: list[str] = []
+    page = await repo.project(query, ['dose'])
+    while page:
+        assert all(row.keys() == {'id', 'dose'} for row in page.data)
+        names += [next(m.name for m in medicines if m.id == row['id']) for row in page.data]
+        page = await repo.project(page.next, ['dose'])
+    assert names == sorted((medicine.name for medicine in medicines), reverse=True)
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+async def test_find_by_ids(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository]) -> None:
+    repo = repo_cls()
+    repo.batch_size = 3
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+    missing = max(medicine.id for medicine in medicines) + 1
+
+    ids = [medicines[5].id, missing, medicines[0].id, medicines[8].id, medicines[5].id]
+    found = await repo.find_by_ids(ids)
+    assert [medicine.id if medicine else None for medicine in found] == [
+        medicines[5].id, None, medicines[0].id, medicines[8].id, medicines[5].id
+    ]
+    assert await repo.find_by_ids([]) == []
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+async def test_stream(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository]) -> None:
+    repo = repo_cls()
+    repo.batch_size = 4
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+
+    rows = [row async for row in repo.stream()]
+    assert rows == [medicine.model_dump() for medicine in sorted(medicines, key=lambda m: m.id)]
+
+    lines = b''.join([chunk async for chunk in ndjson_chunks(repo.stream(['name']), chunk_rows=3)]).splitlines()
+    assert [json.loads(line) for line in lines] == [{'id': m.id, 'name': m.name} for m in sorted(medicines, key=lambda m: m.id)]
+
+    csv = ''.join([chunk async for chunk in csv_chunks(repo.stream(['dose']), chunk_rows=3)]).splitlines()
+    assert csv[0] == 'id,dose' and len(csv) == len(medicines) + 1
+
+
+async def test_stream_off_event_loop() -> None:
+    repo = InMemoryMedicineRepository()
+    await repo.add_many(get_medicines(MedicineModel))
+    threads: list[int] = []
+    event.listen(repo.engine, 'before_cursor_execute', lambda *args: threads.append(threading.get_ident()))
+
+    assert [row async for row in repo.stream(['name'])]
+    assert threads and threading.get_ident() not in threads
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+async def test_find_limit(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository]) -> None:
+    repo = repo_cls()
+    repo.page_size_max, repo.page_size_default = 6, 4
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+
+    for limit, page_size in ((None, 4), (2, 2), (100, 6)):
+        page = await repo.find(MedicineFindQuery(order_by=('id', 'asc'), limit=limit))
+        assert page is not None and len(page.data) == page_size
+        assert page.next.limit == limit
+        assert len((await repo.find(page.next)).data) == min(page_size, len(medicines) - page_size)
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+async def test_count(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository]) -> None:
+    repo = repo_cls()
+    repo.page_size_max = 3
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+    query = MedicineFilterQuery(filter_by={'intake_type': '^Comprimido$'})
+    expected = sum(medicine.intake_type == 'Comprimido' for medicine in medicines)
+
+    assert await repo.count(MedicineFilterQuery()) == len(medicines)
+    assert await repo.count(query) == expected
+    assert await repo.count(query, estimate=True) == expected
+    assert await BaseRepository.count(repo, query) == expected
+
+
+def test_count_estimate_statement() -> None:
+    repo = InMemoryMedicineRepository()
+    dialect = postgresql.psycopg.dialect()
+    assert str(repo._estimate_statement(MedicineFilterQuery()).compile(dialect=dialect)).startswith("SELECT reltuples \nFROM pg_class")
+    assert str(repo._estimate_statement(MedicineFilterQuery(filter_by={'dose': {'start': 400}})).compile(dialect=dialect)).startswith(
+        "EXPLAIN (FORMAT JSON) SELECT medicines.id \nFROM medicines \nWHERE medicines.dose >="
+    )
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+@pytest.mark.parametrize('date_trunc', ['hour', 'day', 'week', 'month', 'year'])
+async def test_aggregate(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository], date_trunc: str) -> None:
+    repo = repo_cls()
+    repo.page_size_max = 4
+    medicines = get_medicines(MedicineModel)
+    for i, medicine in enumerate(medicines):
+        medicine.created_at = datetime(2024, 12, 28, 23, 30) + timedelta(hours=37 * i)
+    await repo.add_many(medicines)
+
+    query = MedicineAggregateQuery(
+        filter_by={'dose': {'start': 100}},
+        group_by=['measurement', 'created_at'],
+        date_trunc=date_trunc,
+        aggregates=[('count', 'id'), ('sum', 'dose'), ('max', 'name')],
+    )
+    rows = await repo.aggregate(query)
+    assert rows == await BaseRepository.aggregate(repo, query)
+    assert sum(row['count_id'] for row in rows) == sum(medicine.dose >= 100 for medicine in medicines)
+
+
+@pytest.mark.parametrize('aggregate', [('sum', 'name'), ('avg', 'created_at')])
+async def test_aggregate_non_numeric(aggregate: tuple[str, str]) -> None:
+    with pytest.raises(ValidationError, match="needs a numeric attribute"):
+        MedicineAggregateQuery(aggregates=[aggregate])
+    assert MedicineAggregateQuery(aggregates=[('avg', 'dose'), ('sum', 'id'), ('max', aggregate[1])])
+
+    app = FastAPI(dependencies=[Depends(session_scope)])
+    app.include_router(MedicineRouter('/v1/medicine', lambda: MedicineService(InMemoryMedicineRepository())))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as client:
+        response = await client.post("/v1/medicine/aggregate", json={'aggregates': [list(aggregate)]})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryMedicineRepository, AsyncInMemoryMedicineRepository])
+async def test_find_plans(repo_cls: type[InMemoryMedicineRepository | AsyncInMemoryMedicineRepository]) -> None:
+    repo = repo_cls()
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+
+    def query(pattern: str, dose: float) -> MedicineFindQuery:
+        return MedicineFindQuery(filter_by={'name': pattern, 'dose': {'start': dose}}, order_by=('name', 'asc'))
+
+    assert repo._find_statement(query('^A', 100)) is repo._find_statement(query('^Ib', 400))
+    assert repo._find_statement(query('^A', 100)) is not repo._find_statement(query('^A[lz]', 100))
+
+    for pattern, dose in (('^A', 100), ('^Ib', 400), ('a$', 0.5)):
+        page = await repo.find(query(pattern, dose))
+        expected = sorted(m.name for m in medicines if re.search(pattern, m.name) and m.dose >= dose)
+        assert [medicine.name for medicine in page.data] == expected if page else not expected
+
+
+@pytest.mark.parametrize('order_by', [('dose', 'asc'), ('name', 'desc'), ('created_at', 'asc'), ('measurement', 'desc')])
+async def test_keyset_index_plan(order_by: tuple[str, str]) -> None:
+    repo = InMemoryMedicineRepository()
+    repo.page_size_max = 2
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+
+    query = MedicineFindQuery(order_by=order_by)
+    page = await repo.find(query)
+    stmt = repo._find_statement(page.next)
+    plan = [row[-1] for row in repo.session.connection().execute(Explain(stmt), repo._find_params(page.next))]
+    assert plan == [f"SEARCH medicines USING INDEX ix_medicines_{order_by[0]}_id ({order_by[0]}{'>' if order_by[1] == 'asc' else '<'}?)"]
+    assert f"(medicines.{order_by[0]}, medicines.id) {'>' if order_by[1] == 'asc' else '<'} (%(last_value)s" in str(
+        stmt.compile(dialect=postgresql.psycopg.dialect())
+    )
+
+    found = []
+    while page:
+        found += page.data
+        page = await repo.find(page.next)
+    expected = sorted(medicines, key=lambda medicine: (getattr(medicine, order_by[0]), medicine.id), reverse=order_by[1] == 'desc')
+    assert [medicine.id for medicine in found] == [medicine.id for medicine in expected]
+
+
+async def test_async_api_client() -> None:
+    service = MedicineService(InMemoryMedicineRepository())
+    app = FastAPI(dependencies=[Depends(session_scope)])
+    app.include_router(MedicineRouter('/v1/medicine', lambda: service))
+
+    async with AsyncHttpxClient(transport=httpx.ASGITransport(app)) as client:
+        api = MedicineApiClient('http://test', client)
+        added = await asyncio.gather(*(api.add(medicine) for medicine in get_medicines(MedicineRequestSchema)))
+        assert sorted(medicine.name for medicine in added) == sorted(medicine.name for medicine in get_medicines(MedicineRequestSchema))
+
+        found = await asyncio.gather(*(api.find_by_id(medicine.id) for medicine in added))
+        assert found == added
+        assert await api.find_by_id(max(medicine.id for medicine in added) + 1) is None
+
+
+async def test_serialized_responses() -> None:
+    repo = InMemoryMedicineRepository()
+    medicines = await repo.add_many(get_medicines(MedicineModel))
+    app = FastAPI(dependencies=[Depends(session_scope)])
+    app.include_router(MedicineRouter('/v1/medicine', lambda: MedicineService(repo)))
+    query = MedicineFindQuery(order_by=('dose', 'desc'), limit=3)
+    body = query.model_dump(mode='json')
+    page = await repo.find(query)
+    ids = [medicines[0].id, max(medicine.id for medicine in medicines) + 1]
+
+    # The bytes the routes dump must decode to what the response model path used to return.
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as client:
+        found = await client.post("/v1/medicine/find", json=body)
+        assert found.json() == jsonable_encoder(Page[MedicineResponseSchema, MedicineFindQuery](
+            next=page.next, data=[MedicineResponseSchema.model_validate(medicine) for medicine in page.data]))
+        got = await client.get(f"/v1/medicine/{medicines[0].id}")
+        assert got.json() == jsonable_encoder(MedicineResponseSchema.model_validate(medicines[0]))
+        batch = await client.post("/v1/medicine/batch-get", json=ids)
+        assert batch.json() == jsonable_encoder(Batch[MedicineResponseSchema](
+            data=[MedicineResponseSchema.model_validate(medicines[0])], missing=ids[1:]))
+        empty = await client.post("/v1/medicine/find", json={'filter_by': {'dose': {'start': 1e6}}, 'order_by': ['id', 'asc']})
+        assert empty.status_code == 200 and empty.json() is None
+
+
+def test_projection_openapi() -> None:
+    # `?attr=` answers with partial objects, so the documented responses must allow them.
+    app = FastAPI()
+    app.include_router(MedicineRouter('/v1/medicine', lambda: MedicineService(InMemoryMedicineRepository())))
+    paths = app.openapi()['paths']
+    get = paths['/v1/medicine/{id}']['get']['responses']['200']['content']['application/json']['schema']
+    assert {'type': 'object', 'additionalProperties': True} in get['anyOf']
+    find = paths['/v1/medicine/find']['post']['responses']['200']['content']['application/json']['schema']
+    assert {'$ref': '#/components/schemas/Page_dict_str__Any__MedicineFindQuery_'} in find['anyOf']
@@ -0,0 +1,86 @@
+from app.base.metrics import (
+    Histogram, MetricsRegistry, MetricsMiddleware, REPOSITORY_SECONDS, ROUTE_SECONDS, STATEMENT_SECONDS,
+    registry, statement_histogram,
+)
+from app.base.cache import CachedRepository
+from app.base.database import session_scope
+from app.medicine.models import MedicineModel
+from app.medicine.repositories import InMemoryMedicineRepository
+from app.medicine.routers import MedicineRouter
+from app.medicine.services import MedicineService
+from app.schedule.models import ScheduleCycleModel
+from app.schedule.repositories import InMemoryScheduleCycleRepository
+from tests.test_medicines import get_medicines
+from fastapi import FastAPI, Depends
+from datetime import datetime
+import httpx
+import pytest
+
+def test_histogram_render():
+    metrics = MetricsRegistry()
+    family = metrics.histogram('latency_seconds', "Latency.", ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        family.labels('find').observe(value)
+
+    assert family.labels('find').counts == [2, 1, 1]
+    assert metrics.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="find",le="0.1"} 2',
+        'latency_seconds_bucket{route="find",le="1.0"} 3',
+        'latency_seconds_bucket{route="find",le="+Inf"} 4',
+        'latency_seconds_sum{route="find"} 3.65',
+        'latency_seconds_count{route="find"} 4',
+    ]
+
+    histogram: Histogram = family.labels('find')
+    metrics.reset()
+    assert family.labels('find') is histogram and histogram.count == 0 and histogram.counts == [0, 0, 0]
+
+
+def test_statement_shapes():
+    assert statement_histogram("SELECT id FROM t WHERE id IN (?, ?)") is statement_histogram("SELECT id\nFROM t WHERE id IN (?, ?, ?)")
+    assert ("SELECT id FROM t WHERE id IN (...)",) in STATEMENT_SECONDS.children
+
+
+def test_statement_shapes_bounded(monkeypatch: pytest.MonkeyPatch):
+    shapes, statements = {}, {}
+    monkeypatch.setattr('app.base.metrics.STATEMENTS_MAX', 2)
+    monkeypatch.setattr('app.base.metrics._shapes', shapes)
+    monkeypatch.setattr('app.base.metrics._statements', statements)
+
+    in_lists = [statement_histogram(f"SELECT id FROM u WHERE id IN ({', '.join('?' * n)})") for n in range(2, 12)]
+    assert all(histogram is in_lists[0] for histogram in in_lists)
+    statement_histogram("SELECT name FROM u")
+    assert statement_histogram("SELECT email FROM u") is STATEMENT_SECONDS.labels('other')
+    assert len(shapes) == 2 and len(statements) == 2
+
+
+async def test_repository_timing():
+    registry.reset()
+    repo = InMemoryScheduleCycleRepository()
+    cycle = await repo.add(ScheduleCycleModel(start=datetime(2024, 1, 1), repeat_each=8, repetition_number=3, schedule_id=1))
+    # Overrides `patch` and calls `super().patch`: a single observation.
+    await repo.patch(cycle.id, repetition_number=4)
+
+    assert REPOSITORY_SECONDS.labels('InMemoryScheduleCycleRepository', 'patch').count == 1
+    assert REPOSITORY_SECONDS.labels('InMemoryScheduleCycleRepository', 'add').count == 1
+
+
+async def test_metrics_middleware():
+    registry.reset()
+    repo = CachedRepository(InMemoryMedicineRepository())
+    medicine = (await repo.add_many(get_medicines(MedicineModel)))[0]
+    app = FastAPI(dependencies=[Depends(session_scope)])
+    app.include_router(MedicineRouter('/v1/medicine', lambda: MedicineService(repo)))
+    app.add_middleware(MetricsMiddleware)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as client:
+        for _ in range(3):
+            (await client.get(f"/v1/medicine/{medicine.id}")).raise_for_status()
+        assert (await client.get("/v1/unknown")).status_code == 404
+
+    assert ROUTE_SECONDS.labels("Get Medicine").count == 3
+    assert REPOSITORY_SECONDS.labels('CachedRepository', 'find_by_id').count == 3
+    assert REPOSITORY_SECONDS.labels('InMemoryMedicineRepository', 'find_by_id').count == 1
+    assert 'http_request_duration_seconds_count{route="Get Medicine"} 3' in registry.render()
@@ -0,0 +1,63 @@
+from app.base.queries import QueryCount, QueryCountMiddleware, count_queries, parameter_shape, set_slow_query_threshold
+from app.base.database import session_scope
+from app.medicine.models import MedicineModel
+from app.medicine.repositories import InMemoryMedicineRepository, MedicineFindQuery
+from app.medicine.routers import MedicineRouter
+from app.medicine.services import MedicineService
+from tests.test_medicines import get_medicines
+from fastapi import FastAPI, Depends
+import httpx
+import logging
+import pytest
+
+def test_parameter_shape():
+    assert parameter_shape({'id': 1, 'name': "x"}) == {'id': 'int', 'name': 'str'}
+    assert parameter_shape((1, None)) == ['int', 'NoneType']
+    assert parameter_shape([(1, "a"), (2, "b")], executemany=True) == "2 x ['int', 'str']"
+
+
+# Table and index creation, one insert, one batched select and one select per id.
+@pytest.mark.max_queries(31)
+async def test_count_queries(query_count: QueryCount):
+    repo = InMemoryMedicineRepository()
+    ids = [medicine.id for medicine in await repo.add_many(get_medicines(MedicineModel))]
+
+    with count_queries() as batched:
+        await repo.find_by_ids(ids)
+    with count_queries() as one_by_one:
+        for id in ids:
+            await repo.project_by_id(id, ['name'])
+
+    assert batched.count == 1
+    assert one_by_one.count == len(ids)
+    assert query_count.count >= batched.count + one_by_one.count
+
+
+async def test_slow_query_log(caplog: pytest.LogCaptureFixture):
+    repo = InMemoryMedicineRepository()
+    medicine = (await repo.add_many(get_medicines(MedicineModel)))[0]
+    caplog.clear()
+
+    set_slow_query_threshold(0.0)
+    try:
+        with caplog.at_level(logging.WARNING, logger='app.base.queries'):
+            await repo.find(MedicineFindQuery(filter_by={'dose': {'start': medicine.dose}}, order_by=('id', 'asc')))
+    finally:
+        set_slow_query_threshold(None)
+
+    [record] = caplog.records
+    assert record.getMessage().startswith("Slow query (")
+    assert "FROM medicines" in record.getMessage()
+    assert record.getMessage().endswith("parameters: ['float', 'int', 'int']")
+
+
+async def test_query_count_header():
+    repo = InMemoryMedicineRepository()
+    medicine = (await repo.add_many(get_medicines(MedicineModel)))[0]
+    app = FastAPI(dependencies=[Depends(session_scope)])
+    app.include_router(MedicineRouter('/v1/medicine', lambda: MedicineService(repo)))
+    app.add_middleware(QueryCountMiddleware)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as client:
+        response = await client.get(f"/v1/medicine/{medicine.id}")
+    assert response.headers['x-query-count'] == '1'
@@ -3,19 +3,26 @@ from app.exceptions import *
 from app.schedule.repositories import (
     ScheduleRepository, ScheduleFindQuery,
     InMemoryScheduleRepository,
+    AsyncInMemoryScheduleRepository,
 
     ScheduleCycleRepository, ScheduleCycleFindQuery,
     InMemoryScheduleCycleRepository,
+    AsyncInMemoryScheduleCycleRepository,
 )
 from app.schedule.models import ScheduleModel, ScheduleCycleModel
+from app.schedule.schemas import ScheduleCycleResponseSchema
+from app.schedule.services import ScheduleCycleService, expand_occurrences
 
 from app.utils import HttpxClient
-from datetime import datetime
+from datetime import datetime, timedelta
+import numpy as np
 import pytest
 
 @pytest.mark.parametrize('schedule_repo,schedule_cycle_repo', [
     (InMemoryScheduleRepository(),
-     InMemoryScheduleCycleRepository())
+     InMemoryScheduleCycleRepository()),
+    (AsyncInMemoryScheduleRepository(),
+     AsyncInMemoryScheduleCycleRepository()),
 ])
 async def test_schedule_repository(schedule_repo: ScheduleRepository,
                                    schedule_cycle_repo: ScheduleCycleRepository,
@@ -39,3 +46,69 @@ async def test_schedule_repository(schedule_repo: ScheduleRepository,
 
     stored_schedule_cycle = await schedule_cycle_repo.find_by_id(new_schedule_cycle.id)
     assert stored_schedule_cycle == new_schedule_cycle
+
+
+def test_expand_occurrences():
+    window_start, window_end = datetime(2025, 1, 2), datetime(2025, 1, 4)
+    cycles = [
+        (datetime(2025, 1, 1), 8, 9),
+        (datetime(2025, 1, 3, 12), 24, 5),
+        (datetime(2024, 12, 1), 24, 3),
+        (datetime(2025, 1, 5), 1, 10),
+    ]
+    expected = sorted(
+        (start + timedelta(hours=k * repeat_each), i, k)
+        for i, (start, repeat_each, repetition_number) in enumerate(cycles)
+        for k in range(repetition_number)
+        if window_start <= start + timedelta(hours=k * repeat_each) < window_end
+    )
+
+    cycle, k, at = expand_occurrences(
+        np.array([c[0] for c in cycles], dtype='datetime64[us]'),
+        np.array([c[1] for c in cycles]),
+        np.array([c[2] for c in cycles]),
+        window_start, window_end,
+    )
+    assert list(zip(at.tolist(), cycle.tolist(), k.tolist())) == expected
+
+
+@pytest.mark.parametrize('schedule_cycle_repo_cls', [InMemoryScheduleCycleRepository, AsyncInMemoryScheduleCycleRepository])
+async def test_find_occurrences(schedule_cycle_repo_cls: type[ScheduleCycleRepository]) -> None:
+    svc = ScheduleCycleService(schedule_cycle_repo_cls())
+    daily = await svc.add(ScheduleCycleModel(start=datetime(2025, 1, 1, 9), repeat_each=24, repetition_number=30, schedule_id=1))
+    await svc.add(ScheduleCycleModel(start=datetime(2025, 1, 1, 8), repeat_each=12, repetition_number=60, schedule_id=2))
+    await svc.add(ScheduleCycleModel(start=datetime(2025, 3, 1), repeat_each=1, repetition_number=5, schedule_id=1))
+
+    occurrences = await svc.find_occurrences(datetime(2025, 1, 3), datetime(2025, 1, 5), [1])
+    assert [(o.cycle_id, o.index, o.at) for o in occurrences] == [
+        (daily.id, 2, datetime(2025, 1, 3, 9)),
+        (daily.id, 3, datetime(2025, 1, 4, 9)),
+    ]
+    assert len(await svc.find_occurrences(datetime(2025, 1, 3), datetime(2025, 1, 5))) == 6
+
+
+@pytest.mark.parametrize('schedule_cycle_repo_cls', [InMemoryScheduleCycleRepository, AsyncInMemoryScheduleCycleRepository])
+async def test_active_cycles(schedule_cycle_repo_cls: type[ScheduleCycleRepository]) -> None:
+    repo = schedule_cycle_repo_cls()
+    week = await repo.add(ScheduleCycleModel(start=datetime(2025, 1, 1), repeat_each=24, repetition_number=7, schedule_id=1))
+    day, later = await repo.add_many([
+        ScheduleCycleModel(start=datetime(2025, 1, 3), repeat_each=8, repetition_number=3, schedule_id=2),
+        ScheduleCycleModel(start=datetime(2025, 2, 1), repeat_each=12, repetition_number=4, schedule_id=1),
+    ])
+    assert week.end == datetime(2025, 1, 8)
+    assert day.end == datetime(2025, 1, 4)
+
+    assert {c.id for c in await repo.active_at(datetime(2025, 1, 3, 12))} == {week.id, day.id}
+    assert [c.id for c in await repo.active_at(datetime(2025, 1, 3, 12), [1])] == [week.id]
+    assert await repo.active_at(datetime(2025, 1, 8)) == []
+    assert {c.id for c in await repo.overlapping(datetime(2025, 1, 7), datetime(2025, 2, 2))} == {week.id, later.id}
+
+    patched = await repo.patch(day.id, repetition_number=30)
+    assert patched.end == datetime(2025, 1, 13)
+    assert {c.id for c in await repo.active_at(datetime(2025, 1, 10))} == {day.id}
+
+
+def test_cycle_response_before_end_migration():
+    # Rows created before `end` existed keep NULL there until schedule_cycles_end.sql runs.
+    cycle = ScheduleCycleModel(id=1, start=datetime(2025, 1, 1), repeat_each=24, repetition_number=7, schedule_id=1)
+    assert ScheduleCycleResponseSchema.model_validate(cycle).end is None
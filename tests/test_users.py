@@ -1,5 +1,5 @@
 from app.user.repositories import (
-    AccountRepository, AccountFindQuery,
+    AccountRepository, AccountFindQuery, AccountFilterQuery,
     InMemoryAccountRepository,
 
     ProfileRepository, ProfileFindQuery,
@@ -9,14 +9,17 @@ from app.user.repositories import (
     InMemoryRoleRepository,
 
     UserRepository, UserFindQuery,
-    InMemoryUserRepository,
+    InMemoryUserRepository, AsyncInMemoryUserRepository,
 )
 from app.user.services import UserService, AccountService, ProfileService, RoleService
 from app.user.schemas import UserRequestSchema, UserResponseSchema, AccountRequestSchema, AccountResponseSchema, ProfileRequestSchema, ProfileResponseSchema, RoleRequestSchema, RoleResponseSchema
 from app.user.models import AccountModel, ProfileModel, RoleModel, UserModel
 from app.base.common import SupportsModelPersistance
 from app.base.models import Page
+from app.base.queries import QueryCount, count_queries
 from app.exceptions import *
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from tests.integration.user import UserApiClient
 from random import randint
 import pytest
@@ -118,3 +121,65 @@ async def test_basic_persistance(account_request_schema: type[AccountRequestSche
 
     await user_mpo.delete(user.id)
     assert await user_mpo.find_by_id(user.id) is None
+
+
+def make_user_graph(role: RoleModel, i: int) -> UserModel:
+    return UserModel(
+        role=role,
+        account=AccountModel(email=f"user{i}@example.com", password=b"password"),
+        profile=ProfileModel(name=f"User{i}", paternal="Test", maternal="Case", birthdate=date(1990, 1, 1)),
+    )
+
+
+@pytest.mark.parametrize('repo_cls', [InMemoryUserRepository, AsyncInMemoryUserRepository])
+@pytest.mark.parametrize('loader,queries', [('selectin', 4), ('joined', 1)])
+# Seeding 40 user graphs is most of it; lazy loading the pages or the batch would add 16-48 more.
+@pytest.mark.max_queries(90)
+async def test_user_graph_query_count(repo_cls: type[InMemoryUserRepository | AsyncInMemoryUserRepository],
+                                      loader: str, queries: int, query_count: QueryCount) -> None:
+    repo = repo_cls()
+    repo.page_size_max = 16
+    role = RoleModel(name="Base User")
+    users = [make_user_graph(role, i) for i in range(40)]
+    if isinstance(repo, InMemoryUserRepository):
+        with Session(repo.engine) as session:
+            session.add_all(users)
+            session.commit()
+    else:
+        await repo.create_table()
+        async with AsyncSession(repo.engine) as session:
+            session.add_all(users)
+            await session.commit()
+
+    with count_queries() as counted:
+        user = await repo.find_by_id(1, loader=loader)
+    assert user.account.email == "user0@example.com" and user.profile.name == "User0" and user.role.name == "Base User"
+    assert counted.count == queries
+
+    for page_size in (4, 16):
+        repo.page_size_max = page_size
+        with count_queries() as counted:
+            page = await repo.find(UserFindQuery(order_by=('id', 'asc')), loader=loader)
+        assert len(page.data) == page_size
+        assert all(user.account and user.profile and user.role for user in page.data)
+        assert counted.count == queries
+
+    # Batch-get serializes the whole graph of every user, after the session that loaded it is gone.
+    with count_queries() as counted:
+        users = [UserResponseSchema.model_validate(user) for user in await repo.find_by_ids(list(range(1, 11)), loader=loader)]
+    assert [user.id for user in users] == list(range(1, 11))
+    assert all(user.account.email and user.profile.name and user.role.name for user in users)
+    assert counted.count == queries
+    # Nested counters add to the test's own.
+    assert query_count.count >= 4 * queries
+
+
+async def test_bool_filter() -> None:
+    repo = InMemoryAccountRepository()
+    accounts = [
+        await repo.add(AccountModel(id=i + 1, email=f"user{i}@example.com", password=b"password", enabled=i % 3 == 0)) for i in range(6)
+    ]
+    for enabled in (True, False):
+        page = await repo.find(AccountFindQuery(filter_by={'enabled': enabled}, order_by=('id', 'asc')))
+        assert [account.id for account in page.data] == [account.id for account in accounts if account.enabled == enabled]
+        assert await repo.count(AccountFilterQuery(filter_by={'enabled': enabled})) == len(page.data)
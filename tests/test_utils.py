@@ -2,8 +2,11 @@ from pydantic import BaseModel, Field, ValidationError
 from datetime import date, datetime
 from app.utils import (
     NumberInterval, IntInterval, FloatInterval, DateInterval, DatetimeInterval,
-    RegEx
+    RegEx, attr_pattern, truncate_datetime
 )
+from typing import Literal
+from sqlalchemy import Column, MetaData, String, Table, column, create_engine, select
+from sqlalchemy.dialects import postgresql, sqlite
 import pytest
 import re
 
@@ -139,3 +142,57 @@ def test_regex_direct_instantiation_non_string_type():
         RegEx(None)
     with pytest.raises(TypeError, match="Expected a string for regex pattern"):
         RegEx(["list", "of", "strings"])
+
+
+@pytest.mark.parametrize(
+    "pattern, dialect, expected_sql, expected_param",
+    [
+        (r"^Ibuprofeno$", postgresql.dialect(), "name = %(name_1)s", "Ibuprofeno"),
+        (r"^Ibu", postgresql.dialect(), "name LIKE %(name_1)s ESCAPE '/'", "Ibu%"),
+        (r"^100\%", postgresql.dialect(), "name LIKE %(name_1)s ESCAPE '/'", "100/%%"),
+        (r"ina$", postgresql.dialect(), "name LIKE %(name_1)s ESCAPE '/'", "%ina"),
+        (r"cilina", postgresql.dialect(), "name LIKE %(name_1)s ESCAPE '/'", "%cilina%"),
+        (r"^Am(ox|lo)", postgresql.dialect(), "name ~ %(name_1)s", "^Am(ox|lo)"),
+        (r"^Ibuprofeno$", sqlite.dialect(), "name = ?", "Ibuprofeno"),
+        (r"^Ibu", sqlite.dialect(), "name LIKE ? ESCAPE '/'", "Ibu%"),
+        (r"\d+ mg", sqlite.dialect(), "name REGEXP ?", r"\d+ mg"),
+    ]
+)
+def test_regex_inject(pattern, dialect, expected_sql, expected_param):
+    stmt = RegEx(pattern).inject(select(column('name')), column('name'))
+    compiled = stmt.compile(dialect=dialect)
+    assert str(compiled).endswith(f"WHERE {expected_sql}")
+    assert list(compiled.params.values()) == [expected_param]
+
+
+@pytest.mark.parametrize("pattern", [r"^100\%", r"0\%$", r"a_b", r"^a/b$", r"/", r"^50\%_/"])
+@pytest.mark.parametrize("key", [None, 'name_pattern'])
+def test_regex_inject_wildcards(pattern, key):
+    names = ["100%", "1000", "a_b", "axb", "a/b", "a//b", "50%_/x", "50x_/x", "x/"]
+    table = Table('names', MetaData(), Column('name', String))
+    engine = create_engine("sqlite://")
+    regex = RegEx(pattern)
+    with engine.connect() as connection:
+        table.create(connection)
+        connection.execute(table.insert(), [{'name': name} for name in names])
+        stmt = regex.inject(select(table.c.name), table.c.name, key)
+        found = connection.scalars(stmt, regex.params(key) if key else {}).all()
+    assert sorted(found) == sorted(name for name in names if regex.is_match(name))
+
+
+def test_attr_pattern():
+    pattern = attr_pattern(Literal['id', 'name', 'created_at'])
+    assert re.match(pattern, "name")
+    assert re.match(pattern, "name,created_at,id")
+    assert not re.match(pattern, "name,")
+    assert not re.match(pattern, "name,password")
+    assert not re.match(pattern, "")
+
+
+def test_truncate_datetime():
+    moment = datetime(2025, 3, 13, 17, 42, 5, 120)
+    assert truncate_datetime(moment, 'hour') == datetime(2025, 3, 13, 17)
+    assert truncate_datetime(moment, 'day') == datetime(2025, 3, 13)
+    assert truncate_datetime(moment, 'week') == datetime(2025, 3, 10)
+    assert truncate_datetime(moment, 'month') == datetime(2025, 3, 1)
+    assert truncate_datetime(moment, 'year') == datetime(2025, 1, 1)